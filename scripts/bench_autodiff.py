@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+# Compare per-step cost of reverse-mode autodiff against forward finite
+# differences as the parameter count P grows.
+#
+# The model is a P-term weighted sum, so the forward pass itself grows with P.
+# The fair comparison is therefore "rule cost / forward cost": autodiff should
+# stay at a small constant, while finite differences grow linearly with P.
+
+import time
+
+from nanotorch import autodiff, finite_difference
+
+
+def _model(num_params: int):
+    names = [f"w{i}" for i in range(num_params)]
+    scales = [1.0 / (i + 1) for i in range(num_params)]
+
+    def predict(x, p):
+        total = 0.0
+        for name, scale in zip(names, scales):
+            total = total + p[name] * (x * scale)
+        return total
+
+    def loss(y_hat, y):
+        return (y_hat - y) ** 2
+
+    params = {name: 0.1 for name in names}
+    return predict, loss, params
+
+
+def _time(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main() -> None:
+    x, y = 1.5, 2.0
+    print(f"{'P':>6} {'forward':>12} {'autodiff':>12} {'finite_diff':>12} {'ad/fwd':>8} {'fd/fwd':>8}")
+    for num_params in (1, 4, 16, 64, 256, 1024):
+        predict, loss, params = _model(num_params)
+        ad_rule = autodiff(predict=predict, loss=loss)
+        fd_rule = finite_difference(eps=1e-6, predict=predict, loss=loss)
+        y_hat = predict(x, params)
+        repeats = max(5, 2000 // num_params)
+
+        fwd = _time(lambda: loss(predict(x, params), y), repeats)
+        ad = _time(lambda: ad_rule(x, y, y_hat, params), repeats)
+        fd = _time(lambda: fd_rule(x, y, y_hat, params), repeats)
+        print(
+            f"{num_params:>6} {fwd * 1e6:>10.1f}us {ad * 1e6:>10.1f}us {fd * 1e6:>10.1f}us"
+            f" {ad / fwd:>8.1f} {fd / fwd:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
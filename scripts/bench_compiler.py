@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+# Per-sample overhead of the generic loop vs compiled step kernels.
+#
+# "compiled" is the exact pure-Python kernel (bit-identical to train());
+# "compiled, vectorized" converts the points to NumPy columns once and runs
+# the generated NumPy kernel.
+
+import random
+import time
+
+from nanotorch import manual_gradient, train
+from nanotorch.compiler import train_compiled
+from nanotorch.scenarios import get_scenario
+
+N = 100_000
+STEPS = 5
+
+
+def main() -> None:
+    scenario = get_scenario("noisy_linear")
+    rng = random.Random(0)
+    data = [(rng.uniform(-1, 1), rng.uniform(-1, 1)) for _ in range(N)]
+    runs = {
+        "train()": lambda p: train(
+            data, p, scenario.predict, scenario.loss, manual_gradient(scenario.grad), steps=STEPS, lr=0.01
+        ),
+        "compiled": lambda p: train_compiled(
+            data, p, scenario.predict, scenario.loss, scenario.grad, steps=STEPS, lr=0.01
+        ),
+        "compiled, vectorized": lambda p: train_compiled(
+            data, p, scenario.predict, scenario.loss, scenario.grad, steps=STEPS, lr=0.01, vectorized=True
+        ),
+    }
+
+    baseline = None
+    print(f"{'engine':<22} {'ns/sample':>10} {'speedup':>8}")
+    for name, run in runs.items():
+        start = time.perf_counter()
+        run(dict(scenario.params))
+        per_sample = (time.perf_counter() - start) / (N * STEPS) * 1e9
+        baseline = baseline or per_sample
+        print(f"{name:<22} {per_sample:>10.1f} {baseline / per_sample:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
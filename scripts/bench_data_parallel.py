@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+# Measure how data-parallel throughput scales with the number of workers.
+#
+# We time a fixed number of full-batch steps of the scalar engine contract on
+# a synthetic linear dataset and report samples/sec plus speedup over the
+# serial train() loop. Pool start-up is excluded so the numbers reflect the
+# steady-state cost of a step.
+
+import os
+import random
+import time
+
+from nanotorch import manual_gradient, train
+from nanotorch.parallel import DataParallel
+from nanotorch.scenarios import get_scenario
+from nanotorch.training import _run_history
+
+N = 200_000
+STEPS = 5
+
+
+def main() -> None:
+    rng = random.Random(0)
+    data = [(x, 2.0 * x + 1.0 + rng.gauss(0.0, 0.1)) for x in (rng.random() for _ in range(N))]
+
+    scenario = get_scenario("with_bias")
+    rule = manual_gradient(scenario.grad)
+    start = time.perf_counter()
+    train(data, dict(scenario.params), scenario.predict, scenario.loss, rule, steps=STEPS, lr=0.1)
+    serial = (time.perf_counter() - start) / STEPS
+    print(f"{'workers':>8} {'step time':>11} {'samples/s':>12} {'speedup':>8}")
+    print(f"{'serial':>8} {serial * 1e3:>9.1f}ms {N / serial:>12,.0f} {1.0:>8.2f}")
+
+    counts = sorted({1, 2, 4, 8, os.cpu_count() or 1})
+    for workers in counts:
+        with DataParallel(data, scenario.predict, scenario.loss, rule, workers=workers) as pool:
+            pool.step_fn(dict(scenario.params))  # warm up workers
+            start = time.perf_counter()
+            _run_history(pool.step_fn, dict(scenario.params), steps=STEPS, lr=0.1, observer=None)
+            elapsed = (time.perf_counter() - start) / STEPS
+        print(f"{workers:>8} {elapsed * 1e3:>9.1f}ms {N / elapsed:>12,.0f} {serial / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+# Compare optimizers by wall time and steps to reach a target loss on every
+# registry scenario.
+#
+# The target for each scenario sits 1% of the way from the best loss any
+# optimizer reaches back towards the starting loss, so "reached the target"
+# means "got essentially all the available improvement". Each optimizer uses
+# a single conventional learning rate rather than a per-scenario tuned one.
+
+import time
+
+from nanotorch import manual_gradient, train_iter
+from nanotorch.optim import OPTIMIZERS, make_optimizer
+from nanotorch.scenarios import get_scenario, list_scenarios
+
+MAX_STEPS = 2000
+# None means "use the scenario's own lr".
+LEARNING_RATES = {
+    "sgd": None,
+    "momentum": None,
+    "nesterov": None,
+    "adam": 0.1,
+    "adamw": 0.1,
+    "rmsprop": 0.01,
+    "lbfgs": 1.0,
+}
+
+
+def _run(scenario_name: str, optimizer: str, target: float | None):
+    scenario = get_scenario(scenario_name)
+    lr = LEARNING_RATES[optimizer] or scenario.lr
+    states = train_iter(
+        scenario.data,
+        scenario.params,
+        scenario.predict,
+        scenario.loss,
+        manual_gradient(scenario.grad),
+        steps=MAX_STEPS,
+        lr=lr,
+        optimizer=make_optimizer(optimizer),
+    )
+    initial = best = float("inf")
+    start = time.perf_counter()
+    for state in states:
+        if state.step == 0:
+            initial = state.loss
+        best = min(best, state.loss)
+        if target is not None and state.loss <= target:
+            return state.step + 1, time.perf_counter() - start, initial, best
+    return None, time.perf_counter() - start, initial, best
+
+
+def main() -> None:
+    print(f"{'scenario':<22} {'optimizer':<10} {'steps':>7} {'time':>10}")
+    for name in list_scenarios():
+        runs = [_run(name, opt, None) for opt in OPTIMIZERS]
+        initial = runs[0][2]
+        floor = min(best for *_, best in runs)
+        target = floor + 0.01 * (initial - floor)
+        for opt in OPTIMIZERS:
+            steps, seconds, _, _ = _run(name, opt, target)
+            shown = f"{steps:>7}" if steps is not None else f"{'>' + str(MAX_STEPS):>7}"
+            print(f"{name:<22} {opt:<10} {shown} {seconds * 1e3:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,54 @@
+from typing import TYPE_CHECKING, Any, List
+
+from .autodiff import autodiff
+from .data import DataLoader
 from .training import StepState, finite_difference, manual_gradient, train, train_iter
 
-__all__ = ["train", "manual_gradient", "finite_difference", "train_iter", "StepState"]
+# Only the scalar training loop and autodiff are imported eagerly; neither
+# imports NumPy at import time. Names from modules that pull in NumPy (or
+# worse) are resolved on first access through the module-level __getattr__
+# below (PEP 562), so short-lived processes that just call train() never pay
+# for them. Lazy names must not match a submodule's name: importing the
+# submodule would rebind the package attribute to it. That is why autodiff,
+# which shares its module's name, is imported eagerly.
+_LAZY = {
+    "train_batched": ".batched",
+    "train_batched_iter": ".batched",
+    "ParamStore": ".params",
+    "TraceRecorder": ".trace",
+}
+
+if TYPE_CHECKING:
+    from .batched import train_batched, train_batched_iter
+    from .params import ParamStore
+    from .trace import TraceRecorder
+
+__all__ = [
+    "train",
+    "manual_gradient",
+    "finite_difference",
+    "train_iter",
+    "StepState",
+    "train_batched",
+    "train_batched_iter",
+    "autodiff",
+    "DataLoader",
+    "ParamStore",
+    "TraceRecorder",
+]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
+
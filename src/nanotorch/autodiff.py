@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+# Reverse-mode automatic differentiation on a tiny tape.
+#
+# finite_difference() pays one extra forward pass per parameter, and
+# manual_gradient() needs a human to derive every gradient. Reverse mode sits
+# between the two: we record each arithmetic operation while predict/loss run
+# on traced values, then walk the recording backwards once. That single
+# backward pass yields the gradient for every parameter, so cost per sample is
+# a small constant multiple of the forward pass regardless of parameter count.
+#
+# Values may be Python floats or NumPy arrays. Array support is what lets the
+# same rule drive the batched engine: gradients that flow into a scalar
+# parameter from a whole column are summed back down to the parameter's shape.
+# Matrix products (`x @ p["W"]`) are traced too, so a dense layer over a batch
+# costs two extra matrix multiplications in the backward pass, not a loop.
+#
+# NumPy is imported inside the functions that need it, not at module level:
+# `import nanotorch` binds autodiff eagerly (the package attribute must be
+# the function, not this submodule), and neither that import nor tracing
+# scalar models should pay NumPy's import time. exp/log/... and array
+# values do need it.
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+
+from .training import LossFn, Params, PredictFn, RuleFn, Scalar
+
+# Each recorded node keeps its parents plus the local derivative w.r.t. each
+# parent, expressed as "given d(out), return d(parent)". Closures keep the
+# backward math right next to the forward math that produced it.
+_Backward = Callable[[object], object]
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class Tape:
+    """Records Vars in creation order so backward() is a reverse scan, not a graph sort."""
+
+    def __init__(self) -> None:
+        self.nodes: List[Var] = []
+
+    def var(self, value: object) -> Var:
+        return Var(value, self)
+
+    def backward(self, out: Var) -> None:
+        # Seed with ones in the output's shape: for an array-valued loss this
+        # differentiates the *sum* of per-sample losses, which is exactly what
+        # the training engines reduce to anyway.
+        out.grad = 1.0
+        if _is_array(out.value):
+            import numpy as np
+
+            out.grad = np.ones_like(out.value, dtype=np.float64)
+        for node in reversed(self.nodes):
+            if node.grad is None or not node.parents:
+                continue
+            for parent, backward in node.parents:
+                contrib = backward(node.grad)
+                if hasattr(contrib, "ndim"):  # an array (or NumPy scalar)
+                    contrib = _unbroadcast(contrib, parent.value)
+                parent.grad = contrib if parent.grad is None else parent.grad + contrib
+
+
+class Var:
+    """
+    A traced value. Arithmetic on Vars returns new Vars and appends them to the tape.
+
+    We overload just enough operators for the models users actually write in
+    predict/loss; anything else fails loudly with a TypeError instead of
+    silently producing a wrong gradient.
+    """
+
+    __slots__ = ("value", "tape", "parents", "grad")
+    # Make `array @ var`, `array * var`, ... defer to our reflected operators
+    # instead of NumPy treating the Var as an opaque object.
+    __array_ufunc__ = None
+
+    def __init__(
+        self, value: object, tape: Tape, parents: Tuple[Tuple[Var, _Backward], ...] = ()
+    ) -> None:
+        self.value = value
+        self.tape = tape
+        self.parents = parents
+        self.grad: object | None = None
+        tape.nodes.append(self)
+
+    def _node(self, value: object, *parents: Tuple[Var | None, _Backward]) -> Var:
+        # Constants (plain floats/arrays) show up as a None parent: they need
+        # no gradient, so we don't record an edge or allocate a grad for them.
+        if len(parents) == 2 and parents[1][0] is None:
+            parents = parents[:1]
+        return Var(value, self.tape, parents)
+
+    def __add__(self, other: object) -> Var:
+        o, b = _split(other)
+        return self._node(self.value + b, (self, lambda g: g), (o, lambda g: g))
+
+    __radd__ = __add__
+
+    def __sub__(self, other: object) -> Var:
+        o, b = _split(other)
+        return self._node(self.value - b, (self, lambda g: g), (o, lambda g: -g))
+
+    def __rsub__(self, other: object) -> Var:
+        return self._node(other - self.value, (self, lambda g: -g))
+
+    def __mul__(self, other: object) -> Var:
+        o, b = _split(other)
+        a = self.value
+        return self._node(a * b, (self, lambda g: g * b), (o, lambda g: g * a))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: object) -> Var:
+        o, b = _split(other)
+        a = self.value
+        return self._node(a / b, (self, lambda g: g / b), (o, lambda g: -g * a / (b * b)))
+
+    def __rtruediv__(self, other: object) -> Var:
+        a = self.value
+        return self._node(other / a, (self, lambda g: -g * other / (a * a)))
+
+    def __neg__(self) -> Var:
+        return self._node(-self.value, (self, lambda g: -g))
+
+    def __pow__(self, exponent: object) -> Var:
+        if isinstance(exponent, Var):
+            # a ** b with a traced exponent: d/db = a**b * log(a).
+            import numpy as np
+
+            a, b = self.value, exponent.value
+            out = a**b
+            return self._node(
+                out,
+                (self, lambda g: g * b * a ** (b - 1)),
+                (exponent, lambda g: g * out * np.log(a)),
+            )
+        a = self.value
+        return self._node(a**exponent, (self, lambda g: g * exponent * a ** (exponent - 1)))
+
+    def __matmul__(self, other: object) -> Var:
+        o, b = _split(other)
+        a = self.value
+        return self._node(a @ b, (self, lambda g: _matmul_grads(a, b, g)[0]), (o, lambda g: _matmul_grads(a, b, g)[1]))
+
+    def __rmatmul__(self, other: object) -> Var:
+        b = self.value
+        return self._node(other @ b, (self, lambda g: _matmul_grads(other, b, g)[1]))
+
+    def sum(self, axis: int | None = None) -> Var:
+        import numpy as np
+
+        a = self.value
+        return self._node(np.sum(a, axis=axis), (self, lambda g: _expand(g, a, axis)))
+
+    def __abs__(self) -> Var:
+        import numpy as np
+
+        a = self.value
+        return self._node(abs(a), (self, lambda g: g * np.sign(a)))
+
+    def __eq__(self, other: object) -> bool:
+        # Identity equality would make `var == 1.0` quietly False, so a branch
+        # on it would pick the wrong path without any error.
+        raise TypeError("can't compare a traced Var with ==/!=; compare var.value instead")
+
+    __ne__ = __eq__
+    # Defining __eq__ drops the default hash; Vars must stay usable as keys.
+    __hash__ = object.__hash__
+
+    def __repr__(self) -> str:
+        return f"Var({self.value!r})"
+
+
+def _split(other: object) -> Tuple[Var | None, object]:
+    # Binary ops need the other operand's raw value either way, plus the Var
+    # itself when it is traced so the backward pass can reach it.
+    if isinstance(other, Var):
+        return other, other.value
+    return None, other
+
+
+def _is_array(value: object) -> bool:
+    # Duck-typed so scalar runs never import NumPy: only arrays (not floats,
+    # not 0-d NumPy scalars) have a positive ndim.
+    return getattr(value, "ndim", 0) > 0
+
+
+def _matmul_grads(a: object, b: object, g: object) -> Tuple[np.ndarray, np.ndarray]:
+    # For out = a @ b: d(a) = g @ b.T and d(b) = a.T @ g. 1-D operands are
+    # promoted to a row (a) or a column (b) and squeezed back afterwards.
+    import numpy as np
+
+    a2 = np.atleast_2d(a)
+    b2 = np.asarray(b).reshape(-1, 1) if np.ndim(b) == 1 else np.asarray(b)
+    g2 = np.asarray(g).reshape(a2.shape[0], b2.shape[1])
+    return (g2 @ b2.T).reshape(np.shape(a)), (a2.T @ g2).reshape(np.shape(b))
+
+
+def _expand(grad: object, like: object, axis: int | None) -> object:
+    # Gradient of a sum: every summed entry gets the output's gradient.
+    import numpy as np
+
+    if axis is not None:
+        grad = np.expand_dims(grad, axis)
+    return np.broadcast_to(grad, np.shape(like)).copy() if _is_array(like) else grad
+
+
+def _unbroadcast(grad: object, like: object) -> object:
+    # Broadcasting copies a value across a larger shape in the forward pass,
+    # so its gradient is the sum over the copied axes in the backward pass.
+    if not _is_array(grad):
+        return grad
+    import numpy as np
+
+    if not _is_array(like):
+        return float(np.sum(grad))
+    grad = np.asarray(grad)
+    while grad.ndim > like.ndim:
+        grad = grad.sum(axis=0)
+    for axis, size in enumerate(like.shape):
+        if size == 1 and grad.shape[axis] != 1:
+            grad = grad.sum(axis=axis, keepdims=True)
+    return grad
+
+
+def _unary(name: str, dfn: Callable[[object, object], object]):
+    # Elementwise functions that accept Vars, floats and arrays alike, so user
+    # code can call nanotorch.autodiff.exp(...) whether or not it's traced.
+    # `name` is the NumPy ufunc, looked up on first use.
+    def op(v: object) -> object:
+        import numpy as np
+
+        fn = getattr(np, name)
+        if not isinstance(v, Var):
+            return fn(v)
+        a = v.value
+        out = fn(a)
+        return v._node(out, (v, lambda g: g * dfn(a, out)))
+
+    return op
+
+
+def _dsin(a: object, out: object) -> object:
+    import numpy as np
+
+    return np.cos(a)
+
+
+def _dcos(a: object, out: object) -> object:
+    import numpy as np
+
+    return -np.sin(a)
+
+
+exp = _unary("exp", lambda a, out: out)
+log = _unary("log", lambda a, out: 1.0 / a)
+tanh = _unary("tanh", lambda a, out: 1.0 - out * out)
+sqrt = _unary("sqrt", lambda a, out: 0.5 / out)
+sin = _unary("sin", _dsin)
+cos = _unary("cos", _dcos)
+
+
+def value_and_grad(
+    fn: Callable[[Dict[str, Var]], object], params: Params
+) -> Tuple[object, Dict[str, Scalar]]:
+    """
+    Evaluate `fn(traced_params)` and return (value, gradient per param).
+
+    Parameters that don't influence the output get an explicit 0.0 so callers
+    always see the full parameter set, matching the other rules' contract.
+    """
+
+    tape = Tape()
+    leaves = {name: tape.var(value) for name, value in params.items()}
+    out = fn(leaves)
+    if not isinstance(out, Var):
+        # The output never touched a parameter: all gradients are zero.
+        return out, {name: 0.0 for name in params}
+
+    tape.backward(out)
+    grads: Dict[str, Scalar] = {}
+    for name, leaf in leaves.items():
+        g = leaf.grad
+        if g is None:
+            grads[name] = 0.0
+        elif _is_array(g):
+            grads[name] = g
+        else:
+            grads[name] = float(g)
+    return out.value, grads
+
+
+def autodiff(*, predict: PredictFn | None = None, loss: LossFn | None = None) -> RuleFn:
+    """
+    Compute exact gradients by reverse-mode differentiation of predict + loss.
+
+    Same closure-over-predict/loss design as finite_difference(), so train()
+    stays unchanged. The `y_hat` the loop passes in is ignored: we re-run the
+    forward pass on the tape because the backward pass needs the recording,
+    not just the number. That costs one extra forward per sample, independent
+    of parameter count.
+    """
+
+    def rule(x: Scalar, y: Scalar, y_hat: Scalar, params: Params) -> Dict[str, Scalar]:
+        if predict is None or loss is None:
+            raise ValueError("autodiff requires predict and loss to be provided")
+
+        _, grads = value_and_grad(lambda p: loss(predict(x, p), y), params)
+        return grads
+
+    return rule
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+# Array-backed training engine.
+#
+# The scalar engine in training.py calls predict/loss/rule once per sample,
+# which is perfect for reading the mechanics but spends almost all of its time
+# in Python dispatch once datasets reach millions of points. Here the same
+# functions receive whole NumPy columns instead, so one step is a handful of
+# vectorized calls. The update, history and StepState stream are shared with
+# the scalar engine through training._drive, so both engines stay observably
+# identical.
+#
+# With vector inputs the columns become matrices: x is (N, D), y is (N,) or
+# (N, K), and params can be weight matrices. A linear model's forward pass is
+# then one `x @ p["W"]`, and its gradient one `x.T @ err`; rules may return
+# such already-reduced totals (shaped like the param) instead of per-sample
+# rows.
+
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .data import DataLoader
+from .dataset import ArrayDataset
+from .training import (
+    DataPoint,
+    LossFn,
+    ObserverFn,
+    Params,
+    PredictFn,
+    Recorder,
+    RuleFn,
+    Scalar,
+    BufferedParams,
+    Optimizer,
+    StepFn,
+    StepProfiler,
+    StepState,
+    _first_batch,
+    _next_batch,
+    _run_history,
+    _run_states,
+)
+
+Array = np.ndarray
+# Batched data is either the familiar list of (x, y) tuples, which we convert
+# once, a pre-split pair of columns that we use as-is (no copy), or a
+# DataLoader whose minibatches are converted one step at a time.
+BatchData = Iterable[DataPoint] | Tuple[Array, Array] | ArrayDataset | DataLoader
+
+
+def as_columns(data: Any) -> Tuple[Array, Array]:
+    """
+    Normalize training data into contiguous float64 `x` and `y` columns.
+
+    A tuple of two ndarrays or an ArrayDataset (e.g. a memory-mapped file) is
+    treated as already-split columns. Anything else is treated as an iterable
+    of (x, y) points and converted once, up front; points with vector x or y
+    become an (N, D) / (N, K) matrix.
+    """
+
+    if isinstance(data, ArrayDataset):
+        return data.columns()
+    if isinstance(data, tuple) and len(data) == 2 and all(isinstance(c, np.ndarray) for c in data):
+        xs, ys = data
+        if len(xs) != len(ys):
+            raise ValueError("x and y columns must have the same length")
+        return xs, ys
+
+    items = list(data)
+    try:
+        points = np.asarray(items, dtype=np.float64)
+    except ValueError:
+        # Ragged: vector x with scalar y (or vice versa).
+        points = None
+    if points is not None and points.size == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return empty, empty
+    if points is None or points.ndim == 3:
+        if any(len(point) != 2 for point in items):
+            raise ValueError("data must be (x, y) pairs")
+        xs = np.asarray([x for x, _ in items], dtype=np.float64)
+        ys = np.asarray([y for _, y in items], dtype=np.float64)
+        return xs, ys
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("data must be (x, y) pairs")
+    # Copy the columns so each one is contiguous; strided views would make
+    # every vectorized op in the hot loop pay for the stride.
+    return np.ascontiguousarray(points[:, 0]), np.ascontiguousarray(points[:, 1])
+
+
+def _grad_total(value: object, param: object) -> Scalar:
+    # Rules may return per-sample gradient columns or already-reduced
+    # totals. A scalar param's gradient is summed to one float; an array
+    # param's gradient is used as-is when it already has the param's rank,
+    # else it has one row per sample and is summed over them.
+    ndim = np.ndim(param)
+    if not ndim:
+        return float(np.sum(value))
+    if np.ndim(value) == ndim:
+        return np.asarray(value, dtype=np.float64)
+    return np.sum(value, axis=0)
+
+
+def _columns_loss_grads(
+    xs: Array, ys: Array, params: Params, predict: PredictFn, loss: LossFn, rule: RuleFn
+) -> Tuple[Scalar, Mapping[str, Scalar]]:
+    n = float(len(xs))
+    y_hat = predict(xs, params)
+    total_loss = np.sum(loss(y_hat, ys))
+    grads = rule(xs, ys, y_hat, params)
+
+    if isinstance(params, BufferedParams):
+        # Reduce straight into the store's gradient buffer; no per-step dict.
+        params.zero_grad()
+        params.accumulate(grads)
+        return float(total_loss) / n, params.finish_grad(n)
+
+    # Summing per-sample columns mirrors the scalar engine's "sum over
+    # samples, then average" without a Python-level loop.
+    grads_mean: Dict[str, Scalar] = {k: 0.0 for k in params}
+    for name, value in grads.items():
+        grads_mean[name] = _grad_total(value, params[name]) / n
+
+    # Convert back to Python floats so history and StepState look exactly
+    # like the scalar engine's output to every consumer.
+    return float(total_loss) / n, grads_mean
+
+
+def _make_batched_step_fn(
+    data: BatchData, predict: PredictFn, loss: LossFn, rule: RuleFn
+) -> StepFn | None:
+    if isinstance(data, DataLoader):
+        # Streaming minibatches: convert one batch to columns per step, so
+        # only the current batch ever exists as an array.
+        batches, first = _first_batch(data)
+        if first is None:
+            return None
+        pending = [first]
+
+        def stream_step_fn(params: Params) -> Tuple[Scalar, Mapping[str, Scalar]]:
+            xs, ys = as_columns(pending.pop() if pending else _next_batch(batches))
+            return _columns_loss_grads(xs, ys, params, predict, loss, rule)
+
+        return stream_step_fn
+
+    xs, ys = as_columns(data)
+    if len(xs) == 0:
+        return None
+
+    def step_fn(params: Params) -> Tuple[Scalar, Mapping[str, Scalar]]:
+        return _columns_loss_grads(xs, ys, params, predict, loss, rule)
+
+    return step_fn
+
+
+def train_batched(
+    data: BatchData,
+    params: Params,
+    predict: PredictFn,
+    loss: LossFn,
+    rule: RuleFn,
+    *,
+    steps: int,
+    lr: float,
+    observer: ObserverFn | Sequence[ObserverFn] | None = None,
+    recorder: Recorder | None = None,
+    optimizer: Optimizer | None = None,
+    profiler: StepProfiler | None = None,
+) -> List[Scalar]:
+    """
+    Array-backed counterpart of `train()`.
+
+    `predict(xs, params)`, `loss(y_hat, ys)` and `rule(xs, ys, y_hat, params)`
+    receive whole columns and return arrays (or reduced scalars). History
+    and observer snapshots have the same shape as the scalar engine's. A
+    DataLoader makes each step one vectorized minibatch.
+    """
+
+    if steps < 0:
+        raise ValueError("steps must be non-negative")
+    if profiler is not None:
+        predict, loss, rule = profiler.instrument(predict, loss, rule)
+    step_fn = _make_batched_step_fn(data, predict, loss, rule)
+    if step_fn is None:
+        return [0.0 for _ in range(steps)]
+
+    return _run_history(
+        step_fn,
+        params,
+        steps=steps,
+        lr=lr,
+        observer=observer,
+        recorder=recorder,
+        optimizer=optimizer,
+        profiler=profiler,
+    )
+
+
+def train_batched_iter(
+    data: BatchData,
+    params: Params,
+    predict: PredictFn,
+    loss: LossFn,
+    rule: RuleFn,
+    *,
+    steps: int,
+    lr: float,
+    optimizer: Optimizer | None = None,
+    profiler: StepProfiler | None = None,
+) -> Iterator[StepState]:
+    """Array-backed counterpart of `train_iter()`; yields one StepState per step."""
+
+    if steps < 0:
+        raise ValueError("steps must be non-negative")
+    if profiler is not None:
+        predict, loss, rule = profiler.instrument(predict, loss, rule)
+    step_fn = _make_batched_step_fn(data, predict, loss, rule)
+    if step_fn is None:
+        return
+
+    yield from _run_states(
+        step_fn, params, steps=steps, lr=lr, optimizer=optimizer, profiler=profiler
+    )
@@ -0,0 +1,444 @@
+from __future__ import annotations
+
+# Benchmark suite for the training hot loop ("nanotorch-bench").
+#
+# The integration tests use 1-4 points, which says nothing about speed. This
+# suite runs train / train_iter with manual_gradient / finite_difference over
+# synthetic datasets of configurable size and parameter count, and records:
+#
+# - steps_per_sec and latency_ns_per_sample (best of `repeat` timed runs);
+# - peak_memory_bytes: extra memory traced during one step (tracemalloc),
+#   measured in a separate run so tracing overhead never skews the timings;
+# - time_to_target_s / steps_to_target: how long until the mean loss falls
+#   below `target_ratio` times the initial loss.
+#
+# Results are written as JSON. Given a baseline file, every metric is compared
+# against it with a per-metric tolerance, and the command exits non-zero on a
+# regression so CI can gate hot-loop changes.
+#
+# The synthetic model is a P-term weighted sum, y_hat = x * sum_j(w_j * s_j)
+# with fixed scales s_j = 1/(j+1), so per-sample cost grows with P just like
+# a real P-parameter model. The data (y = 2x + noise, x ~ U(-1, 1)) is the
+# noisy_linear scenario family's, so a benchmark at n=10_000_000 sees the
+# same points as `get_scenario("noisy_linear", n=10_000_000, ...)` and the
+# columns are generated once per size.
+#
+# `--startup` measures something else: what a short-lived process pays to
+# import nanotorch (or to print `nanotorch-plot --help`) before doing any
+# work. Each check runs in a fresh interpreter and is timed from inside it,
+# so interpreter start-up and site hooks, which we don't control, are left
+# out. A check fails if it exceeds the budget or loads a heavy module.
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .dataset import ArrayDataset
+from .training import (
+    LossFn,
+    Params,
+    PredictFn,
+    RuleFn,
+    Scalar,
+    StepState,
+    finite_difference,
+    manual_gradient,
+    train,
+    train_iter,
+)
+
+ENGINES = ("train", "train_iter")
+RULES = ("manual", "finite_difference")
+
+# Sizes per preset. "full" covers 1e3..1e7 points and 1..1e4 params; cases
+# whose estimated work exceeds `max_work` are recorded as skipped instead of
+# running for hours in pure Python.
+PRESETS: Dict[str, Dict[str, Any]] = {
+    "smoke": {"sizes": (1_000,), "params": (1, 10), "steps": 3, "max_work": 5e6},
+    "default": {"sizes": (1_000, 10_000, 100_000), "params": (1, 10, 100), "steps": 5, "max_work": 5e7},
+    "full": {
+        "sizes": (1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+        "params": (1, 10, 100, 1_000, 10_000),
+        "steps": 5,
+        "max_work": 1e10,
+    },
+}
+
+# Allowed relative change before a metric counts as a regression, and which
+# direction is "worse".
+DEFAULT_THRESHOLDS: Dict[str, float] = {
+    "steps_per_sec": 0.10,
+    "latency_ns_per_sample": 0.10,
+    "peak_memory_bytes": 0.20,
+    "time_to_target_s": 0.25,
+}
+HIGHER_IS_BETTER = {"steps_per_sec"}
+
+
+# Import-time budget per startup check, in milliseconds.
+STARTUP_BUDGET_MS = 50.0
+STARTUP_CHECKS: Dict[str, str] = {
+    "import nanotorch": "import nanotorch",
+    "nanotorch-plot --help": (
+        "from nanotorch.plotting import main\n"
+        "try:\n    main(['--help'])\nexcept SystemExit:\n    pass"
+    ),
+}
+# Optional subsystems that must only load when actually used.
+HEAVY_MODULES = ("numpy", "matplotlib", "PIL", "nbformat", "nbconvert")
+
+_STARTUP_PROBE = """
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    exec(sys.argv[1])
+elapsed = time.perf_counter() - start
+heavy = [name for name in sys.argv[2:] if name in sys.modules]
+print(json.dumps({"ms": elapsed * 1e3, "heavy": heavy}))
+"""
+
+
+@dataclass(frozen=True)
+class Case:
+    engine: str
+    rule: str
+    n: int
+    p: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.engine}/{self.rule}/n={self.n}/p={self.p}"
+
+    def work(self, steps: int) -> float:
+        # Per-sample cost is O(P) for predict, and finite differences redo
+        # predict once per parameter.
+        per_sample = self.p * (self.p + 1 if self.rule == "finite_difference" else 1)
+        return float(self.n) * per_sample * steps
+
+
+@dataclass
+class CaseResult:
+    name: str
+    engine: str
+    rule: str
+    n: int
+    p: int
+    status: str = "ok"  # ok | skipped
+    steps: int = 0
+    steps_per_sec: float | None = None
+    latency_ns_per_sample: float | None = None
+    peak_memory_bytes: int | None = None
+    time_to_target_s: float | None = None
+    steps_to_target: int | None = None
+
+
+@dataclass(frozen=True)
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return (self.current - self.baseline) / self.baseline
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.metric} {self.baseline:.4g} -> {self.current:.4g} ({self.change:+.1%})"
+
+
+def synthetic(n: int, p: int, *, seed: int = 0) -> Tuple[ArrayDataset, Params, PredictFn, LossFn, Callable]:
+    """Deterministic y = 2x + noise data and a P-parameter weighted-sum model."""
+
+    from .synthetic import noisy_linear
+
+    data = noisy_linear(n=n, seed=seed, noise=0.1, slope=2.0, intercept=0.0, low=-1.0, high=1.0).data
+    names = [f"w{j}" for j in range(p)]
+    scales = [1.0 / (j + 1) for j in range(p)]
+    pairs = list(zip(names, scales))
+
+    def predict(x: Scalar, params: Params) -> Scalar:
+        total = 0.0
+        for name, scale in pairs:
+            total += params[name] * scale
+        return x * total
+
+    def loss(y_hat: Scalar, y: Scalar) -> Scalar:
+        return (y_hat - y) ** 2
+
+    def grad(x: Scalar, y: Scalar, y_hat: Scalar, params: Params) -> Dict[str, Scalar]:
+        g = 2.0 * (y_hat - y) * x
+        return {name: g * scale for name, scale in pairs}
+
+    return data, {name: 0.0 for name in names}, predict, loss, grad
+
+
+class _TargetReached(Exception):
+    pass
+
+
+def _make_rule(rule: str, predict: PredictFn, loss: LossFn, grad: Callable) -> RuleFn:
+    if rule == "manual":
+        return manual_gradient(grad)
+    return finite_difference(predict=predict, loss=loss)
+
+
+def _run(engine: str, data: Any, params: Params, predict: PredictFn, loss: LossFn, rule: RuleFn, steps: int, lr: float) -> None:
+    if engine == "train":
+        train(data, params, predict, loss, rule, steps=steps, lr=lr)
+    else:
+        for _ in train_iter(data, params, predict, loss, rule, steps=steps, lr=lr):
+            pass
+
+
+def _time_to_target(
+    engine: str, data: Any, params: Params, predict: PredictFn, loss: LossFn, rule: RuleFn,
+    *, lr: float, target_ratio: float, max_steps: int,
+) -> Tuple[float | None, int | None]:
+    start = time.perf_counter()
+    target: List[float] = []
+
+    def check(state: StepState) -> None:
+        if not target:
+            target.append(state.loss * target_ratio)
+        elif state.loss <= target[0]:
+            raise _TargetReached(state.step + 1)
+
+    try:
+        if engine == "train":
+            train(data, params, predict, loss, rule, steps=max_steps, lr=lr, observer=check)
+        else:
+            for state in train_iter(data, params, predict, loss, rule, steps=max_steps, lr=lr):
+                check(state)
+    except _TargetReached as reached:
+        return time.perf_counter() - start, reached.args[0]
+    return None, None
+
+
+def run_case(
+    case: Case,
+    *,
+    steps: int,
+    repeat: int = 3,
+    lr: float = 0.5,
+    target_ratio: float = 0.1,
+    target_steps: int = 200,
+    max_work: float = float("inf"),
+) -> CaseResult:
+    """Measure one case; cases over the work budget come back as skipped."""
+
+    result = CaseResult(case.name, case.engine, case.rule, case.n, case.p, steps=steps)
+    if case.work(steps) > max_work:
+        result.status = "skipped"
+        return result
+
+    data, init, predict, loss, grad = synthetic(case.n, case.p)
+    rule = _make_rule(case.rule, predict, loss, grad)
+
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        params = dict(init)
+        start = time.perf_counter()
+        _run(case.engine, data, params, predict, loss, rule, steps, lr)
+        best = min(best, time.perf_counter() - start)
+    result.steps_per_sec = steps / best if best > 0 else float("inf")
+    result.latency_ns_per_sample = best / (steps * case.n) * 1e9
+
+    # Memory in its own run: tracemalloc slows every allocation down.
+    tracemalloc.start()
+    try:
+        _run(case.engine, data, dict(init), predict, loss, rule, 1, lr)
+        result.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    if case.work(target_steps) <= max_work:
+        result.time_to_target_s, result.steps_to_target = _time_to_target(
+            case.engine, data, dict(init), predict, loss, rule,
+            lr=lr, target_ratio=target_ratio, max_steps=target_steps,
+        )
+    return result
+
+
+def cases(sizes: Iterable[int], params: Iterable[int], engines: Iterable[str] = ENGINES, rules: Iterable[str] = RULES) -> List[Case]:
+    return [Case(e, r, n, p) for e in engines for r in rules for n in sizes for p in params]
+
+
+def run_suite(
+    case_list: Sequence[Case],
+    *,
+    steps: int,
+    repeat: int = 3,
+    max_work: float = float("inf"),
+    progress: Callable[[CaseResult], None] | None = None,
+    **options: Any,
+) -> Dict[str, Any]:
+    """Run every case and return the JSON-ready report."""
+
+    results = []
+    for case in case_list:
+        result = run_case(case, steps=steps, repeat=repeat, max_work=max_work, **options)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "steps": steps,
+            "repeat": repeat,
+        },
+        "results": [asdict(r) for r in results],
+    }
+
+
+def compare(
+    current: Mapping[str, Any],
+    baseline: Mapping[str, Any],
+    thresholds: Mapping[str, float] = DEFAULT_THRESHOLDS,
+) -> List[Regression]:
+    """Metrics that got worse than `baseline` by more than their threshold."""
+
+    old = {r["name"]: r for r in baseline.get("results", []) if r.get("status") == "ok"}
+    regressions = []
+    for row in current.get("results", []):
+        before = old.get(row["name"])
+        if before is None or row.get("status") != "ok":
+            continue
+        for metric, tolerance in thresholds.items():
+            a, b = before.get(metric), row.get(metric)
+            if a is None or b is None or a <= 0:
+                continue
+            worse = (a - b) / a if metric in HIGHER_IS_BETTER else (b - a) / a
+            if worse > tolerance:
+                regressions.append(Regression(row["name"], metric, float(a), float(b)))
+    return regressions
+
+
+@dataclass
+class StartupResult:
+    name: str
+    best_ms: float
+    heavy_modules: List[str]
+    budget_ms: float
+
+    @property
+    def ok(self) -> bool:
+        return self.best_ms <= self.budget_ms and not self.heavy_modules
+
+
+def measure_startup(
+    name: str, code: str, *, repeat: int = 5, budget_ms: float = STARTUP_BUDGET_MS
+) -> StartupResult:
+    """Best-of-`repeat` time to run `code` in a fresh interpreter."""
+
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1")
+    best = float("inf")
+    heavy: List[str] = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _STARTUP_PROBE, code, *HEAVY_MODULES],
+            capture_output=True, text=True, check=True,
+        )
+        probe = json.loads(out.stdout.strip().splitlines()[-1])
+        best = min(best, probe["ms"])
+        heavy = probe["heavy"]
+    return StartupResult(name, best, heavy, budget_ms)
+
+
+def startup_suite(*, repeat: int = 5, budget_ms: float = STARTUP_BUDGET_MS) -> List[StartupResult]:
+    return [measure_startup(n, c, repeat=repeat, budget_ms=budget_ms) for n, c in STARTUP_CHECKS.items()]
+
+
+def _parse_threshold(text: str) -> Tuple[str, float]:
+    metric, _, value = text.partition("=")
+    if metric not in DEFAULT_THRESHOLDS or not value:
+        raise argparse.ArgumentTypeError(
+            f"expected METRIC=FRACTION with METRIC in {', '.join(DEFAULT_THRESHOLDS)}"
+        )
+    return metric, float(value)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="nanotorch-bench", description="Benchmark the training hot loop.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="smoke")
+    parser.add_argument("--sizes", type=int, nargs="+", help="dataset sizes (overrides the preset)")
+    parser.add_argument("--params", type=int, nargs="+", help="parameter counts (overrides the preset)")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--rules", nargs="+", choices=RULES, default=list(RULES))
+    parser.add_argument("--steps", type=int, help="timed steps per run (overrides the preset)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case; the best is kept")
+    parser.add_argument("--max-work", type=float, help="skip cases above this many sample*param evaluations")
+    parser.add_argument("--out", type=Path, default=Path("artifacts/bench/results.json"))
+    parser.add_argument("--baseline", type=Path, help="compare against this results file")
+    parser.add_argument("--save-baseline", type=Path, help="also write the results here")
+    parser.add_argument(
+        "--threshold", type=_parse_threshold, action="append", default=[],
+        help="METRIC=FRACTION allowed regression, e.g. steps_per_sec=0.05 (repeatable)",
+    )
+    parser.add_argument("--startup", action="store_true", help="check import-time budgets instead")
+    parser.add_argument("--startup-budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        results = startup_suite(repeat=args.repeat, budget_ms=args.startup_budget_ms)
+        for r in results:
+            extra = f"  loaded {', '.join(r.heavy_modules)}" if r.heavy_modules else ""
+            print(f"{r.name:<24} {r.best_ms:>8.1f} ms (budget {r.budget_ms:.0f} ms)  {'ok' if r.ok else 'OVER'}{extra}")
+        return 0 if all(r.ok for r in results) else 1
+
+    preset = PRESETS[args.preset]
+    steps = args.steps or preset["steps"]
+    case_list = cases(args.sizes or preset["sizes"], args.params or preset["params"], args.engines, args.rules)
+
+    def show(r: CaseResult) -> None:
+        if r.status != "ok":
+            print(f"{r.name:<42} skipped (over --max-work)")
+            return
+        ttt = f"{r.time_to_target_s:.3f}s" if r.time_to_target_s is not None else "-"
+        print(
+            f"{r.name:<42} {r.steps_per_sec:>10.2f} steps/s {r.latency_ns_per_sample:>10.1f} ns/sample"
+            f" {r.peak_memory_bytes / 1024:>9.1f} KiB  target {ttt}"
+        )
+
+    report = run_suite(
+        case_list,
+        steps=steps,
+        repeat=args.repeat,
+        max_work=args.max_work if args.max_work is not None else preset["max_work"],
+        progress=show,
+    )
+    report["meta"]["preset"] = args.preset
+
+    for path in filter(None, (args.out, args.save_baseline)):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"wrote {path}")
+
+    if args.baseline is not None:
+        thresholds = dict(DEFAULT_THRESHOLDS)
+        thresholds.update(dict(args.threshold))
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, thresholds)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"no regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
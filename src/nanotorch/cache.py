@@ -0,0 +1,370 @@
+from __future__ import annotations
+
+# Content-addressed cache of training results.
+#
+# Plots, the notebook and tests often need the outcome of a run that has
+# already happened: the same data, initial params, functions, lr and steps.
+# ResultCache hashes exactly those inputs into a key and keeps the run's
+# trace (loss history plus params/grads per step) in a trace file named after
+# the key. Identical runs are then read back instead of retrained, across
+# processes and kernel restarts.
+#
+# Functions are identified by their compiled code (bytecode, names and
+# constants, recursively), not by object identity or file position. Scenario
+# factories build fresh closures on every call, and notebook cells get new
+# file names on every execution, yet both still hit. Closure cells are
+# hashed by value. A cell we can't hash stably (an arbitrary object)
+# makes the run uncacheable: it is trained and returned, never stored. Globals
+# a function reads are not part of the key; change one and you must clear
+# the cache (or bump `salt`).
+#
+# Concurrency: entries are written to a temporary file and renamed into
+# place, so readers only ever see complete traces. Two processes that miss
+# the same key both train and the second rename wins; the contents are
+# identical. Hits bump the file's mtime, which makes eviction (oldest first,
+# down to `max_bytes` / `max_entries`) least-recently-used.
+#
+# A scenario's standard run uses the scalar engine, except for members of a
+# scenario family (`cache.scenario("noisy_linear", n=10_000_000)`), which are
+# sized for the batched engine and run on it. The engine is part of the key.
+
+import hashlib
+import os
+import random
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping
+
+import numpy as np
+
+from .data import DataLoader
+from .batched import train_batched
+from .dataset import ArrayDataset
+from .params import require_scalars
+from .trace_store import TraceReader, TraceWriter
+from .training import DataPoint, LossFn, PredictFn, RuleFn, Scalar, manual_gradient, train
+
+DEFAULT_ROOT = Path("artifacts/cache")
+SUFFIX = ".nttr"
+ENGINES: Dict[str, Callable[..., Any]] = {"train": train, "train_batched": train_batched}
+
+
+class _Unhashable(Exception):
+    pass
+
+
+def _feed_value(h: Any, value: Any, depth: int) -> None:
+    if value is None or isinstance(value, (bool, int, str, bytes)):
+        h.update(repr(value).encode())
+    elif isinstance(value, float):
+        h.update(struct.pack("<d", value))
+    elif isinstance(value, (tuple, list)):
+        h.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _feed_value(h, item, depth)
+    elif isinstance(value, dict):
+        h.update(f"dict{len(value)}".encode())
+        for key in sorted(value, key=repr):
+            _feed_value(h, key, depth)
+            _feed_value(h, value[key], depth)
+    elif isinstance(value, np.ndarray):
+        h.update(f"{value.dtype.str}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, np.random.Generator):
+        _feed_value(h, value.bit_generator.state, depth)
+    elif isinstance(value, random.Random):
+        _feed_value(h, value.getstate(), depth)
+    elif callable(value) and hasattr(value, "__code__"):
+        _feed_function(h, value, depth + 1)
+    else:
+        raise _Unhashable(type(value).__name__)
+
+
+def _feed_code(h: Any, code: Any) -> None:
+    h.update(code.co_code)
+    h.update(repr((code.co_names, code.co_varnames, code.co_freevars, code.co_argcount)).encode())
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _feed_code(h, const)  # nested function or comprehension
+        else:
+            h.update(repr(const).encode())
+
+
+def _feed_function(h: Any, fn: Callable[..., Any], depth: int = 0) -> None:
+    if depth > 8:
+        raise _Unhashable("closure nesting too deep")
+    code = getattr(fn, "__code__", None)
+    if code is None:
+        raise _Unhashable(type(fn).__name__)
+    _feed_code(h, code)
+    _feed_value(h, fn.__defaults__, depth)
+    _feed_value(h, fn.__kwdefaults__, depth)
+    for cell in fn.__closure__ or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:  # empty cell
+            value = None
+        _feed_value(h, value, depth)
+
+
+def _feed_data(h: Any, data: Any) -> None:
+    if isinstance(data, DataLoader):
+        # A loader's batches depend on its position and RNG; not a fixed input.
+        raise _Unhashable("DataLoader")
+    if isinstance(data, ArrayDataset):
+        xs, ys = (np.asarray(c, dtype=np.float64) for c in data.columns())
+    else:
+        items = list(data)
+        xs = np.asarray([x for x, _ in items], dtype=np.float64)
+        ys = np.asarray([y for _, y in items], dtype=np.float64)
+    if xs.ndim == 1 and ys.ndim == 1:
+        # Scalar points hash as one (N, 2) array, the same for a list or a dataset.
+        points = np.stack([xs, ys], axis=1)
+        h.update(f"data{points.shape}".encode())
+        h.update(points.tobytes())
+        return
+    for column in (xs, ys):
+        column = np.ascontiguousarray(column)
+        h.update(f"column{column.shape}".encode())
+        h.update(column.tobytes())
+
+
+def standard_run(scenario: Any, *, family: bool = False) -> Dict[str, Any]:
+    """
+    ResultCache.run() arguments for a scenario's standard run (manual gradient).
+
+    `family` members run on the batched engine when the scenario has batch
+    functions; everything else runs on the scalar engine.
+    """
+
+    batched = family and scenario.batch_grad is not None
+    return {
+        "data": scenario.data,
+        "params": scenario.params,
+        "predict": scenario.batch_predict if batched else scenario.predict,
+        "loss": scenario.batch_loss if batched else scenario.loss,
+        "rule": manual_gradient(scenario.batch_grad if batched else scenario.grad),
+        "steps": scenario.steps,
+        "lr": scenario.lr,
+        "engine": "train_batched" if batched else "train",
+    }
+
+
+def run_key(
+    data: Iterable[DataPoint] | ArrayDataset,
+    params: Mapping[str, Scalar],
+    predict: PredictFn,
+    loss: LossFn,
+    rule: RuleFn,
+    *,
+    steps: int,
+    lr: float,
+    salt: str = "",
+    engine: str = "train",
+) -> str | None:
+    """Stable hex key for a training run, or None if it can't be keyed safely."""
+
+    h = hashlib.sha256(b"nanotorch-result-v1")
+    try:
+        _feed_data(h, data)
+        # Order matters: it fixes the trace's column order.
+        _feed_value(h, list(params.items()), 0)
+        for fn in (predict, loss, rule):
+            _feed_function(h, fn)
+        _feed_value(h, (steps, float(lr), salt), 0)
+        if engine != "train":  # keeps the scalar engine's existing keys
+            _feed_value(h, engine, 0)
+    except _Unhashable:
+        return None
+    return h.hexdigest()
+
+
+@dataclass
+class CachedRun:
+    """A finished run, served from the cache (`hit`) or just trained."""
+
+    key: str | None
+    trace: TraceReader
+    hit: bool
+
+    @property
+    def history(self) -> List[Scalar]:
+        return self.trace.losses.tolist()
+
+    @property
+    def initial_params(self) -> Dict[str, Scalar]:
+        return dict(self.trace.meta["initial_params"])
+
+    @property
+    def final_params(self) -> Dict[str, Scalar]:
+        # The trace records params after each update, so the last record is
+        # where training ended.
+        return self.trace[-1].params if len(self.trace) else self.initial_params
+
+
+class ResultCache:
+    """
+    On-disk, content-addressed store of training runs.
+
+    `run()` has train()'s signature but leaves the caller's params untouched;
+    read the outcome from the returned CachedRun instead. Eviction keeps the
+    directory under `max_bytes` (and `max_entries`, if set), dropping the
+    least recently used entries first.
+    """
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        *,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_entries: int | None = None,
+        salt: str = "",
+    ) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be positive")
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if root is None:
+            root = os.environ.get("NANOTORCH_CACHE_DIR", DEFAULT_ROOT)
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.salt = salt
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"{key}{SUFFIX}"
+
+    def get(self, key: str) -> TraceReader | None:
+        path = self.path_for(key)
+        try:
+            reader = TraceReader(path)
+            # len() maps the records now, so a concurrent eviction can no
+            # longer pull the file out from under us.
+            if len(reader) != reader.meta.get("steps"):
+                return None
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        return reader
+
+    def run(
+        self,
+        data: Iterable[DataPoint] | ArrayDataset,
+        params: Mapping[str, Scalar],
+        predict: PredictFn,
+        loss: LossFn,
+        rule: RuleFn,
+        *,
+        steps: int,
+        lr: float,
+        engine: str = "train",
+    ) -> CachedRun:
+        if engine not in ENGINES:
+            raise ValueError(f"engine must be one of {', '.join(ENGINES)}")
+        require_scalars(params, "the result cache")
+        key = run_key(data, params, predict, loss, rule, steps=steps, lr=lr, salt=self.salt, engine=engine)
+        if key is not None:
+            reader = self.get(key)
+            if reader is not None:
+                self.hits += 1
+                return CachedRun(key, reader, hit=True)
+        self.misses += 1
+
+        meta = {"key": key, "steps": steps, "lr": lr, "initial_params": dict(params), "engine": engine}
+        # Unique per process and thread, so concurrent writers never share a
+        # temporary file.
+        tmp = self.root / f".{key or 'uncached'}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with TraceWriter(tmp, list(params), meta=meta, flush_every=64) as writer:
+            ENGINES[engine](data, dict(params), predict, loss, rule, steps=steps, lr=lr, recorder=writer)
+        if key is None:
+            # Not cacheable: hand back the trace and drop the file. The
+            # mapping keeps the data readable after the unlink.
+            reader = TraceReader(tmp)
+            len(reader)
+            tmp.unlink(missing_ok=True)
+            return CachedRun(None, reader, hit=False)
+        path = self.path_for(key)
+        os.replace(tmp, path)
+        self.evict(keep=path)
+        return CachedRun(key, TraceReader(path), hit=False)
+
+    def scenario(self, name: str, **params: Any) -> CachedRun:
+        """
+        The registry scenario's standard run (manual gradient), cached.
+
+        Keyword arguments select a member of a scenario family, e.g.
+        cache.scenario("noisy_linear", n=1_000_000).
+        """
+
+        from .scenarios import get_scenario
+
+        scenario = get_scenario(name, **params)
+        return self.run(**standard_run(scenario, family=bool(params)))
+
+    def entries(self) -> List[Path]:
+        """Cached traces, least recently used first."""
+
+        found = []
+        for path in self.root.glob(f"*{SUFFIX}"):
+            try:
+                found.append((path.stat().st_mtime_ns, path))
+            except FileNotFoundError:
+                continue  # evicted by someone else meanwhile
+        return [path for _, path in sorted(found)]
+
+    def size(self) -> int:
+        return sum(path.stat().st_size for path in self.entries() if path.exists())
+
+    def evict(self, *, keep: Path | None = None) -> List[Path]:
+        """Drop least recently used entries until the limits hold; returns them."""
+
+        entries = self.entries()
+        sizes = {}
+        for path in entries:
+            try:
+                sizes[path] = path.stat().st_size
+            except FileNotFoundError:
+                sizes[path] = 0
+        total = sum(sizes.values())
+        count = len(entries)
+        removed = []
+        for path in entries:
+            over = total > self.max_bytes or (self.max_entries is not None and count > self.max_entries)
+            if not over:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue  # e.g. still mapped on Windows; try again next time
+            total -= sizes[path]
+            count -= 1
+            removed.append(path)
+        return removed
+
+    def clear(self) -> None:
+        for path in self.entries():
+            path.unlink(missing_ok=True)
+
+
+_default: ResultCache | None = None
+
+
+def default_cache() -> ResultCache:
+    """Process-wide cache under $NANOTORCH_CACHE_DIR (default artifacts/cache)."""
+
+    global _default
+    if _default is None:
+        _default = ResultCache()
+    return _default
+
+
+def scenario_run(name: str, cache: ResultCache | None = None, **params: Any) -> CachedRun:
+    return (cache or default_cache()).scenario(name, **params)
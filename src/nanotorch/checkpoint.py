@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+# Checkpoints: resumable training runs.
+#
+# train() mutates params in place and otherwise keeps its state in local
+# variables, so an interrupted run starts again from step 0. A Checkpoint
+# captures everything the loop needs to carry on exactly where it stopped:
+#
+#   step       number of completed steps
+#   params     parameter values
+#   history    the loss history so far
+#   optimizer  optimizer.state_dict() (moments, curvature pairs, step count)
+#   rule       rule.state_dict() for stateful rules (e.g. the RNG behind
+#              SPSA / random-direction estimators)
+#   data       DataLoader.state_dict() (epoch, batch and shuffle RNG)
+#
+# Resuming restores all of them before the first new step, so the continued
+# run is bit-identical to one that was never interrupted. A checkpoint also
+# works as a branch point: resume from step N with different settings.
+#
+# File layout: [magic "NTCK" + version][pickle payload]. Pickle keeps floats
+# and NumPy buffers exact and is fast for this kind of small nested state.
+# Loading a pickle can run arbitrary code, so only load checkpoints you wrote.
+# Files are written to a temporary name and renamed into place, so a crash
+# mid-write never leaves a truncated checkpoint behind.
+
+import copy
+import os
+import pickle
+import queue
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, MutableMapping
+
+from .data import DataLoader
+
+MAGIC = b"NTCK"
+VERSION = 1
+_HEADER = struct.Struct("<4sH")
+
+
+@dataclass
+class Checkpoint:
+    """Everything needed to continue a training run after `step` steps."""
+
+    step: int
+    params: Dict[str, float]
+    history: List[float] = field(default_factory=list)
+    optimizer: Any = None
+    rule: Any = None
+    data: Any = None
+
+    def to_bytes(self) -> bytes:
+        return _HEADER.pack(MAGIC, VERSION) + pickle.dumps(self.__dict__, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> Checkpoint:
+        if len(blob) < _HEADER.size:
+            raise ValueError("not a nanotorch checkpoint (file too short)")
+        magic, version = _HEADER.unpack_from(blob)
+        if magic != MAGIC:
+            raise ValueError("not a nanotorch checkpoint (bad magic)")
+        if version != VERSION:
+            raise ValueError(f"unsupported checkpoint version {version}")
+        return cls(**pickle.loads(blob[_HEADER.size :]))
+
+    def save(self, path: str | Path) -> Path:
+        return _write_atomic(Path(path), self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str | Path) -> Checkpoint:
+        return cls.from_bytes(Path(path).read_bytes())
+
+
+def _write_atomic(path: Path, blob: bytes) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(blob)
+    os.replace(tmp, path)
+    return path
+
+
+def _state_of(obj: Any) -> Any:
+    state_dict = getattr(obj, "state_dict", None)
+    return state_dict() if callable(state_dict) else None
+
+
+def capture(
+    step: int,
+    params: Mapping[str, float],
+    history: List[float],
+    *,
+    optimizer: Any = None,
+    rule: Any = None,
+    data: Any = None,
+) -> Checkpoint:
+    """Snapshot a run after `step` completed steps."""
+
+    return Checkpoint(
+        step=step,
+        # Array params are updated in place; copy them out of the live run.
+        params={name: copy.copy(value) for name, value in params.items()},
+        history=list(history),
+        optimizer=_state_of(optimizer),
+        rule=_state_of(rule),
+        data=data.state_dict() if isinstance(data, DataLoader) else None,
+    )
+
+
+def _load_into(obj: Any, state: Any, what: str) -> None:
+    load = getattr(obj, "load_state_dict", None)
+    if state is None and not callable(load):
+        return
+    if state is None:
+        raise ValueError(f"the checkpoint has no {what} state to restore into the {what} passed in")
+    if not callable(load):
+        raise ValueError(f"the checkpoint has {what} state; pass the same kind of {what} to resume")
+    load(state)
+
+
+def restore(
+    checkpoint: Checkpoint,
+    params: MutableMapping[str, float],
+    *,
+    optimizer: Any = None,
+    rule: Any = None,
+    data: Any = None,
+) -> None:
+    """Load a checkpoint into the objects of a run that is about to continue."""
+
+    if set(checkpoint.params) != set(params):
+        raise ValueError(
+            f"checkpoint params {sorted(checkpoint.params)} don't match params {sorted(params)}"
+        )
+    for name in params:
+        # Copied so the run can't write through into the checkpoint, which
+        # may be resumed from again.
+        params[name] = copy.copy(checkpoint.params[name])
+    _load_into(optimizer, checkpoint.optimizer, "optimizer")
+    _load_into(rule, checkpoint.rule, "rule")
+    if isinstance(data, DataLoader):
+        _load_into(data, checkpoint.data, "DataLoader")
+    elif checkpoint.data is not None:
+        raise ValueError("the checkpoint has a DataLoader position; pass a DataLoader to resume")
+
+
+def as_checkpoint(resume: Checkpoint | str | Path) -> Checkpoint:
+    return resume if isinstance(resume, Checkpoint) else Checkpoint.load(resume)
+
+
+class Checkpointer:
+    """
+    Write checkpoints every `every_steps` steps and/or `every_seconds` seconds.
+
+    Pass it as `train(..., checkpoint=Checkpointer("runs/ckpt", every_steps=100))`.
+    Files are named `step-<N>.ckpt` inside `directory`. `keep` bounds how many
+    of the newest files are kept (None keeps all, so any step can be branched
+    from). With `async_write=True`, the state is serialized on the training
+    thread, which keeps the snapshot consistent, and a background thread
+    writes it to disk.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        every_steps: int | None = None,
+        every_seconds: float | None = None,
+        async_write: bool = False,
+        keep: int | None = None,
+    ) -> None:
+        if every_steps is None and every_seconds is None:
+            raise ValueError("pass every_steps and/or every_seconds")
+        if every_steps is not None and every_steps < 1:
+            raise ValueError("every_steps must be at least 1")
+        if every_seconds is not None and every_seconds <= 0:
+            raise ValueError("every_seconds must be positive")
+        if keep is not None and keep < 1:
+            raise ValueError("keep must be at least 1")
+
+        self.directory = Path(directory)
+        self.every_steps = every_steps
+        self.every_seconds = every_seconds
+        self.async_write = async_write
+        self.keep = keep
+        self._last_save = time.monotonic()
+        self._run: Dict[str, Any] = {}
+        self._queue: queue.Queue[tuple[Path, bytes] | None] | None = None
+        self._writer: threading.Thread | None = None
+        self._error: BaseException | None = None
+
+    # -- Hooks used by the training loop -------------------------------------------
+
+    def attach(self, params: Mapping[str, float], *, optimizer: Any = None, rule: Any = None, data: Any = None) -> None:
+        """Bind the objects of the run whose state is captured at each save."""
+
+        if isinstance(data, DataLoader):
+            data.state_dict()  # fail now, not hours in, if the loader can't resume
+        self._run = {"params": params, "optimizer": optimizer, "rule": rule, "data": data}
+        self._last_save = time.monotonic()
+
+    def due(self, step: int) -> bool:
+        if self.every_steps is not None and step % self.every_steps == 0:
+            return True
+        return self.every_seconds is not None and time.monotonic() - self._last_save >= self.every_seconds
+
+    def after_step(self, step: int, history: List[float]) -> None:
+        if self.due(step):
+            run = self._run
+            self.save(
+                capture(step, run["params"], history, optimizer=run["optimizer"], rule=run["rule"], data=run["data"])
+            )
+
+    # -- Files ------------------------------------------------------------------------
+
+    def path_for(self, step: int) -> Path:
+        return self.directory / f"step-{step:09d}.ckpt"
+
+    def paths(self) -> List[Path]:
+        """Checkpoint files in step order."""
+
+        return sorted(self.directory.glob("step-*.ckpt"))
+
+    def latest(self) -> Path | None:
+        self.flush()
+        paths = self.paths()
+        return paths[-1] if paths else None
+
+    def save(self, checkpoint: Checkpoint) -> Path:
+        path = self.path_for(checkpoint.step)
+        blob = checkpoint.to_bytes()
+        self._last_save = time.monotonic()
+        if not self.async_write:
+            _write_atomic(path, blob)
+            self._prune()
+            return path
+
+        self._raise_pending()
+        if self._writer is None:
+            # maxsize=1: if the disk can't keep up, the loop waits for the
+            # previous write instead of piling up snapshots in memory.
+            self._queue = queue.Queue(maxsize=1)
+            self._writer = threading.Thread(target=self._write_loop, name="nanotorch-checkpoint", daemon=True)
+            self._writer.start()
+        assert self._queue is not None
+        self._queue.put((path, blob))
+        return path
+
+    def _write_loop(self) -> None:
+        assert self._queue is not None
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is None:
+                    _write_atomic(*item)
+                    self._prune()
+            except BaseException as exc:  # surfaced on the training thread
+                self._error = exc
+            finally:
+                self._queue.task_done()
+
+    def _prune(self) -> None:
+        if self.keep is None:
+            return
+        for stale in self.paths()[: -self.keep]:
+            stale.unlink(missing_ok=True)
+
+    def _raise_pending(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("writing a checkpoint failed") from error
+
+    def flush(self) -> None:
+        """Wait until every queued checkpoint is on disk."""
+
+        if self._queue is not None:
+            self._queue.join()
+        self._raise_pending()
+
+    def close(self) -> None:
+        if self._writer is not None and self._queue is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = self._queue = None
+        self._raise_pending()
@@ -0,0 +1,588 @@
+from __future__ import annotations
+
+# Step-kernel compiler.
+#
+# The generic loop is built for readability. Each sample goes through
+# predict(), loss() and the rule wrapper around grad(), and each of those
+# does string-keyed param lookups and returns a fresh dict. For a two-param
+# linear model that indirection is almost all of the cost.
+#
+# Here we run predict/loss/grad once on symbolic stand-ins (`_Sym`) that
+# record every arithmetic operation into an expression DAG. From that DAG we
+# generate plain Python source in which each param is a local variable and
+# each intermediate value is a temp. The source is exec'd into two kernels:
+#
+# - `step(data, p0, p1, ...)`: one full pass returning the loss sum and
+#   per-param gradient sums. It backs a StepFn, so observers, recorders and
+#   optimizers still work.
+# - `train(data, p0, ..., lr, steps, n)`: the whole loop (forward, loss,
+#   gradient, update) fused into one function, for the common case with no
+#   hooks attached.
+#
+# The generated code evaluates the same operations in the same order as the
+# closures, so histories match the generic loop exactly. When only predict
+# and loss are given, gradients are derived symbolically from the DAG
+# (reverse mode, like nanotorch.autodiff, but at compile time).
+#
+# Tracing fails on anything the DAG can't represent: branching on a traced
+# value, math.* calls, other non-arithmetic operations. Then
+# train_compiled() quietly falls back to train().
+
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .data import DataLoader
+from .dataset import ArrayDataset
+from .training import (
+    BufferedParams,
+    DataPoint,
+    GradFn,
+    LossFn,
+    ObserverFn,
+    Optimizer,
+    Params,
+    PredictFn,
+    Recorder,
+    Scalar,
+    StepFn,
+    _first_batch,
+    _next_batch,
+    _run_history,
+    manual_gradient,
+    train,
+)
+
+
+class CompileError(ValueError):
+    """predict/loss/grad could not be traced into a kernel."""
+
+
+class _Trace:
+    """Hash-consing node table: structurally equal expressions share one node."""
+
+    def __init__(self) -> None:
+        self.nodes: List[_Sym] = []
+        self._table: Dict[Tuple[Any, ...], _Sym] = {}
+
+    def node(self, op: str, args: Tuple[_Sym, ...] = (), value: Any = None) -> _Sym:
+        key = (op, tuple(id(a) for a in args), value)
+        found = self._table.get(key)
+        if found is None:
+            found = _Sym(self, op, args, value)
+            self._table[key] = found
+            self.nodes.append(found)
+        return found
+
+    def const(self, value: float) -> _Sym:
+        return self.node("const", value=float(value))
+
+    def lift(self, value: object) -> _Sym:
+        if isinstance(value, _Sym):
+            if value.trace is not self:
+                raise CompileError("value from a different trace")
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return self.const(value)
+        raise CompileError(f"can't trace a value of type {type(value).__name__}")
+
+
+class _Sym:
+    __slots__ = ("trace", "op", "args", "value", "depends")
+
+    def __init__(self, trace: _Trace, op: str, args: Tuple[_Sym, ...], value: Any) -> None:
+        self.trace = trace
+        self.op = op
+        self.args = args
+        self.value = value
+        # Whether the value varies per sample (involves x or y); the NumPy
+        # kernel needs this to sum constants correctly over a column.
+        self.depends = op == "input" and value in ("x", "y") or any(a.depends for a in args)
+
+    def _is(self, c: float) -> bool:
+        return self.op == "const" and self.value == c
+
+    # -- Arithmetic, with the simplifications that keep derived grads tidy --
+
+    def _binary(self, op: str, other: object, reverse: bool = False) -> _Sym:
+        t = self.trace
+        a, b = (t.lift(other), self) if reverse else (self, t.lift(other))
+        if a.op == "const" and b.op == "const":
+            return t.const(_FOLD[op](a.value, b.value))
+        if op == "add":
+            if a._is(0.0):
+                return b
+            if b._is(0.0):
+                return a
+        elif op == "sub":
+            if b._is(0.0):
+                return a
+        elif op == "mul":
+            if a._is(0.0) or b._is(0.0):
+                return t.const(0.0)
+            if a._is(1.0):
+                return b
+            if b._is(1.0):
+                return a
+        elif op == "div" and b._is(1.0):
+            return a
+        return t.node(op, (a, b))
+
+    def __add__(self, o: object) -> _Sym:
+        return self._binary("add", o)
+
+    def __radd__(self, o: object) -> _Sym:
+        return self._binary("add", o, reverse=True)
+
+    def __sub__(self, o: object) -> _Sym:
+        return self._binary("sub", o)
+
+    def __rsub__(self, o: object) -> _Sym:
+        return self._binary("sub", o, reverse=True)
+
+    def __mul__(self, o: object) -> _Sym:
+        return self._binary("mul", o)
+
+    def __rmul__(self, o: object) -> _Sym:
+        return self._binary("mul", o, reverse=True)
+
+    def __truediv__(self, o: object) -> _Sym:
+        return self._binary("div", o)
+
+    def __rtruediv__(self, o: object) -> _Sym:
+        return self._binary("div", o, reverse=True)
+
+    def __pow__(self, o: object) -> _Sym:
+        exponent = self.trace.lift(o)
+        if exponent.op != "const":
+            raise CompileError("only constant exponents can be compiled")
+        if exponent.value == 1.0:
+            return self
+        return self.trace.node("pow", (self, exponent))
+
+    def __neg__(self) -> _Sym:
+        return self.trace.node("neg", (self,))
+
+    def __pos__(self) -> _Sym:
+        return self
+
+    def __abs__(self) -> _Sym:
+        return self.trace.node("abs", (self,))
+
+    def __bool__(self) -> bool:
+        raise CompileError("control flow on a traced value can't be compiled")
+
+    def __lt__(self, other: object) -> bool:
+        raise CompileError("comparing a traced value can't be compiled")
+
+    # == and != too: left to object identity, `p["w"] == 0.0` would be traced
+    # as a constant False and compile the wrong branch.
+    __le__ = __gt__ = __ge__ = __eq__ = __ne__ = __lt__
+    # Defining __eq__ drops the default hash; hash-consing needs it back.
+    __hash__ = object.__hash__
+
+    def __float__(self) -> float:
+        raise CompileError("converting a traced value to float can't be compiled")
+
+
+_FOLD: Dict[str, Callable[[float, float], float]] = {
+    "add": lambda a, b: a + b,
+    "sub": lambda a, b: a - b,
+    "mul": lambda a, b: a * b,
+    "div": lambda a, b: a / b,
+}
+
+
+class _ParamProxy(Mapping[str, _Sym]):
+    # What predict/grad see instead of the params dict. Read-only: a rule
+    # that writes to params (like the finite-difference one) isn't traceable.
+    def __init__(self, syms: Dict[str, _Sym]) -> None:
+        self._syms = syms
+
+    def __getitem__(self, name: str) -> _Sym:
+        return self._syms[name]
+
+    def __iter__(self):
+        return iter(self._syms)
+
+    def __len__(self) -> int:
+        return len(self._syms)
+
+
+def _derive(loss_node: _Sym, wrt: Sequence[_Sym]) -> List[_Sym]:
+    """Reverse-mode differentiation over the DAG, producing new expression nodes."""
+
+    t = loss_node.trace
+    adjoint: Dict[int, _Sym] = {id(loss_node): t.const(1.0)}
+
+    def push(node: _Sym, contrib: _Sym) -> None:
+        prev = adjoint.get(id(node))
+        adjoint[id(node)] = contrib if prev is None else prev + contrib
+
+    # Node creation order is a topological order, so a reverse scan visits
+    # each node after everything that consumes it.
+    for node in reversed(list(t.nodes)):
+        g = adjoint.get(id(node))
+        if g is None or not node.args:
+            continue
+        if node.op == "add":
+            a, b = node.args
+            push(a, g)
+            push(b, g)
+        elif node.op == "sub":
+            a, b = node.args
+            push(a, g)
+            push(b, -g)
+        elif node.op == "mul":
+            a, b = node.args
+            push(a, g * b)
+            push(b, g * a)
+        elif node.op == "div":
+            a, b = node.args
+            push(a, g / b)
+            push(b, -(g * a) / (b * b))
+        elif node.op == "pow":
+            a, c = node.args
+            push(a, g * c.value * a ** (c.value - 1.0))
+        elif node.op == "neg":
+            push(node.args[0], -g)
+        elif node.op == "abs":
+            push(node.args[0], g * t.node("sign", (node.args[0],)))
+        elif node.op == "sign":
+            continue  # derivative is zero almost everywhere
+        else:
+            raise CompileError(f"can't differentiate '{node.op}'")
+    return [adjoint.get(id(w), t.const(0.0)) for w in wrt]
+
+
+_TEMPLATES: Dict[str, str] = {
+    "add": "{0} + {1}",
+    "sub": "{0} - {1}",
+    "mul": "{0} * {1}",
+    "div": "{0} / {1}",
+    "pow": "{0} ** {1}",
+    "neg": "-{0}",
+    "abs": "abs({0})",
+}
+
+
+def _emit(outputs: Sequence[_Sym], names: Dict[int, str], vectorized: bool) -> List[str]:
+    """Straight-line code computing `outputs`, one temp per needed node."""
+
+    needed: Dict[int, _Sym] = {}
+    stack = list(outputs)
+    while stack:
+        node = stack.pop()
+        if id(node) in needed or node.op in ("const", "input"):
+            continue
+        needed[id(node)] = node
+        stack.extend(node.args)
+
+    lines = []
+    # Creation order of the trace is a valid evaluation order, and it mirrors
+    # the order the user's closures performed the operations in.
+    for node in list(outputs[0].trace.nodes):
+        if id(node) not in needed:
+            continue
+        args = [_ref(a, names) for a in node.args]
+        if node.op == "sign":
+            expr = f"np.sign({args[0]})" if vectorized else f"(({args[0]}) > 0) - (({args[0]}) < 0)"
+        else:
+            expr = _TEMPLATES[node.op].format(*args)
+        names[id(node)] = f"t{len(names)}"
+        lines.append(f"{names[id(node)]} = {expr}")
+    return lines
+
+
+def _ref(node: _Sym, names: Dict[int, str]) -> str:
+    if node.op == "const":
+        if not math.isfinite(node.value):
+            raise CompileError("non-finite constant in the traced expression")
+        return repr(node.value) if node.value >= 0 else f"({node.value!r})"
+    return names[id(node)]
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    """Generated kernels for one predict/loss/grad combination."""
+
+    names: Tuple[str, ...]
+    source: str
+    vectorized: bool
+    step: Callable[..., Tuple[Scalar, ...]]
+    train: Callable[..., Tuple[List[Scalar], Tuple[Scalar, ...]]]
+
+    def step_fn(self, data: Any) -> StepFn:
+        """A StepFn over a fixed dataset (a list of points, or (xs, ys) columns when vectorized)."""
+
+        kernel, names = self.step, self.names
+        n = float(len(data[0]) if self.vectorized else len(data))
+
+        def step_fn(params: Params) -> Tuple[Scalar, Mapping[str, Scalar]]:
+            total, *sums = kernel(data, *[params[name] for name in names])
+            return _finish(params, names, total, sums, n)
+
+        return step_fn
+
+
+def _finish(
+    params: Params, names: Tuple[str, ...], total: Scalar, sums: List[Scalar], n: float
+) -> Tuple[Scalar, Mapping[str, Scalar]]:
+    if isinstance(params, BufferedParams):
+        params.zero_grad()
+        params.accumulate(dict(zip(names, sums)))
+        return total / n, params.finish_grad(n)
+    return total / n, {name: s / n for name, s in zip(names, sums)}
+
+
+def _generate(
+    predict: PredictFn, loss: LossFn, grad: GradFn | None, names: Tuple[str, ...], vectorized: bool
+) -> CompiledStep:
+    t = _Trace()
+    x, y = t.node("input", value="x"), t.node("input", value="y")
+    params = {name: t.node("input", value=f"p{i}") for i, name in enumerate(names)}
+
+    try:
+        y_hat = t.lift(predict(x, _ParamProxy(params)))
+        loss_node = t.lift(loss(y_hat, y))
+        if grad is not None:
+            result = grad(x, y, y_hat, _ParamProxy(params))
+            grads = [t.lift(result.get(name, 0.0)) for name in names]
+        else:
+            grads = _derive(loss_node, [params[name] for name in names])
+    except CompileError:
+        raise
+    except Exception as exc:  # the closure did something we can't trace
+        raise CompileError(f"tracing failed: {type(exc).__name__}: {exc}") from exc
+
+    refs: Dict[int, str] = {id(x): "x", id(y): "y"}
+    refs.update({id(s): f"p{i}" for i, s in enumerate(params.values())})
+    body = _emit([loss_node, *grads], refs, vectorized)
+    outs = [_ref(loss_node, refs)] + [_ref(g, refs) for g in grads]
+    slots = [f"p{i}" for i in range(len(names))]
+    sums = [f"g{i}" for i in range(len(names))]
+    args = ", ".join(slots)
+
+    if vectorized:
+        # Whole columns at once; constants are broadcast so they sum over N.
+        def total(expr: str, node: _Sym) -> str:
+            return f"float(np.sum({expr}))" if node.depends else f"float({expr}) * x.shape[0]"
+
+        reduce = [f"total = {total(outs[0], loss_node)}"] + [
+            f"{s} = {total(o, g)}" for s, o, g in zip(sums, outs[1:], grads)
+        ]
+        step_src = [f"def step(data, {args}):", "    x, y = data"]
+        step_src += [f"    {line}" for line in body + reduce]
+        train_src = [f"def train(data, {args}, lr, steps, n):", "    x, y = data", "    history = []"]
+        train_src += ["    for _ in range(steps):"]
+        train_src += [f"        {line}" for line in body + reduce]
+    else:
+        # Same accumulation order as the generic loop: sum per sample, then
+        # divide by N once.
+        init = ["total = 0.0"] + [f"{s} = 0.0" for s in sums]
+        accumulate = [f"total += {outs[0]}"] + [f"{s} += {o}" for s, o in zip(sums, outs[1:])]
+        step_src = [f"def step(data, {args}):"] + [f"    {line}" for line in init]
+        step_src += ["    for x, y in data:"] + [f"        {line}" for line in body + accumulate]
+        train_src = [f"def train(data, {args}, lr, steps, n):", "    history = []"]
+        train_src += ["    for _ in range(steps):"] + [f"        {line}" for line in init]
+        train_src += ["        for x, y in data:"] + [f"            {line}" for line in body + accumulate]
+
+    step_src.append(f"    return (total, {', '.join(sums)})")
+    train_src.append("        history.append(total / n)")
+    train_src += [f"        {p} -= lr * ({s} / n)" for p, s in zip(slots, sums)]
+    train_src.append(f"    return history, ({args},)")
+
+    source = "\n".join(step_src + [""] + train_src) + "\n"
+    namespace: Dict[str, Any] = {"np": np}
+    exec(compile(source, f"<nanotorch kernel {names}>", "exec"), namespace)
+    return CompiledStep(names, source, vectorized, namespace["step"], namespace["train"])
+
+
+# -- Cache ----------------------------------------------------------------------
+
+_CACHE: Dict[Tuple[Any, ...], CompiledStep] = {}
+
+
+def _global_names(code: Any) -> List[str]:
+    names = list(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, "co_names"):
+            names += _global_names(const)  # nested function or comprehension
+    return names
+
+
+def _value_print(value: Any, depth: int) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, tuple):
+        items = [_value_print(v, depth) for v in value]
+        return None if any(i is None and v is not None for i, v in zip(items, value)) else ("tuple", *items)
+    if isinstance(value, type(math)):
+        return ("module", value.__name__)
+    if callable(value):
+        return _fingerprint(value, depth + 1)
+    return None
+
+
+def _fingerprint(fn: Callable[..., Any], depth: int = 0) -> Tuple[Any, ...] | None:
+    # Scenario factories build fresh closures every call, so identity would
+    # never hit. Everything the trace can bake into a kernel identifies it:
+    # the code, defaults, closure cells and the globals the code reads (as
+    # in cache._feed_function). Anything richer returns None: not safely
+    # cacheable.
+    code = getattr(fn, "__code__", None)
+    if code is None or depth > 8:
+        return None
+    values: List[Any] = list(getattr(fn, "__defaults__", None) or ())
+    values += sorted((getattr(fn, "__kwdefaults__", None) or {}).items())
+    for cell in getattr(fn, "__closure__", None) or ():
+        try:
+            values.append(cell.cell_contents)
+        except ValueError:
+            values.append(None)  # empty cell
+    namespace = getattr(fn, "__globals__", {})
+    read = sorted({name for name in _global_names(code) if name in namespace})
+    values += [(name, namespace[name]) for name in read]
+
+    prints: List[Any] = []
+    for value in values:
+        printed = _value_print(value, depth)
+        if printed is None and value is not None:
+            return None
+        prints.append(printed)
+    return (code, tuple(prints))
+
+
+def compile_step(
+    predict: PredictFn,
+    loss: LossFn,
+    grad: GradFn | None,
+    names: Iterable[str],
+    *,
+    vectorized: bool = False,
+) -> CompiledStep:
+    """
+    Trace predict/loss/grad and return cached generated kernels.
+
+    `grad` is a per-sample gradient function (as in manual_gradient); pass
+    None to derive gradients from predict/loss. Raises CompileError if the
+    functions can't be traced.
+    """
+
+    names = tuple(names)
+    prints = [_fingerprint(predict), _fingerprint(loss), _fingerprint(grad) if grad else ("derive",)]
+    if any(p is None for p in prints):
+        return _generate(predict, loss, grad, names, vectorized)
+    key = (*prints, names, vectorized)
+    compiled = _CACHE.get(key)
+    if compiled is None:
+        compiled = _CACHE[key] = _generate(predict, loss, grad, names, vectorized)
+    return compiled
+
+
+def compile_scenario(scenario: Any, *, vectorized: bool = False) -> CompiledStep | None:
+    """Kernels for a registry scenario, or None if it can't be compiled."""
+
+    try:
+        return compile_step(scenario.predict, scenario.loss, scenario.grad, scenario.params, vectorized=vectorized)
+    except CompileError:
+        return None
+
+
+def _columns(data: Any) -> Tuple[np.ndarray, np.ndarray] | None:
+    if isinstance(data, ArrayDataset):
+        return data.columns()
+    if isinstance(data, tuple) and len(data) == 2 and all(isinstance(c, np.ndarray) for c in data):
+        return data
+    return None
+
+
+def train_compiled(
+    data: Iterable[DataPoint] | DataLoader | ArrayDataset | Tuple[np.ndarray, np.ndarray],
+    params: Params,
+    predict: PredictFn,
+    loss: LossFn,
+    grad: GradFn | None = None,
+    *,
+    steps: int,
+    lr: float,
+    observer: ObserverFn | Sequence[ObserverFn] | None = None,
+    recorder: Recorder | None = None,
+    optimizer: Optimizer | None = None,
+    vectorized: bool | None = None,
+    strict: bool = False,
+) -> List[Scalar]:
+    """
+    `train()` through a compiled kernel, with the same history and params.
+
+    Without observer/recorder/optimizer the whole loop runs in one generated
+    function. With them, the compiled step plugs into the shared driver.
+
+    Array data (ArrayDataset or (xs, ys) columns) gets the NumPy kernel;
+    `vectorized=True` converts point lists to columns once to use it too.
+    The Python kernel reproduces train() bit for bit, while the NumPy one
+    matches up to summation order. If tracing fails, this falls back to
+    train() unless `strict=True`.
+    """
+
+    if steps < 0:
+        raise ValueError("steps must be non-negative")
+    columns = None if isinstance(data, DataLoader) else _columns(data)
+    if vectorized and columns is None and not isinstance(data, DataLoader):
+        from .batched import as_columns
+
+        columns = as_columns(data)
+    elif vectorized is False and columns is not None:
+        data, columns = list(zip(columns[0].tolist(), columns[1].tolist())), None
+    try:
+        compiled = compile_step(predict, loss, grad, params, vectorized=columns is not None)
+    except CompileError:
+        if strict:
+            raise
+        if grad is not None:
+            rule = manual_gradient(grad)
+        else:
+            from .autodiff import autodiff
+
+            rule = autodiff(predict=predict, loss=loss)
+        if columns is not None:
+            data = list(zip(columns[0].tolist(), columns[1].tolist()))
+        return train(
+            data, params, predict, loss, rule, steps=steps, lr=lr,
+            observer=observer, recorder=recorder, optimizer=optimizer,
+        )
+
+    if isinstance(data, DataLoader):
+        batches, first = _first_batch(data)
+        if first is None:
+            return [0.0 for _ in range(steps)]
+        pending = [first]
+
+        def stream_step_fn(p: Params) -> Tuple[Scalar, Mapping[str, Scalar]]:
+            batch = pending.pop() if pending else _next_batch(batches)
+            return compiled.step_fn(batch)(p)
+
+        step_fn: StepFn = stream_step_fn
+    else:
+        if columns is None:
+            data = data if isinstance(data, Sequence) else list(data)
+        prepared = columns if columns is not None else data
+        n = len(prepared[0]) if columns is not None else len(prepared)
+        if n == 0:
+            return [0.0 for _ in range(steps)]
+
+        if observer is None and recorder is None and optimizer is None:
+            names = compiled.names
+            history, values = compiled.train(
+                prepared, *[params[name] for name in names], lr, steps, float(n)
+            )
+            for name, value in zip(names, values):
+                params[name] = value
+            return history
+        step_fn = compiled.step_fn(prepared)
+
+    return _run_history(
+        step_fn, params, steps=steps, lr=lr, observer=observer, recorder=recorder, optimizer=optimizer
+    )
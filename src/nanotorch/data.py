@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+# Streaming minibatch pipeline.
+#
+# train()/train_iter() materialize `list(data)` and take one full-batch step
+# per iteration. That is the clearest possible loop, but it means every point
+# lives in memory as a Python tuple before step 0. A DataLoader instead pulls
+# points lazily from its source and hands the loop one fixed-size minibatch
+# per step, so memory stays proportional to batch_size + shuffle_buffer no
+# matter how large the dataset is.
+#
+# This module stays pure Python on purpose: the scalar engine can use it
+# without pulling in NumPy.
+
+import csv
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Tuple, TypeVar
+
+Scalar = float
+DataPoint = Tuple[Scalar, Scalar]
+# A source is anything we can turn into a fresh iterator of (x, y) once per
+# epoch: a re-iterable collection, a zero-arg generator factory, or a CSV path.
+Source = Iterable[DataPoint] | Callable[[], Iterable[DataPoint]] | str | Path
+T = TypeVar("T")
+
+
+def read_csv(path: str | Path) -> Iterator[DataPoint]:
+    """
+    Stream (x, y) pairs from a two-column CSV file, one row at a time.
+
+    A leading row that doesn't parse as numbers is treated as a header and
+    skipped; later unparsable rows are real errors and raise.
+    """
+
+    with open(path, newline="") as handle:
+        for index, row in enumerate(csv.reader(handle)):
+            if not row:
+                continue
+            try:
+                values = [float(v) for v in row]
+            except ValueError:
+                if index == 0:
+                    continue
+                values = []
+            # Exactly two fields, like csv_to_dataset: extra columns are an
+            # error, not silently dropped.
+            if len(values) != 2:
+                raise ValueError(f"{path}:{index + 1}: expected two numeric columns, got {row!r}")
+            yield values[0], values[1]
+
+
+@dataclass
+class PrefetchStats:
+    """
+    Where a prefetched pipeline spent its waiting time.
+
+    `starved` counts batches the trainer had to wait for (queue empty), and
+    `wait_seconds` is the total time it waited: both high means the run is
+    I/O-bound. `producer_blocked_seconds` is how long the loader sat on a full
+    queue waiting for the trainer: high means the run is compute-bound.
+    """
+
+    batches: int = 0
+    starved: int = 0
+    wait_seconds: float = 0.0
+    producer_blocked_seconds: float = 0.0
+
+    @property
+    def starvation_rate(self) -> float:
+        return self.starved / self.batches if self.batches else 0.0
+
+    @property
+    def bound(self) -> str:
+        return "io" if self.wait_seconds > self.producer_blocked_seconds else "compute"
+
+
+# Queue markers. Instances of private classes, so no item the source yields
+# can be mistaken for one (and comparing markers never touches the payload,
+# e.g. an ndarray batch). They pickle, which the process mode needs.
+class _Done:
+    pass
+
+
+class _Failure:
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+def _put(q: Any, item: Any, stop: Any) -> bool:
+    # Block on a full queue, but keep checking `stop` so an early close never
+    # waits on a consumer that has gone away. False if told to stop.
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce(
+    produce: Callable[[], Iterable[Any]], q: Any, stop: Any, blocked: Callable[[float], None]
+) -> None:
+    # Runs in the background thread/process: decode and batch ahead of the
+    # trainer, blocking (and timing the block) whenever the queue is full.
+    try:
+        for item in produce():
+            start = time.perf_counter()
+            if not _put(q, item, stop):
+                return
+            blocked(time.perf_counter() - start)
+        _put(q, _Done(), stop)
+    except BaseException as exc:  # forwarded to the consumer, not swallowed
+        _put(q, _Failure(repr(exc)), stop)
+
+
+class Prefetcher(Generic[T]):
+    """
+    Run an iterator in a background thread or process behind a bounded queue.
+
+    The producer works up to `depth` items ahead of the consumer, so loading
+    and batching the next chunk overlaps with training on the current one.
+    `mode="process"` sidesteps the GIL for CPU-heavy decoding; items must
+    then be picklable.
+    """
+
+    def __init__(self, produce: Callable[[], Iterable[T]], *, depth: int = 2, mode: str = "thread") -> None:
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        if mode not in ("thread", "process"):
+            raise ValueError("mode must be 'thread' or 'process'")
+        self.produce = produce
+        self.depth = depth
+        self.mode = mode
+        self.stats = PrefetchStats()
+
+    def __iter__(self) -> Iterator[T]:
+        stats = self.stats
+        if self.mode == "thread":
+            q: Any = queue.Queue(maxsize=self.depth)
+            stop: Any = threading.Event()
+
+            def blocked(seconds: float) -> None:
+                stats.producer_blocked_seconds += seconds
+
+            worker: Any = threading.Thread(target=_produce, args=(self.produce, q, stop, blocked), daemon=True)
+            shared_blocked = None
+        else:
+            # Imported here: multiprocessing is a noticeable share of the
+            # package's import time and only process prefetch needs it.
+            import multiprocessing as mp
+
+            ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else None)
+            q = ctx.Queue(maxsize=self.depth)
+            stop = ctx.Event()
+            shared_blocked = ctx.Value("d", 0.0)
+            worker = ctx.Process(
+                target=_produce, args=(self.produce, q, stop, _ValueAdder(shared_blocked)), daemon=True
+            )
+        worker.start()
+
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    stats.starved += 1
+                    item = q.get()
+                stats.wait_seconds += time.perf_counter() - start
+
+                if isinstance(item, _Done):
+                    return
+                if isinstance(item, _Failure):
+                    raise RuntimeError(f"prefetch producer failed: {item.message}")
+                stats.batches += 1
+                yield item
+        finally:
+            # Runs when the consumer stops early too (e.g. train() took its
+            # last step): tell the producer to quit instead of blocking forever.
+            stop.set()
+            worker.join(timeout=5)
+            if shared_blocked is not None:
+                stats.producer_blocked_seconds = shared_blocked.value
+                if worker.is_alive():
+                    worker.terminate()
+
+
+class _ValueAdder:
+    # Picklable callback that accumulates producer block time into a shared
+    # double, so process-mode stats reach the parent.
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __call__(self, seconds: float) -> None:
+        with self.value.get_lock():
+            self.value.value += seconds
+
+
+class DataLoader:
+    """
+    Yield fixed-size minibatches from a streaming source.
+
+    - `batch_size`: points per training step (1 gives plain SGD).
+    - `shuffle_buffer`: size of the bounded shuffle window; 0 keeps source
+      order. Larger buffers shuffle better and cost proportionally more memory.
+    - `steps_per_epoch`: optional cap that defines an "epoch" for endless or
+      very large sources; by default an epoch is one full pass of the source.
+    - `drop_last`: skip the final short batch of each epoch so every step sees
+      exactly `batch_size` points.
+    - `prefetch`: if > 0, read and batch up to this many batches ahead in a
+      background thread (or process, via `prefetch_mode="process"`), so I/O
+      overlaps with training. `loader.prefetch_stats` then shows whether the
+      run was I/O-bound or compute-bound.
+
+    One-shot iterators (e.g. a generator object) can't be rewound, so every
+    epoch continues the same stream until it runs dry; pass the generator
+    *function* instead to make the source restart each epoch.
+    """
+
+    def __init__(
+        self,
+        source: Source,
+        *,
+        batch_size: int,
+        shuffle_buffer: int = 0,
+        seed: int | None = None,
+        steps_per_epoch: int | None = None,
+        drop_last: bool = False,
+        prefetch: int = 0,
+        prefetch_mode: str = "thread",
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if shuffle_buffer < 0:
+            raise ValueError("shuffle_buffer must be non-negative")
+        if steps_per_epoch is not None and steps_per_epoch < 1:
+            raise ValueError("steps_per_epoch must be at least 1")
+        if prefetch < 0:
+            raise ValueError("prefetch must be non-negative")
+
+        self.source = source
+        self.batch_size = batch_size
+        self.shuffle_buffer = shuffle_buffer
+        self.steps_per_epoch = steps_per_epoch
+        self.drop_last = drop_last
+        self.prefetch = prefetch
+        self.prefetch_mode = prefetch_mode
+        self.prefetch_stats: PrefetchStats | None = None
+        self._rng = random.Random(seed)
+        self._one_shot: Iterator[DataPoint] | None = None
+        # Progress counters are public so callers (and checkpoints) can see
+        # where in the data stream training currently is.
+        self.epoch = 0
+        self.batch_in_epoch = 0
+        # Shuffle RNG state at the start of the current epoch, plus batches
+        # to skip when resuming mid-epoch (see state_dict()).
+        self._epoch_rng = self._rng.getstate()
+        self._skip = 0
+
+    def _open(self) -> Iterator[DataPoint]:
+        source = self.source
+        if isinstance(source, (str, Path)):
+            return read_csv(source)
+        if callable(source):
+            return iter(source())
+        it = iter(source)
+        if it is source:
+            # iter(x) is x only for iterators, which can't be rewound. Later
+            # epochs simply continue the same stream, which is what an endless
+            # generator plus steps_per_epoch wants; a finite one runs dry.
+            if self._one_shot is None:
+                self._one_shot = it
+            return self._one_shot
+        return it
+
+    def _shuffled(self, points: Iterator[DataPoint]) -> Iterator[DataPoint]:
+        if self.shuffle_buffer <= 1:
+            yield from points
+            return
+
+        # Bounded shuffle: keep a window of `shuffle_buffer` points and emit a
+        # random one each time a new point arrives. Memory is O(buffer), not
+        # O(dataset), at the cost of only locally randomized order.
+        buffer: List[DataPoint] = []
+        for point in points:
+            if len(buffer) < self.shuffle_buffer:
+                buffer.append(point)
+                continue
+            i = self._rng.randrange(len(buffer))
+            yield buffer[i]
+            buffer[i] = point
+        self._rng.shuffle(buffer)
+        yield from buffer
+
+    def epoch_batches(self) -> Iterator[List[DataPoint]]:
+        """Yield the minibatches of a single epoch."""
+
+        self.batch_in_epoch = 0
+        self._epoch_rng = self._rng.getstate()
+        skip, self._skip = self._skip, 0
+        batch: List[DataPoint] = []
+        for point in self._shuffled(self._open()):
+            batch.append(point)
+            if len(batch) == self.batch_size:
+                # Count before yielding so the counter already reflects the
+                # batch the caller is holding.
+                self.batch_in_epoch += 1
+                if self.batch_in_epoch > skip:
+                    yield batch
+                batch = []
+                if self.steps_per_epoch is not None and self.batch_in_epoch >= self.steps_per_epoch:
+                    return
+        if batch and not self.drop_last:
+            self.batch_in_epoch += 1
+            if self.batch_in_epoch > skip:
+                yield batch
+
+    def __iter__(self) -> Iterator[List[DataPoint]]:
+        """
+        Yield minibatches forever, starting a new epoch whenever one ends.
+
+        Training asks for exactly `steps` batches, so the stream never needs
+        an end of its own. It does stop if an entire epoch yields nothing,
+        since an empty source would otherwise spin forever.
+
+        With prefetching on, the epoch/batch counters advance as batches are
+        *produced*, so they can run up to `prefetch` batches ahead.
+        """
+
+        if self.prefetch:
+            prefetcher = Prefetcher(self._stream, depth=self.prefetch, mode=self.prefetch_mode)
+            self.prefetch_stats = prefetcher.stats
+            return iter(prefetcher)
+        return self._stream()
+
+    def _stream(self) -> Iterator[List[DataPoint]]:
+        while True:
+            # A resumed epoch may have had every batch skipped; that is not
+            # an empty source.
+            produced = self._skip > 0
+            for batch in self.epoch_batches():
+                produced = True
+                yield batch
+            if not produced:
+                return
+            self.epoch += 1
+
+    def state_dict(self) -> Dict[str, Any]:
+        """
+        Position in the data stream, for checkpoints.
+
+        Resuming replays the current epoch from its saved shuffle state and
+        skips the batches already consumed, so the continuation sees exactly
+        the batches an uninterrupted run would. That requires a source that
+        can be reopened, and no prefetching, because a prefetcher's counters
+        run ahead of training.
+        """
+
+        if isinstance(self.source, Iterator):
+            raise ValueError("a one-shot iterator source can't be rewound to resume; pass a generator function")
+        if self.prefetch:
+            raise ValueError("a prefetching DataLoader's position runs ahead of training; use prefetch=0 to checkpoint")
+        return {"epoch": self.epoch, "batch_in_epoch": self.batch_in_epoch, "rng": self._epoch_rng}
+
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        self.epoch = state["epoch"]
+        self._rng.setstate(state["rng"])
+        self._epoch_rng = state["rng"]
+        self._skip = state["batch_in_epoch"]
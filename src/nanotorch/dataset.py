@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+# Columnar on-disk datasets.
+#
+# A List[Tuple[float, float]] costs ~100+ bytes per point once Python object
+# headers are counted, and the whole list has to exist before step 0. Here a
+# dataset is two contiguous numeric columns in a single file:
+#
+#   [64-byte header][x column][padding][y column]
+#
+# Opening the file memory-maps both columns with zero copies, so startup time
+# doesn't depend on file size and the OS only pages in what training touches.
+# The same ArrayDataset type wraps in-memory arrays too, so code downstream
+# never has to care where the columns came from.
+
+import io
+import os
+import shutil
+import struct
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Iterator, Tuple
+
+import numpy as np
+
+DataPoint = Tuple[float, float]
+
+MAGIC = b"NTDS"
+VERSION = 1
+# magic, version, dtype char ('d' = float64, 'f' = float32), count, x/y offsets
+_HEADER = struct.Struct("<4sHcxQQQ")
+HEADER_SIZE = 64
+# Aligning columns to 64 bytes keeps them cache-line (and SIMD) friendly.
+_ALIGN = 64
+_DTYPES = {b"d": np.dtype("<f8"), b"f": np.dtype("<f4")}
+# Iteration converts this many points per chunk, bounding the temporary
+# Python objects created when a consumer wants (x, y) tuples.
+_ITER_CHUNK = 65536
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class ArrayDataset:
+    """
+    Two equal-length numeric columns, usable anywhere a list of (x, y) points is.
+
+    Iterating yields plain (x, y) float tuples (chunk by chunk, never the whole
+    set at once), so the scalar engine and DataLoader accept it unchanged. The
+    batched engine reads `.x` / `.y` directly without conversion.
+
+    In memory, `x` may also be an (N, D) feature matrix and `y` an (N, K)
+    output matrix; iterating then yields each row as an array. The file
+    format stays 1-D.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray) -> None:
+        if x.ndim not in (1, 2) or y.ndim not in (1, 2) or x.shape[0] != y.shape[0]:
+            raise ValueError("x and y must be 1-D or 2-D columns of the same length")
+        self.x = x
+        self.y = y
+
+    def __len__(self) -> int:
+        return self.x.shape[0]
+
+    def __iter__(self) -> Iterator[DataPoint]:
+        for start in range(0, len(self), _ITER_CHUNK):
+            stop = start + _ITER_CHUNK
+            xs, ys = self.x[start:stop], self.y[start:stop]
+            # Scalars as Python floats; feature/output vectors as row views.
+            yield from zip(xs.tolist() if xs.ndim == 1 else list(xs), ys.tolist() if ys.ndim == 1 else list(ys))
+
+    def columns(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.x, self.y
+
+
+def _header(dtype_char: bytes, count: int) -> Tuple[bytes, int, int]:
+    itemsize = _DTYPES[dtype_char].itemsize
+    x_offset = HEADER_SIZE
+    y_offset = _aligned(x_offset + count * itemsize)
+    packed = _HEADER.pack(MAGIC, VERSION, dtype_char, count, x_offset, y_offset)
+    return packed.ljust(HEADER_SIZE, b"\0"), x_offset, y_offset
+
+
+def _dtype_char(dtype: object) -> bytes:
+    dt = np.dtype(dtype)
+    for char, known in _DTYPES.items():
+        if dt == known:
+            return char
+    raise ValueError(f"unsupported dtype {dt}; use float64 or float32")
+
+
+def write_dataset(path: str | Path, x: object, y: object, *, dtype: object = np.float64) -> Path:
+    """Write in-memory x/y columns to the columnar format."""
+
+    char = _dtype_char(dtype)
+    xs = np.ascontiguousarray(x, dtype=_DTYPES[char])
+    ys = np.ascontiguousarray(y, dtype=_DTYPES[char])
+    if xs.shape != ys.shape or xs.ndim != 1:
+        raise ValueError("x and y must be 1-D columns of the same length")
+
+    header, x_offset, y_offset = _header(char, xs.shape[0])
+    path = Path(path)
+    with open(path, "wb") as out:
+        out.write(header)
+        out.write(xs.tobytes())
+        out.write(b"\0" * (y_offset - x_offset - xs.nbytes))
+        out.write(ys.tobytes())
+    return path
+
+
+def open_dataset(path: str | Path) -> ArrayDataset:
+    """
+    Memory-map a columnar dataset file. O(1) in the file size.
+
+    The returned columns are read-only views backed by the page cache; nothing
+    is read from disk until a value is actually touched.
+    """
+
+    with open(path, "rb") as handle:
+        raw = handle.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{path}: file too small to be a nanotorch dataset")
+    magic, version, char, count, x_offset, y_offset = _HEADER.unpack_from(raw)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a nanotorch dataset (bad magic)")
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported dataset version {version}")
+    if char not in _DTYPES:
+        raise ValueError(f"{path}: unknown dtype code {char!r}")
+
+    dtype = _DTYPES[char]
+    if count == 0:
+        empty = np.empty(0, dtype=dtype)
+        return ArrayDataset(empty, empty)
+    x = np.memmap(path, dtype=dtype, mode="r", offset=x_offset, shape=(count,))
+    y = np.memmap(path, dtype=dtype, mode="r", offset=y_offset, shape=(count,))
+    return ArrayDataset(x, y)
+
+
+def _bad_line(block: bytes) -> Tuple[int, bytes]:
+    # Error path only: find the first non-blank line that isn't two numbers.
+    for number, line in enumerate(block.splitlines(), start=1):
+        if not line:
+            continue
+        fields = line.split(b",")
+        try:
+            if len(fields) == 2:
+                [float(v) for v in fields]
+                continue
+        except ValueError:
+            pass
+        return number, line
+    return 0, b""
+
+
+def _parse_block(block: bytes, dtype: np.dtype, where: str, first_line: int) -> np.ndarray:
+    # NumPy's C reader parses the whole block in one call (no per-line Python
+    # objects), skips blank lines and rejects rows whose column count differs
+    # from the first. Requiring exactly two columns then rules out ragged rows
+    # that would otherwise shift the x/y pairing.
+    if not block.strip():
+        return np.empty((0, 2), dtype=dtype)
+    try:
+        values = np.loadtxt(io.BytesIO(block), dtype=np.float64, delimiter=",", ndmin=2, comments=None)
+    except ValueError:
+        values = None
+    if values is None or values.shape[1] != 2:
+        number, line = _bad_line(block)
+        raise ValueError(
+            f"{where}:{first_line + number}: expected two numeric columns, got {line.decode(errors='replace')!r}"
+        )
+    return values.astype(dtype, copy=False)
+
+
+def _skip_header(handle: BinaryIO) -> int:
+    # Returns the number of lines consumed (1 for a header, else 0).
+    first = handle.readline()
+    try:
+        [float(v) for v in first.split(b",")[:2]]
+    except ValueError:
+        return 1  # non-numeric first row: it was a header, leave it consumed
+    handle.seek(0)
+    return 0
+
+
+def csv_to_dataset(
+    csv_path: str | Path,
+    out_path: str | Path,
+    *,
+    dtype: object = np.float64,
+    block_size: int = 1 << 22,
+) -> ArrayDataset:
+    """
+    Stream a two-column CSV into the columnar format and open the result.
+
+    Memory use is bounded by `block_size` regardless of file size: x values go
+    straight into the output file, y values into a temporary spill file that
+    is appended once the final count (and therefore the y offset) is known.
+    """
+
+    char = _dtype_char(dtype)
+    np_dtype = _DTYPES[char]
+    out_path = Path(out_path)
+    count = 0
+
+    with open(csv_path, "rb") as src, open(out_path, "wb") as out, tempfile.TemporaryFile() as spill:
+        line = _skip_header(src)
+        out.write(b"\0" * HEADER_SIZE)  # placeholder until count is known
+        carry = b""
+        while True:
+            chunk = src.read(block_size)
+            block = carry + chunk
+            if chunk:
+                # Only parse complete lines; the tail waits for the next read.
+                cut = block.rfind(b"\n") + 1
+                block, carry = block[:cut], block[cut:]
+            values = _parse_block(block, np_dtype, str(csv_path), line)
+            line += block.count(b"\n")
+            out.write(np.ascontiguousarray(values[:, 0]).tobytes())
+            spill.write(np.ascontiguousarray(values[:, 1]).tobytes())
+            count += values.shape[0]
+            if not chunk:
+                break
+
+        header, x_offset, y_offset = _header(char, count)
+        out.write(b"\0" * (y_offset - x_offset - count * np_dtype.itemsize))
+        spill.seek(0)
+        shutil.copyfileobj(spill, out)
+        out.seek(0)
+        out.write(header)
+        out.flush()
+        os.fsync(out.fileno())
+
+    return open_dataset(out_path)
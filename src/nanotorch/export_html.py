@@ -1,26 +1,396 @@
 from __future__ import annotations
 
-# Export the interactive notebook to a shareable HTML file.
-# This keeps a single source of truth (the .ipynb) while making
-# a static artifact you can send or publish.
+# Export training traces as self-contained, interactive HTML files.
+#
+# Running nbconvert over the notebook only captures whatever the kernel last
+# rendered, and it needs a Jupyter stack at export time. `export_trace_html`
+# instead writes the trace itself, with a small canvas viewer, into one file
+# that any browser opens offline.
+#
+# To keep million-step runs down to a few megabytes, each series (loss, every
+# param, every grad) is stored as a min/max/mean pyramid. The finest level
+# has at most `max_buckets` buckets, and each coarser level merges `factor`
+# buckets of the one below. The viewer picks, for the visible step range, the
+# finest level that still has about one bucket per pixel. It draws the
+# min/max band plus the mean line, so zooming in reveals detail down to the
+# finest level. Runs short enough to fit in the finest level are stored at
+# full resolution. Arrays are float32, base64 encoded in a JSON blob.
+#
+# The old notebook export is still available as `export_notebook` (and
+# `--notebook` on the command line); nbconvert is imported only there.
 
+import argparse
+import base64
+import html
+import json
 from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
 
-import nbformat
-from nbconvert import HTMLExporter
+import numpy as np
 
+from .params import require_scalars
+from .training import StepState
 
-def main() -> None:
-    nb_path = Path("notebooks/step_through_training.ipynb")
-    out_path = Path("artifacts/plots/step_through_training.html")
+DEFAULT_OUT = Path("artifacts/plots")
 
-    nb = nbformat.read(nb_path, as_version=4)
-    exporter = HTMLExporter()
-    body, _ = exporter.from_notebook_node(nb)
 
+def _columns(trace: Any) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    if hasattr(trace, "losses") and hasattr(trace, "param"):
+        # TraceRecorder / TraceReader: already columnar.
+        names = list(trace.names)
+        return (
+            np.asarray(trace.steps, dtype=np.float64),
+            np.asarray(trace.losses, dtype=np.float64),
+            {n: np.asarray(trace.param(n), dtype=np.float64) for n in names},
+            {n: np.asarray(trace.grad(n), dtype=np.float64) for n in names},
+        )
+
+    # Any iterable of StepState, e.g. train_iter() itself.
+    steps: List[float] = []
+    losses: List[float] = []
+    params: Dict[str, List[float]] = {}
+    grads: Dict[str, List[float]] = {}
+    for state in trace:
+        if not isinstance(state, StepState):
+            raise ValueError("trace must be a TraceRecorder, a TraceReader or an iterable of StepState")
+        if not steps:
+            require_scalars(state.params, "HTML trace export")
+        steps.append(state.step)
+        losses.append(state.loss)
+        for name, value in state.params.items():
+            params.setdefault(name, []).append(value)
+        for name, value in state.grads.items():
+            grads.setdefault(name, []).append(value)
+    return (
+        np.asarray(steps, dtype=np.float64),
+        np.asarray(losses, dtype=np.float64),
+        {n: np.asarray(v, dtype=np.float64) for n, v in params.items()},
+        {n: np.asarray(v, dtype=np.float64) for n, v in grads.items()},
+    )
+
+
+def _bucketed(values: np.ndarray, size: int) -> np.ndarray:
+    # Pad the last, partial bucket with NaN so the nan-reductions ignore it.
+    count = -(-len(values) // size)
+    padded = np.full(count * size, np.nan)
+    padded[: len(values)] = values
+    return padded.reshape(count, size)
+
+
+def build_pyramid(values: np.ndarray, *, max_buckets: int = 16384, factor: int = 4) -> List[Dict[str, Any]]:
+    """
+    Min/max/mean levels of `values`, finest first.
+
+    Level k covers `size` consecutive entries per bucket; the finest level
+    has at most `max_buckets` buckets and coarser levels shrink by `factor`
+    until a single bucket is left.
+    """
+
+    if max_buckets < 1:
+        raise ValueError("max_buckets must be at least 1")
+    if factor < 2:
+        raise ValueError("factor must be at least 2")
+    values = np.asarray(values, dtype=np.float64)
+    size = max(1, -(-len(values) // max_buckets))
+    levels = []
+    while True:
+        if size == 1:
+            # Full resolution: min, max and mean are the value itself.
+            levels.append({"size": 1, "min": values, "max": values, "mean": values})
+        else:
+            buckets = _bucketed(values, size)
+            with np.errstate(invalid="ignore"):
+                levels.append(
+                    {
+                        "size": size,
+                        "min": np.nanmin(buckets, axis=1),
+                        "max": np.nanmax(buckets, axis=1),
+                        "mean": np.nanmean(buckets, axis=1),
+                    }
+                )
+        if len(levels[-1]["mean"]) <= 1:
+            return levels
+        size *= factor
+
+
+def _encode(values: np.ndarray) -> str:
+    return base64.b64encode(np.asarray(values, dtype="<f4").tobytes()).decode("ascii")
+
+
+def trace_payload(trace: Any, *, max_buckets: int = 16384, factor: int = 4) -> Dict[str, Any]:
+    """The JSON-ready data the viewer embeds (exposed for tests and reuse)."""
+
+    steps, losses, params, grads = _columns(trace)
+    if len(steps) == 0:
+        raise ValueError("the trace has no steps to export")
+    series = [("loss", "loss", losses)]
+    series += [(f"param {n}", "param", v) for n, v in params.items()]
+    series += [(f"grad {n}", "grad", v) for n, v in grads.items()]
+
+    def levels(values: np.ndarray, stats: Sequence[str]) -> List[Dict[str, Any]]:
+        out = []
+        for level in build_pyramid(values, max_buckets=max_buckets, factor=factor):
+            entry: Dict[str, Any] = {"size": level["size"]}
+            # At full resolution min == max == mean, so store one array.
+            for stat in stats if level["size"] > 1 else ("mean",):
+                entry[stat] = _encode(level[stat])
+            out.append(entry)
+        return out
+
+    return {
+        "count": int(len(steps)),
+        "first_step": float(steps[0]),
+        "last_step": float(steps[-1]),
+        # Bucket centers on the step axis (stride/ring traces aren't contiguous).
+        "steps": levels(steps, ("mean",)),
+        "series": [
+            {"name": name, "kind": kind, "levels": levels(values, ("min", "max", "mean"))}
+            for name, kind, values in series
+        ],
+    }
+
+
+_VIEWER = r"""
+<style>
+body { font: 13px system-ui, sans-serif; margin: 16px; color: #222; }
+.chart { position: relative; margin-bottom: 10px; }
+.chart canvas { width: 100%; height: 150px; display: block; border: 1px solid #ddd; cursor: crosshair; }
+.chart .label { position: absolute; left: 8px; top: 4px; font-weight: 600; }
+.chart .readout { position: absolute; right: 8px; top: 4px; font-family: monospace; }
+#bar { margin-bottom: 12px; }
+</style>
+<div id="bar">
+  <label><input type="checkbox" id="logloss" checked> log-scale loss</label>
+  <button id="reset">reset zoom</button>
+  <span id="range"></span>
+  <span style="color:#777">wheel to zoom, drag to pan, double-click to reset</span>
+</div>
+<div id="charts"></div>
+<script>
+(function () {
+  const data = JSON.parse(document.getElementById("trace-data").textContent);
+  const decode = (b64) => {
+    const bin = atob(b64), bytes = new Uint8Array(bin.length);
+    for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+    return new Float32Array(bytes.buffer);
+  };
+  const unpack = (levels) => levels.map((l) => {
+    const mean = decode(l.mean);
+    return { size: l.size, mean, min: l.min ? decode(l.min) : mean, max: l.max ? decode(l.max) : mean };
+  });
+  const xs = unpack(data.steps).map((l) => l.mean);
+  const colors = { loss: "#6a1b9a", param: "#1565c0", grad: "#2e7d32" };
+  const full = [data.first_step, data.last_step === data.first_step ? data.first_step + 1 : data.last_step];
+  let view = full.slice();
+  const charts = [];
+
+  function lowerBound(arr, x) {
+    let lo = 0, hi = arr.length;
+    while (lo < hi) { const mid = (lo + hi) >> 1; if (arr[mid] < x) lo = mid + 1; else hi = mid; }
+    return lo;
+  }
+
+  function draw(chart) {
+    const { canvas, series, readout } = chart;
+    const dpr = window.devicePixelRatio || 1;
+    const w = canvas.clientWidth, h = canvas.clientHeight;
+    canvas.width = w * dpr; canvas.height = h * dpr;
+    const ctx = canvas.getContext("2d");
+    ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+    ctx.clearRect(0, 0, w, h);
+
+    // Finest level with about one bucket per pixel in the visible range.
+    let k = 0;
+    for (; k < series.levels.length - 1; k++) {
+      const a = lowerBound(xs[k], view[0]), b = lowerBound(xs[k], view[1]);
+      if (b - a <= w) break;
+    }
+    const level = series.levels[k], x = xs[k];
+    const a = Math.max(0, lowerBound(x, view[0]) - 1), b = Math.min(x.length, lowerBound(x, view[1]) + 1);
+    const log = series.kind === "loss" && document.getElementById("logloss").checked;
+    const f = (v) => (log ? Math.log10(Math.max(v, 1e-300)) : v);
+    let lo = Infinity, hi = -Infinity;
+    for (let i = a; i < b; i++) { lo = Math.min(lo, f(level.min[i])); hi = Math.max(hi, f(level.max[i])); }
+    if (!isFinite(lo)) { lo = 0; hi = 1; }
+    if (lo === hi) { lo -= 1; hi += 1; }
+    const pad = 0.05 * (hi - lo);
+    lo -= pad; hi += pad;
+    const px = (s) => ((s - view[0]) / (view[1] - view[0])) * w;
+    const py = (v) => h - ((f(v) - lo) / (hi - lo)) * (h - 22) - 2;
+
+    ctx.fillStyle = colors[series.kind] + "33";
+    ctx.beginPath();
+    for (let i = a; i < b; i++) ctx.lineTo(px(x[i]), py(level.max[i]));
+    for (let i = b - 1; i >= a; i--) ctx.lineTo(px(x[i]), py(level.min[i]));
+    ctx.fill();
+    ctx.strokeStyle = colors[series.kind];
+    ctx.lineWidth = 1.2;
+    ctx.beginPath();
+    for (let i = a; i < b; i++) ctx.lineTo(px(x[i]), py(level.mean[i]));
+    ctx.stroke();
+
+    ctx.fillStyle = "#777";
+    ctx.fillText((log ? "10^" : "") + hi.toPrecision(4), 8, 30);
+    ctx.fillText((log ? "10^" : "") + lo.toPrecision(4), 8, h - 6);
+    chart.hit = { x, level, px };
+    if (chart.mouse !== undefined) {
+      const step = view[0] + (chart.mouse / w) * (view[1] - view[0]);
+      const i = Math.min(x.length - 1, lowerBound(x, step));
+      ctx.strokeStyle = "#999";
+      ctx.beginPath(); ctx.moveTo(px(x[i]), 0); ctx.lineTo(px(x[i]), h); ctx.stroke();
+      readout.textContent = "step " + Math.round(x[i]) + "  mean " + level.mean[i].toPrecision(6) +
+        (level.size > 1 ? "  [" + level.min[i].toPrecision(4) + ", " + level.max[i].toPrecision(4) + "]" : "");
+    } else {
+      readout.textContent = level.size > 1 ? level.size + " steps/bucket" : "";
+    }
+  }
+
+  function redraw() {
+    document.getElementById("range").textContent =
+      "steps " + Math.round(view[0]) + " to " + Math.round(view[1]) + " of " + data.count;
+    charts.forEach(draw);
+  }
+
+  // Don't zoom past a few buckets of the finest level.
+  const minSpan = Math.max(4, (8 * (full[1] - full[0])) / xs[0].length);
+
+  function clamp() {
+    const span = Math.min(full[1] - full[0], Math.max(view[1] - view[0], minSpan));
+    const mid = (view[0] + view[1]) / 2;
+    view = [mid - span / 2, mid + span / 2];
+    if (view[0] < full[0]) view = [full[0], full[0] + span];
+    if (view[1] > full[1]) view = [full[1] - span, full[1]];
+  }
+
+  for (const series of data.series) {
+    series.levels = unpack(series.levels);
+    const el = document.createElement("div");
+    el.className = "chart";
+    el.innerHTML = '<canvas></canvas><span class="label"></span><span class="readout"></span>';
+    el.querySelector(".label").textContent = series.name;
+    document.getElementById("charts").appendChild(el);
+    const chart = { canvas: el.querySelector("canvas"), readout: el.querySelector(".readout"), series };
+    charts.push(chart);
+
+    const canvas = chart.canvas;
+    let drag = null;
+    canvas.addEventListener("wheel", (e) => {
+      e.preventDefault();
+      const at = view[0] + (e.offsetX / canvas.clientWidth) * (view[1] - view[0]);
+      const scale = Math.exp(e.deltaY * 0.002);
+      view = [at - (at - view[0]) * scale, at + (view[1] - at) * scale];
+      clamp(); redraw();
+    }, { passive: false });
+    canvas.addEventListener("mousedown", (e) => { drag = { x: e.offsetX, view: view.slice() }; });
+    window.addEventListener("mouseup", () => { drag = null; });
+    canvas.addEventListener("mousemove", (e) => {
+      if (drag) {
+        const shift = ((drag.x - e.offsetX) / canvas.clientWidth) * (drag.view[1] - drag.view[0]);
+        view = [drag.view[0] + shift, drag.view[1] + shift];
+        clamp();
+      }
+      charts.forEach((c) => { c.mouse = e.offsetX; });
+      redraw();
+    });
+    canvas.addEventListener("mouseleave", () => { charts.forEach((c) => { c.mouse = undefined; }); redraw(); });
+    canvas.addEventListener("dblclick", () => { view = full.slice(); redraw(); });
+  }
+  document.getElementById("reset").addEventListener("click", () => { view = full.slice(); redraw(); });
+  document.getElementById("logloss").addEventListener("change", redraw);
+  window.addEventListener("resize", redraw);
+  redraw();
+})();
+</script>
+"""
+
+
+def render_trace_html(trace: Any, *, title: str = "nanotorch trace", max_buckets: int = 16384, factor: int = 4) -> str:
+    """The complete HTML document for `trace` (see export_trace_html)."""
+
+    payload = json.dumps(trace_payload(trace, max_buckets=max_buckets, factor=factor), separators=(",", ":"))
+    # "</" can't appear inside a script element; JSON never needs it raw.
+    payload = payload.replace("</", "<\\/")
+    return (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+        f"<title>{html.escape(title)}</title></head><body>\n"
+        f"<h2>{html.escape(title)}</h2>\n"
+        f"<script type=\"application/json\" id=\"trace-data\">{payload}</script>\n"
+        f"{_VIEWER}</body></html>\n"
+    )
+
+
+def export_trace_html(
+    trace: Any,
+    path: str | Path,
+    *,
+    title: str = "nanotorch trace",
+    max_buckets: int = 16384,
+    factor: int = 4,
+) -> Path:
+    """
+    Write `trace` as one self-contained, zoomable HTML file.
+
+    `trace` is a TraceRecorder, a TraceReader or any iterable of StepState
+    (such as `train_iter(...)` itself). No Jupyter stack is needed.
+    """
+
+    path = Path(path)
+    document = render_trace_html(trace, title=title, max_buckets=max_buckets, factor=factor)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(document, encoding="utf-8")
+    return path
+
+
+def export_notebook(
+    nb_path: Path = Path("notebooks/step_through_training.ipynb"),
+    out_path: Path = DEFAULT_OUT / "step_through_training.html",
+) -> Path:
+    """Static HTML of the notebook as last executed (needs nbconvert)."""
+
+    import nbformat
+    from nbconvert import HTMLExporter
+
+    nb = nbformat.read(nb_path, as_version=4)
+    body, _ = HTMLExporter().from_notebook_node(nb)
     out_path.parent.mkdir(parents=True, exist_ok=True)
     out_path.write_text(body, encoding="utf-8")
-    print(f"wrote {out_path}")
+    return out_path
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    from .cache import scenario_run
+    from .scenarios import get_scenario, list_scenarios
+
+    parser = argparse.ArgumentParser(
+        prog="nanotorch-export-html", description="Export scenario traces as interactive HTML files."
+    )
+    parser.add_argument("names", nargs="*", help="scenarios to export (default: all)")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    parser.add_argument("--max-buckets", type=int, default=16384)
+    parser.add_argument("--notebook", action="store_true", help="export the notebook via nbconvert instead")
+    args = parser.parse_args(argv)
+
+    if args.notebook:
+        print(f"wrote {export_notebook(out_path=args.out / 'step_through_training.html')}")
+        return
+
+    names = args.names or list_scenarios()
+    scenarios = {name: get_scenario(name) for name in names}
+    try:
+        # Up front, before any training: traces hold scalar params only.
+        for name, scenario in scenarios.items():
+            require_scalars(scenario.params, f"exporting '{name}'")
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    for name, scenario in scenarios.items():
+        path = export_trace_html(
+            scenario_run(name).trace,
+            args.out / f"{name}_trace.html",
+            title=f"{scenario.test_name}: {scenario.description}",
+            max_buckets=args.max_buckets,
+        )
+        print(f"wrote {path}")
 
 
 if __name__ == "__main__":
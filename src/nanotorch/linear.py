@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+# Sufficient-statistics engine for linear models with squared loss.
+#
+# For y_hat = w*x + b and loss (y_hat - y)^2, the mean loss and its gradient
+# depend on the data only through N, the means of x and y, and the centered
+# second moments Cxx = sum((x - mx)^2), Cxy and Cyy. We compute those in one
+# streaming pass, after which every step is O(1) whatever N is:
+#
+#   r_i = w*x_i + b - y_i,   c = w*mx + b - my   (the mean residual)
+#   mean loss = (w^2 Cxx - 2w Cxy + Cyy) / N + c^2
+#   dL/dw     = 2 * ((w Cxx - Cxy) / N + c * mx)
+#   dL/db     = 2 * c
+#
+# The raw sums (sum x, sum x^2, ...) are algebraically equivalent, but the
+# centered form avoids catastrophic cancellation once the loss is small
+# compared with sum(y^2). Chunks are merged with Chan et al.'s pairwise
+# update, so the pass is numerically stable and memory stays bounded.
+#
+# Results match the generic loop up to floating-point summation order.
+
+import math
+import random
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .data import DataLoader
+from .dataset import ArrayDataset
+from .training import (
+    BufferedParams,
+    LossFn,
+    ObserverFn,
+    Optimizer,
+    Params,
+    PredictFn,
+    Recorder,
+    Scalar,
+    StepFn,
+    StepState,
+    _run_history,
+    _run_states,
+)
+
+# Points converted to arrays at a time during the statistics pass.
+_CHUNK = 65536
+
+
+@dataclass(frozen=True)
+class LinearStats:
+    """Everything a linear squared-error fit needs to know about the data."""
+
+    n: int = 0
+    mean_x: float = 0.0
+    mean_y: float = 0.0
+    cxx: float = 0.0
+    cxy: float = 0.0
+    cyy: float = 0.0
+
+    @classmethod
+    def of_columns(cls, xs: np.ndarray, ys: np.ndarray) -> LinearStats:
+        n = len(xs)
+        if n == 0:
+            return cls()
+        mx, my = float(np.mean(xs)), float(np.mean(ys))
+        dx, dy = xs - mx, ys - my
+        return cls(n, mx, my, float(dx @ dx), float(dx @ dy), float(dy @ dy))
+
+    def merge(self, other: LinearStats) -> LinearStats:
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+        n = self.n + other.n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        weight = self.n * other.n / n
+        return LinearStats(
+            n=n,
+            mean_x=self.mean_x + dx * other.n / n,
+            mean_y=self.mean_y + dy * other.n / n,
+            cxx=self.cxx + other.cxx + dx * dx * weight,
+            cxy=self.cxy + other.cxy + dx * dy * weight,
+            cyy=self.cyy + other.cyy + dy * dy * weight,
+        )
+
+    # The raw sums, for anyone who wants the textbook quantities.
+
+    @property
+    def sum_x(self) -> float:
+        return self.n * self.mean_x
+
+    @property
+    def sum_y(self) -> float:
+        return self.n * self.mean_y
+
+    @property
+    def sum_xx(self) -> float:
+        return self.cxx + self.n * self.mean_x**2
+
+    @property
+    def sum_xy(self) -> float:
+        return self.cxy + self.n * self.mean_x * self.mean_y
+
+    @property
+    def sum_yy(self) -> float:
+        return self.cyy + self.n * self.mean_y**2
+
+
+def _chunks(data: Any) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    if isinstance(data, ArrayDataset):
+        xs, ys = data.columns()
+    elif isinstance(data, tuple) and len(data) == 2 and all(isinstance(c, np.ndarray) for c in data):
+        xs, ys = data
+    else:
+        # Any iterable of (x, y) points, generators included: convert a
+        # bounded chunk at a time instead of materializing the dataset.
+        points = iter(data)
+        while True:
+            chunk = np.asarray(list(islice(points, _CHUNK)), dtype=np.float64)
+            if chunk.size == 0:
+                return
+            if chunk.ndim != 2 or chunk.shape[1] != 2:
+                raise ValueError("data must be (x, y) pairs")
+            yield chunk[:, 0], chunk[:, 1]
+        return
+
+    if len(xs) != len(ys):
+        raise ValueError("x and y columns must have the same length")
+    # Memory-mapped columns are read chunk by chunk, so the page cache, not
+    # our temporaries, decides how much of the file is resident.
+    for start in range(0, len(xs), _CHUNK):
+        yield (
+            np.asarray(xs[start : start + _CHUNK], dtype=np.float64),
+            np.asarray(ys[start : start + _CHUNK], dtype=np.float64),
+        )
+
+
+def linear_stats(data: Any) -> LinearStats:
+    """One streaming pass over points, (x, y) columns or an ArrayDataset."""
+
+    if isinstance(data, DataLoader):
+        raise ValueError(
+            "the sufficient-statistics engine needs full-batch data; a DataLoader "
+            "changes the batch every step"
+        )
+    stats = LinearStats()
+    for xs, ys in _chunks(data):
+        stats = stats.merge(LinearStats.of_columns(xs, ys))
+    return stats
+
+
+def detect_linear(predict: PredictFn, loss: LossFn, params: Mapping[str, Scalar]) -> Tuple[str, ...] | None:
+    """
+    Probe whether predict/loss are `w*x (+ b)` with squared loss.
+
+    Returns the parameter names as (weight,) or (weight, bias), or None when
+    the functions don't behave that way at a handful of random probe points.
+    A probe can't prove linearity, so declaring `Scenario.linear` (or passing
+    `linear=` to train_linear) is preferred wherever the model is known.
+    """
+
+    names = list(params)
+    if not 1 <= len(names) <= 2:
+        return None
+    rng = random.Random(0)
+    probes = [(rng.uniform(-3, 3), {n: rng.uniform(-3, 3) for n in names}) for _ in range(4)]
+
+    def close(a: Any, b: float) -> bool:
+        return isinstance(a, (int, float)) and math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+
+    try:
+        for (a, _), (b, _) in zip(probes, reversed(probes)):
+            if not close(loss(a, b), (a - b) ** 2):
+                return None
+        for weight in names:
+            bias = next((n for n in names if n != weight), None)
+            if all(close(predict(x, p), p[weight] * x + (p[bias] if bias else 0.0)) for x, p in probes):
+                return (weight, bias) if bias else (weight,)
+    except Exception:
+        # Anything that can't take plain floats isn't the family we handle.
+        return None
+    return None
+
+
+def _split_names(linear: Sequence[str]) -> Tuple[str, str | None]:
+    if len(linear) == 1:
+        return linear[0], None
+    if len(linear) == 2:
+        return linear[0], linear[1]
+    raise ValueError("linear must name (weight,) or (weight, bias)")
+
+
+def linear_step_fn(stats: LinearStats, linear: Sequence[str]) -> StepFn:
+    """An O(1) step function over precomputed statistics."""
+
+    weight, bias = _split_names(linear)
+    n = float(stats.n)
+    mx, my = stats.mean_x, stats.mean_y
+    sxx, sxy, syy = stats.cxx / n, stats.cxy / n, stats.cyy / n
+
+    def step_fn(params: Params) -> Tuple[Scalar, Mapping[str, Scalar]]:
+        w = params[weight]
+        b = params[bias] if bias is not None else 0.0
+        c = w * mx + b - my
+        # Clamp tiny negative rounding at the optimum; a mean square can't be.
+        step_loss = max(w * w * sxx - 2.0 * w * sxy + syy, 0.0) + c * c
+        grads: Dict[str, Scalar] = {weight: 2.0 * (w * sxx - sxy + c * mx)}
+        if bias is not None:
+            grads[bias] = 2.0 * c
+
+        if isinstance(params, BufferedParams):
+            params.zero_grad()
+            params.accumulate(grads)
+            return step_loss, params.finish_grad(1.0)
+        return step_loss, grads
+
+    return step_fn
+
+
+def _resolve(
+    data: Any, params: Params, predict: PredictFn | None, loss: LossFn | None, linear: Sequence[str] | None
+) -> Tuple[LinearStats, Tuple[str, ...]]:
+    if linear is None:
+        if predict is None or loss is None:
+            raise ValueError("pass linear=(weight[, bias]) or predict and loss to detect it")
+        linear = detect_linear(predict, loss, params)
+        if linear is None:
+            raise ValueError("predict/loss are not a linear model with squared loss")
+    for name in linear:
+        if name not in params:
+            raise ValueError(f"'{name}' is not in params")
+    return linear_stats(data), tuple(linear)
+
+
+def train_linear(
+    data: Any,
+    params: Params,
+    predict: PredictFn | None = None,
+    loss: LossFn | None = None,
+    *,
+    steps: int,
+    lr: float,
+    linear: Sequence[str] | None = None,
+    observer: ObserverFn | Sequence[ObserverFn] | None = None,
+    recorder: Recorder | None = None,
+    optimizer: Optimizer | None = None,
+) -> List[Scalar]:
+    """
+    `train()` for linear squared-error models, O(N) once and O(1) per step.
+
+    `linear` declares the (weight[, bias]) parameter names; otherwise they
+    are detected from predict/loss. History, observers, recorders and
+    optimizers behave exactly as in train().
+    """
+
+    if steps < 0:
+        raise ValueError("steps must be non-negative")
+    stats, linear = _resolve(data, params, predict, loss, linear)
+    if stats.n == 0:
+        return [0.0 for _ in range(steps)]
+    step_fn = linear_step_fn(stats, linear)
+    return _run_history(
+        step_fn, params, steps=steps, lr=lr, observer=observer, recorder=recorder, optimizer=optimizer
+    )
+
+
+def train_linear_iter(
+    data: Any,
+    params: Params,
+    predict: PredictFn | None = None,
+    loss: LossFn | None = None,
+    *,
+    steps: int,
+    lr: float,
+    linear: Sequence[str] | None = None,
+    optimizer: Optimizer | None = None,
+) -> Iterator[StepState]:
+    """`train_iter()` counterpart of train_linear()."""
+
+    if steps < 0:
+        raise ValueError("steps must be non-negative")
+    stats, linear = _resolve(data, params, predict, loss, linear)
+    if stats.n == 0:
+        return
+    yield from _run_states(linear_step_fn(stats, linear), params, steps=steps, lr=lr, optimizer=optimizer)
+
+
+def fit_closed_form(
+    data: Any,
+    params: Params,
+    predict: PredictFn | None = None,
+    loss: LossFn | None = None,
+    *,
+    linear: Sequence[str] | None = None,
+) -> Scalar:
+    """
+    Solve the normal equations, write the optimum into `params`, return its loss.
+
+    When x has no spread (e.g. a single point), the optimum isn't unique;
+    the weight is then left as is and only the bias is solved for.
+    """
+
+    stats, linear = _resolve(data, params, predict, loss, linear)
+    if stats.n == 0:
+        return 0.0
+    weight, bias = _split_names(linear)
+    if bias is not None:
+        if stats.cxx > 0.0:
+            params[weight] = stats.cxy / stats.cxx
+        params[bias] = stats.mean_y - params[weight] * stats.mean_x
+    elif stats.sum_xx > 0.0:
+        params[weight] = stats.sum_xy / stats.sum_xx
+    step_loss, _ = linear_step_fn(stats, linear)(params)
+    return step_loss
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+# Allocation accounting for the training loop.
+#
+# AllocationTracker plugs into the same `profiler=` hook as the timing
+# Profiler, but it measures memory instead of time. It uses tracemalloc, so
+# the numbers are Python-heap bytes:
+#
+#   allocated  high-water mark of traced memory inside a phase, relative to
+#              where the phase started. A grads_sum dict that is built and
+#              then dropped still counts, because it was live at the peak.
+#   retained   bytes still live when the phase ends (history entries,
+#              snapshots, leaks).
+#   blocks     net change in allocated blocks (sys.getallocatedblocks).
+#
+# tracemalloc only sees live blocks, so it can't count gross allocations. A
+# loop that allocates and frees the same dict a million times shows up as one
+# dict's worth of `allocated`. That is the quantity that drives RSS, and it
+# is still enough to catch hot-loop regressions. GC pressure is reported
+# separately as collections per step.
+#
+# Every measured call also carries a few dozen bytes of the tracker's own
+# bookkeeping, the same in every run, so budgets compare like with like.
+# Tracing slows Python down several times over, so this is a diagnostic and
+# test mode. Without a tracker the loop runs the uninstrumented code.
+#
+# `assert_allocation_budget` turns a report into a test assertion. An
+# allocation regression in the hot loop then fails CI with a readable
+# message.
+
+import gc
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Iterator, List, Tuple, TypeVar
+
+from .profiler import SAMPLE_PHASES, STEP_PHASES
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _collections() -> int:
+    return sum(generation["collections"] for generation in gc.get_stats())
+
+
+class _Frame:
+    __slots__ = ("name", "start", "peak", "blocks")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start = self.peak = self.blocks = 0
+
+
+@dataclass
+class PhaseAllocations:
+    """Run totals for one phase."""
+
+    calls: int = 0
+    allocated: int = 0
+    retained: int = 0
+    blocks: int = 0
+
+
+class AllocationTracker:
+    """
+    Collect per-step, per-phase and per-sample allocations for a training run.
+
+    Pass it as `train(..., profiler=AllocationTracker())`. tracemalloc starts
+    on the first step if it isn't already running. Use the tracker as a
+    context manager (or call `close()`) to stop it again afterwards.
+    """
+
+    def __init__(self) -> None:
+        self.totals: Dict[str, PhaseAllocations] = {}
+        # One dict per finished step: phase -> allocated bytes, plus "step",
+        # "retained", "blocks" and "gc_collections" for the whole step.
+        self.steps: List[Dict[str, float]] = []
+        self._current: Dict[str, int] = {}
+        self._stack: List[_Frame] = []
+        self._step = -1
+        self._gc_start = 0
+        self._started = False
+
+    # -- tracemalloc lifetime ---------------------------------------------------
+
+    def __enter__(self) -> AllocationTracker:
+        self._ensure_tracing()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _ensure_tracing(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+
+    def close(self) -> None:
+        """Stop tracemalloc if this tracker started it."""
+
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    # -- Frame stack --------------------------------------------------------------
+
+    def _fold_peak(self) -> int:
+        # tracemalloc keeps a single peak, so fold it into every open frame
+        # before resetting it for the next (possibly nested) frame.
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self._stack:
+            if peak > frame.peak:
+                frame.peak = peak
+        tracemalloc.reset_peak()
+        return current
+
+    def _push(self, name: str) -> None:
+        # The frame is allocated before the baseline is taken, so the
+        # tracker's own bookkeeping doesn't count against the phase.
+        frame = _Frame(name)
+        self._stack.append(frame)
+        frame.blocks = sys.getallocatedblocks()
+        frame.start = frame.peak = self._fold_peak()
+
+    def _pop(self) -> Tuple[str, int, int, int]:
+        blocks = sys.getallocatedblocks()
+        current = self._fold_peak()
+        frame = self._stack.pop()
+        allocated = frame.peak - frame.start
+        retained = current - frame.start
+        net_blocks = blocks - frame.blocks
+        if frame.name != "step":
+            self._current[frame.name] = self._current.get(frame.name, 0) + allocated
+            totals = self.totals.setdefault(frame.name, PhaseAllocations())
+            totals.calls += 1
+            totals.allocated += allocated
+            totals.retained += retained
+            totals.blocks += net_blocks
+        return frame.name, allocated, retained, net_blocks
+
+    # -- Instrumentation hooks used by the engines ----------------------------------
+
+    def wrap(self, phase: str, fn: F) -> F:
+        """Return `fn` measured under `phase` (used for predict/loss/rule)."""
+
+        push, pop = self._push, self._pop
+
+        def measured(*args: Any) -> Any:
+            push(phase)
+            try:
+                return fn(*args)
+            finally:
+                pop()
+
+        return measured  # type: ignore[return-value]
+
+    def instrument(self, predict: F, loss: F, rule: F) -> Tuple[F, F, F]:
+        return self.wrap("predict", predict), self.wrap("loss", loss), self.wrap("rule", rule)
+
+    def start_step(self, step: int) -> None:
+        self._ensure_tracing()
+        self._step = step
+        self._current.clear()
+        self._stack.clear()
+        self._gc_start = _collections()
+        self._push("step")
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self._push(name)
+        try:
+            yield
+        finally:
+            self._pop()
+
+    def step_profile(self) -> Dict[str, float]:
+        """Allocated bytes per phase so far in the current step."""
+
+        return {name: float(size) for name, size in self._current.items()}
+
+    def end_step(self) -> Dict[str, float]:
+        _, allocated, retained, blocks = self._pop()
+        profile = self.step_profile()
+        profile["step"] = float(allocated)
+        profile["retained"] = float(retained)
+        profile["blocks"] = float(blocks)
+        profile["gc_collections"] = float(_collections() - self._gc_start)
+        self.steps.append(profile)
+        return profile
+
+    # -- Reporting -------------------------------------------------------------------
+
+    def report(self, *, samples: int | None = None, warmup: int = 1) -> AllocationReport:
+        """
+        Summarize the finished steps, skipping the first `warmup` of them.
+
+        Warm-up steps allocate one-off state (optimizer buffers, caches), so
+        they would hide the steady-state cost. `samples` is the number of
+        samples per step; by default it is the number of predict calls per
+        step, which is right for the scalar engines.
+        """
+
+        if warmup < 0:
+            raise ValueError("warmup must be non-negative")
+        measured = self.steps[warmup:]
+        if not measured:
+            raise ValueError(f"no steps left to report after {warmup} warm-up step(s)")
+        count = len(measured)
+
+        def mean(key: str) -> float:
+            return sum(step.get(key, 0.0) for step in measured) / count
+
+        if samples is None:
+            predict = self.totals.get("predict")
+            samples = round(predict.calls / len(self.steps)) if predict else 0
+        per_sample_bytes = sum(mean(p) for p in SAMPLE_PHASES)
+        return AllocationReport(
+            steps=count,
+            samples_per_step=samples,
+            peak_bytes_per_step=max(step["step"] for step in measured),
+            bytes_per_step=mean("step"),
+            retained_bytes_per_step=mean("retained"),
+            blocks_per_step=mean("blocks"),
+            bytes_per_sample=per_sample_bytes / samples if samples else 0.0,
+            gc_collections=int(sum(step["gc_collections"] for step in measured)),
+            phases={
+                name: mean(name)
+                for name in (*STEP_PHASES, *SAMPLE_PHASES)
+                if any(name in step for step in measured)
+            },
+        )
+
+
+@dataclass(frozen=True)
+class AllocationReport:
+    """Steady-state allocation figures for a run (bytes unless noted)."""
+
+    steps: int
+    samples_per_step: int
+    peak_bytes_per_step: float
+    bytes_per_step: float
+    retained_bytes_per_step: float
+    blocks_per_step: float
+    bytes_per_sample: float
+    gc_collections: int
+    # Mean allocated bytes per step for each phase.
+    phases: Dict[str, float]
+
+    def summary(self) -> str:
+        lines = [
+            f"steps measured       {self.steps}",
+            f"peak bytes / step    {self.peak_bytes_per_step:,.0f}",
+            f"mean bytes / step    {self.bytes_per_step:,.0f}",
+            f"retained / step      {self.retained_bytes_per_step:,.0f}",
+            f"blocks / step        {self.blocks_per_step:,.1f}",
+            f"bytes / sample       {self.bytes_per_sample:,.1f}",
+            f"gc collections       {self.gc_collections}",
+        ]
+        lines.extend(f"  {name:<18} {size:,.0f}" for name, size in self.phases.items())
+        return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class AllocationBudget:
+    """
+    Upper limits for an AllocationReport; None means unchecked.
+
+    Each field is compared with the report field of the same name, except
+    `peak_bytes_per_step`, which bounds the worst measured step.
+    """
+
+    peak_bytes_per_step: float | None = None
+    retained_bytes_per_step: float | None = None
+    blocks_per_step: float | None = None
+    bytes_per_sample: float | None = None
+    gc_collections: int | None = None
+
+    def violations(self, report: AllocationReport) -> List[str]:
+        problems = []
+        for limit in fields(self):
+            bound = getattr(self, limit.name)
+            actual = getattr(report, limit.name)
+            if bound is not None and actual > bound:
+                problems.append(f"{limit.name}: {actual:,.1f} > budget {bound:,.1f}")
+        return problems
+
+
+class AllocationBudgetExceeded(AssertionError):
+    def __init__(self, problems: List[str], report: AllocationReport) -> None:
+        super().__init__("allocation budget exceeded:\n  " + "\n  ".join(problems) + "\n" + report.summary())
+        self.problems = problems
+        self.report = report
+
+
+def assert_allocation_budget(
+    run: Callable[[AllocationTracker], Any],
+    budget: AllocationBudget,
+    *,
+    samples: int | None = None,
+    warmup: int = 1,
+) -> AllocationReport:
+    """
+    Run `run(tracker)` under tracemalloc and assert it stays within `budget`.
+
+    `run` should pass the tracker as `profiler=` to a training call, e.g.
+    `lambda t: train(data, params, ..., profiler=t)`. Returns the report so
+    tests can make further assertions; raises AllocationBudgetExceeded (an
+    AssertionError) listing every limit that was exceeded.
+    """
+
+    with AllocationTracker() as tracker:
+        run(tracker)
+    report = tracker.report(samples=samples, warmup=warmup)
+    problems = budget.violations(report)
+    if problems:
+        raise AllocationBudgetExceeded(problems, report)
+    return report
@@ -0,0 +1,423 @@
+from __future__ import annotations
+
+# Optimizers: how a step's gradient turns into a parameter update.
+#
+# The training loop's default update is plain gradient descent,
+# `params -= lr * grad`. That is the clearest possible rule, but it needs many
+# steps on badly conditioned problems. The optimizers here plug into every
+# engine via `optimizer=` and leave the RuleFn contract alone: rules still
+# only produce gradients.
+#
+# Each optimizer fixes the parameter order on its first step and keeps its
+# state (velocities, moment estimates, curvature pairs) in float64 arrays
+# allocated once. Updates are in-place NumPy operations into those buffers.
+# With a ParamStore the update writes straight into the store's value array;
+# with a plain dict the values are gathered into a reused buffer and written
+# back by name. Array-valued params (weight matrices) are flattened into
+# that buffer through a FlatLayout and written back in place.
+#
+# `state()` exposes the buffers by parameter name, and the training loop
+# copies it into StepState.opt_state.
+
+import copy
+import math
+from typing import Any, Callable, Dict, Mapping, Tuple
+
+import numpy as np
+
+from .params import FlatLayout, ParamStore
+from .training import Params, Scalar, StepFn
+
+
+class _ArrayOptimizer:
+    # Names of the per-parameter buffers reported by state().
+    slots: Tuple[str, ...] = ()
+    # Further attributes carried from one step to the next, for checkpoints.
+    # Everything else is scratch space that each step overwrites.
+    carried: Tuple[str, ...] = ()
+
+    def __init__(self) -> None:
+        self.names: Tuple[str, ...] | None = None
+        # Number of updates applied so far (Adam's bias correction needs it).
+        self.t = 0
+
+    def _bind(self, params: Params | Tuple[str, ...], shapes: Mapping[str, Tuple[int, ...]] | None = None) -> None:
+        if isinstance(params, tuple):
+            self.layout = FlatLayout(params, shapes)
+        else:
+            self.layout = FlatLayout.of(params)
+        self.names = self.layout.names
+        size = self.layout.size
+        self._x = np.zeros(size)
+        self._g = np.zeros(size)
+        self._tmp = np.zeros(size)
+        self._buffers: Dict[str, np.ndarray] = {slot: np.zeros(size) for slot in self.slots}
+        self._allocate(size)
+
+    def _allocate(self, size: int) -> None:
+        """Hook for optimizers that need more than the per-slot buffers."""
+
+    def _gather(self, params: Params, grads: Mapping[str, Scalar]) -> Tuple[np.ndarray, np.ndarray]:
+        if isinstance(params, ParamStore):
+            # Update the store's own value array; its gradient buffer is the
+            # one the step function just filled.
+            g = params.grad if grads is params.grads else self._fill(self._g, grads)
+            return params.values, g
+        return self._fill(self._x, params), self._fill(self._g, grads)
+
+    def _fill(self, out: np.ndarray, values: Mapping[str, Scalar]) -> np.ndarray:
+        if not self.layout.scalar_only:
+            return self.layout.pack(values, out)
+        view = memoryview(out)
+        for j, name in enumerate(self.names or ()):
+            view[j] = values.get(name, 0.0)
+        return out
+
+    def _scatter(self, params: Params, x: np.ndarray) -> None:
+        if x is not self._x:
+            return  # ParamStore: already updated in place
+        if not self.layout.scalar_only:
+            self.layout.write(params, x)
+            return
+        for name, value in zip(self.names or (), x.tolist()):
+            params[name] = value
+
+    def step(
+        self, params: Params, loss: Scalar, grads: Mapping[str, Scalar], lr: float, evaluate: StepFn
+    ) -> None:
+        if self.names is None:
+            self._bind(params)
+        elif len(params) != len(self.names):
+            raise ValueError("params changed shape since the optimizer's first step")
+        self.t += 1
+        x, g = self._gather(params, grads)
+        self._update(x, g, lr, params, loss, evaluate)
+        self._scatter(params, x)
+
+    def _update(
+        self,
+        x: np.ndarray,
+        g: np.ndarray,
+        lr: float,
+        params: Params,
+        loss: Scalar,
+        evaluate: StepFn,
+    ) -> None:
+        raise NotImplementedError
+
+    def _decayed(self, x: np.ndarray, g: np.ndarray, weight_decay: float) -> np.ndarray:
+        # Classic (coupled) L2 regularization: g + wd * x, into the scratch
+        # buffer so the caller's gradient is left as reported.
+        if not weight_decay:
+            return g
+        np.multiply(x, weight_decay, out=self._tmp)
+        self._tmp += g
+        return self._tmp
+
+    def state(self) -> Dict[str, Dict[str, Scalar]]:
+        if self.names is None:
+            return {}
+        if not self.layout.scalar_only:
+            # Copies, so a snapshot doesn't change with the next update.
+            return {slot: self.layout.unpack(buf.copy()) for slot, buf in self._buffers.items()}
+        return {slot: dict(zip(self.names, buf.tolist())) for slot, buf in self._buffers.items()}
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Complete internal state (copies), for checkpoints."""
+
+        if self.names is None:
+            return {"names": None, "t": self.t}
+        return {
+            "names": self.names,
+            "shapes": dict(self.layout.shapes),
+            "t": self.t,
+            "buffers": {slot: buf.copy() for slot, buf in self._buffers.items()},
+            "carried": {name: copy.copy(getattr(self, name)) for name in self.carried},
+        }
+
+    def load_state_dict(self, state: Mapping[str, Any]) -> None:
+        self.t = state["t"]
+        if state["names"] is None:
+            self.names = None
+            return
+        self._bind(tuple(state["names"]), state.get("shapes"))
+        for slot, buf in state["buffers"].items():
+            np.copyto(self._buffers[slot], buf)
+        for name, value in state["carried"].items():
+            setattr(self, name, copy.copy(value))
+
+
+class SGD(_ArrayOptimizer):
+    """
+    Gradient descent with optional heavy-ball or Nesterov momentum.
+
+    With `momentum=0` this is exactly the loop's default update.
+    """
+
+    def __init__(self, *, momentum: float = 0.0, nesterov: bool = False, weight_decay: float = 0.0) -> None:
+        if not 0.0 <= momentum < 1.0:
+            raise ValueError("momentum must be in [0, 1)")
+        if nesterov and momentum == 0.0:
+            raise ValueError("nesterov requires a non-zero momentum")
+        super().__init__()
+        self.momentum = momentum
+        self.nesterov = nesterov
+        self.weight_decay = weight_decay
+        self.slots = ("velocity",) if momentum else ()
+
+    def _update(self, x, g, lr, params, loss, evaluate) -> None:
+        g = self._decayed(x, g, self.weight_decay)
+        if not self.momentum:
+            np.multiply(g, lr, out=self._step_buf)
+            x -= self._step_buf
+            return
+        v = self._buffers["velocity"]
+        v *= self.momentum
+        v += g
+        if self.nesterov:
+            # Look-ahead direction g + mu * v.
+            direction = self._step_buf
+            np.multiply(v, self.momentum, out=direction)
+            direction += g
+        else:
+            direction = v
+        np.multiply(direction, lr, out=self._step_buf)
+        x -= self._step_buf
+
+    def _allocate(self, size: int) -> None:
+        self._step_buf = np.zeros(size)
+
+
+class Adam(_ArrayOptimizer):
+    """
+    Adam: per-parameter steps scaled by running gradient moments.
+
+    `weight_decay` is added to the gradient (L2 regularization) unless
+    `decoupled=True`, which shrinks the params directly instead (AdamW).
+    """
+
+    slots = ("m", "v")
+
+    def __init__(
+        self,
+        *,
+        betas: Tuple[float, float] = (0.9, 0.999),
+        eps: float = 1e-8,
+        weight_decay: float = 0.0,
+        decoupled: bool = False,
+    ) -> None:
+        b1, b2 = betas
+        if not (0.0 <= b1 < 1.0 and 0.0 <= b2 < 1.0):
+            raise ValueError("betas must be in [0, 1)")
+        if eps <= 0:
+            raise ValueError("eps must be positive")
+        super().__init__()
+        self.betas = (b1, b2)
+        self.eps = eps
+        self.weight_decay = weight_decay
+        self.decoupled = decoupled
+
+    def _allocate(self, size: int) -> None:
+        self._denom = np.zeros(size)
+
+    def _update(self, x, g, lr, params, loss, evaluate) -> None:
+        b1, b2 = self.betas
+        m, v = self._buffers["m"], self._buffers["v"]
+        if self.decoupled:
+            if self.weight_decay:
+                x *= 1.0 - lr * self.weight_decay
+        else:
+            g = self._decayed(x, g, self.weight_decay)
+
+        m *= b1
+        np.multiply(g, 1.0 - b1, out=self._denom)
+        m += self._denom
+        v *= b2
+        np.multiply(g, g, out=self._denom)
+        self._denom *= 1.0 - b2
+        v += self._denom
+
+        # Bias-corrected step: lr * m_hat / (sqrt(v_hat) + eps).
+        bias1 = 1.0 - b1**self.t
+        bias2 = 1.0 - b2**self.t
+        np.sqrt(v, out=self._denom)
+        self._denom /= math.sqrt(bias2)
+        self._denom += self.eps
+        np.divide(m, self._denom, out=self._denom)
+        self._denom *= lr / bias1
+        x -= self._denom
+
+
+class AdamW(Adam):
+    """Adam with decoupled weight decay."""
+
+    def __init__(
+        self, *, betas: Tuple[float, float] = (0.9, 0.999), eps: float = 1e-8, weight_decay: float = 0.01
+    ) -> None:
+        super().__init__(betas=betas, eps=eps, weight_decay=weight_decay, decoupled=True)
+
+
+class RMSProp(_ArrayOptimizer):
+    """Steps scaled by a running mean of squared gradients, with optional momentum."""
+
+    def __init__(self, *, alpha: float = 0.99, eps: float = 1e-8, momentum: float = 0.0) -> None:
+        if not 0.0 <= alpha < 1.0:
+            raise ValueError("alpha must be in [0, 1)")
+        if not 0.0 <= momentum < 1.0:
+            raise ValueError("momentum must be in [0, 1)")
+        super().__init__()
+        self.alpha = alpha
+        self.eps = eps
+        self.momentum = momentum
+        self.slots = ("square_avg", "velocity") if momentum else ("square_avg",)
+
+    def _update(self, x, g, lr, params, loss, evaluate) -> None:
+        s = self._buffers["square_avg"]
+        s *= self.alpha
+        np.multiply(g, g, out=self._tmp)
+        self._tmp *= 1.0 - self.alpha
+        s += self._tmp
+
+        np.sqrt(s, out=self._tmp)
+        self._tmp += self.eps
+        np.divide(g, self._tmp, out=self._tmp)
+        if self.momentum:
+            v = self._buffers["velocity"]
+            v *= self.momentum
+            v += self._tmp
+            np.multiply(v, lr, out=self._tmp)
+        else:
+            self._tmp *= lr
+        x -= self._tmp
+
+
+class LBFGS(_ArrayOptimizer):
+    """
+    Limited-memory BFGS with a backtracking (Armijo) line search.
+
+    Keeps the last `history` (s, y) curvature pairs in a preallocated ring
+    and tries step sizes lr, lr/2, ... along the quasi-Newton direction until
+    the loss drops enough. `lr=1.0` is the natural starting step.
+
+    The line search re-evaluates the loss through the engine's step function,
+    so use it with full-batch data: with a DataLoader, each evaluation would
+    see a different minibatch.
+    """
+
+    slots = ("direction",)
+    carried = ("_s", "_y", "_rho", "_pairs", "_head", "last_step_size")
+
+    def __init__(self, *, history: int = 10, c1: float = 1e-4, max_backtracks: int = 20) -> None:
+        if history < 1:
+            raise ValueError("history must be at least 1")
+        if not 0.0 < c1 < 1.0:
+            raise ValueError("c1 must be in (0, 1)")
+        super().__init__()
+        self.history = history
+        self.c1 = c1
+        self.max_backtracks = max_backtracks
+        # Step size accepted by the last line search (0.0 if none was).
+        self.last_step_size = 0.0
+
+    def _allocate(self, size: int) -> None:
+        self._s = np.zeros((self.history, size))
+        self._y = np.zeros((self.history, size))
+        self._rho = np.zeros(self.history)
+        self._alpha = np.zeros(self.history)
+        self._pairs = 0  # how many (s, y) pairs are stored
+        self._head = 0  # ring slot the next pair goes into
+        self._x_old = np.zeros(size)
+        self._g_old = np.zeros(size)
+        self._g_new = np.zeros(size)
+
+    def _direction(self, g: np.ndarray, d: np.ndarray) -> None:
+        # Two-loop recursion: d = -H g, with H the implicit inverse Hessian.
+        np.copyto(d, g)
+        order = [(self._head - 1 - k) % self.history for k in range(self._pairs)]
+        for i in order:  # newest to oldest
+            self._alpha[i] = self._rho[i] * np.dot(self._s[i], d)
+            d -= self._alpha[i] * self._y[i]
+        if order:
+            newest = order[0]
+            d *= np.dot(self._s[newest], self._y[newest]) / np.dot(self._y[newest], self._y[newest])
+        for i in reversed(order):  # oldest to newest
+            beta = self._rho[i] * np.dot(self._y[i], d)
+            d += (self._alpha[i] - beta) * self._s[i]
+        d *= -1.0
+
+    def _update(self, x, g, lr, params, loss, evaluate) -> None:
+        d = self._buffers["direction"]
+        np.copyto(self._g_old, g)
+        np.copyto(self._x_old, x)
+
+        self._direction(self._g_old, d)
+        slope = float(np.dot(self._g_old, d))
+        if slope >= 0.0:
+            # Curvature pairs went stale (not a descent direction): restart
+            # from steepest descent.
+            self._pairs = 0
+            np.negative(self._g_old, out=d)
+            slope = float(np.dot(self._g_old, d))
+
+        step = lr
+        accepted = False
+        for _ in range(self.max_backtracks):
+            np.multiply(d, step, out=x)
+            x += self._x_old
+            self._scatter(params, x)
+            new_loss, new_grads = evaluate(params)
+            if math.isfinite(new_loss) and new_loss <= loss + self.c1 * step * slope:
+                accepted = True
+                break
+            step *= 0.5
+
+        if not accepted:
+            np.copyto(x, self._x_old)
+            self._pairs = 0
+            self.last_step_size = 0.0
+        else:
+            self.last_step_size = step
+            self._fill_new(params, new_grads)
+            s, y = self._s[self._head], self._y[self._head]
+            np.subtract(x, self._x_old, out=s)
+            np.subtract(self._g_new, self._g_old, out=y)
+            sy = float(np.dot(s, y))
+            # Only keep pairs with positive curvature, or H stops being
+            # positive definite.
+            if sy > 1e-12:
+                self._rho[self._head] = 1.0 / sy
+                self._head = (self._head + 1) % self.history
+                self._pairs = min(self._pairs + 1, self.history)
+
+        if isinstance(params, ParamStore) and g is params.grad:
+            # The line search overwrote the store's gradient buffer; restore
+            # the gradient this step actually reported.
+            np.copyto(params.grad, self._g_old)
+
+    def _fill_new(self, params: Params, grads: Mapping[str, Scalar]) -> None:
+        if isinstance(params, ParamStore) and grads is params.grads:
+            np.copyto(self._g_new, params.grad)
+        else:
+            self._fill(self._g_new, grads)
+
+
+# Named configurations, e.g. for benchmarks and sweeps.
+OPTIMIZERS: Dict[str, Callable[[], _ArrayOptimizer]] = {
+    "sgd": SGD,
+    "momentum": lambda: SGD(momentum=0.9),
+    "nesterov": lambda: SGD(momentum=0.9, nesterov=True),
+    "adam": Adam,
+    "adamw": AdamW,
+    "rmsprop": RMSProp,
+    "lbfgs": LBFGS,
+}
+
+
+def make_optimizer(name: str) -> _ArrayOptimizer:
+    """Build a fresh optimizer by name (state is per run, so never share one)."""
+
+    try:
+        factory = OPTIMIZERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown optimizer '{name}'. Available: {', '.join(sorted(OPTIMIZERS))}") from None
+    return factory()
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+# Data-parallel gradient computation.
+#
+# The dataset's x/y columns are copied once into a shared-memory block, and a
+# persistent pool of worker processes each owns a contiguous shard of it.
+# Every step, the parent sends the (small) params dict to each worker; each
+# worker reduces its shard to a partial loss sum and gradient sum; the parent
+# adds the partials, divides by N and applies the usual update through the
+# shared driver. Only params and partial sums cross process boundaries, never
+# the data.
+#
+# Workers are started with the "fork" method where available so predict/loss
+# and rule closures (which can't be pickled) are inherited directly. On
+# platforms without fork they must be picklable, module-level functions.
+#
+# Results match the serial engines up to floating-point summation order.
+
+import multiprocessing as mp
+import traceback
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .batched import BatchData, _grad_total, as_columns
+from .training import (
+    BufferedParams,
+    LossFn,
+    ObserverFn,
+    Optimizer,
+    Params,
+    PredictFn,
+    Recorder,
+    RuleFn,
+    Scalar,
+    StepProfiler,
+    _run_history,
+)
+
+def _shared_columns(
+    shm: SharedMemory, x_shape: Tuple[int, ...], y_shape: Tuple[int, ...]
+) -> Tuple[np.ndarray, np.ndarray]:
+    # x then y, back to back. Either may be (N,) or (N, D).
+    xs = np.ndarray(x_shape, dtype=np.float64, buffer=shm.buf)
+    ys = np.ndarray(y_shape, dtype=np.float64, buffer=shm.buf, offset=xs.nbytes)
+    return xs, ys
+
+
+# Scalar workers convert their shard to Python floats this many points at a
+# time, so per-worker memory stays bounded instead of mirroring the shard.
+_CHUNK = 65536
+
+
+def _shard_sums(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    params: Params,
+    predict: PredictFn,
+    loss: LossFn,
+    rule: RuleFn,
+    batched: bool,
+) -> Tuple[Scalar, Dict[str, Scalar]]:
+    if batched:
+        y_hat = predict(xs, params)
+        grads = rule(xs, ys, y_hat, params)
+        sums = {k: 0.0 for k in params}
+        for name, value in grads.items():
+            # Floats for scalar params, param-shaped arrays for array params.
+            sums[name] = _grad_total(value, params[name])
+        return float(np.sum(loss(y_hat, ys))), sums
+
+    # Same per-sample accumulation as the scalar engine, minus the division
+    # by N, which only the parent can do once all shards are in.
+    total_loss = 0.0
+    sums = {k: 0.0 for k in params}
+    for start in range(0, xs.shape[0], _CHUNK):
+        stop = start + _CHUNK
+        # Floats for scalar columns, row views for matrix columns, as when
+        # iterating an ArrayDataset.
+        x_rows = xs[start:stop].tolist() if xs.ndim == 1 else list(xs[start:stop])
+        y_rows = ys[start:stop].tolist() if ys.ndim == 1 else list(ys[start:stop])
+        for x, y in zip(x_rows, y_rows):
+            y_hat = predict(x, params)
+            total_loss += loss(y_hat, y)
+            for name, value in rule(x, y, y_hat, params).items():
+                sums[name] = sums.get(name, 0.0) + value
+    return total_loss, sums
+
+
+def _worker(
+    conn: Connection,
+    shm_name: str,
+    x_shape: Tuple[int, ...],
+    y_shape: Tuple[int, ...],
+    start: int,
+    stop: int,
+    predict: PredictFn,
+    loss: LossFn,
+    rule: RuleFn,
+    batched: bool,
+) -> None:
+    shm = SharedMemory(name=shm_name)
+    try:
+        columns = _shared_columns(shm, x_shape, y_shape)
+        xs, ys = columns[0][start:stop], columns[1][start:stop]
+        # Each worker keeps one params dict and updates it in place, so the
+        # user's functions see an ordinary dict as in the serial engines.
+        params: Params = {}
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            params.update(message)
+            try:
+                conn.send(("ok", _shard_sums(xs, ys, params, predict, loss, rule, batched)))
+            except Exception:
+                conn.send(("error", traceback.format_exc()))
+        # Drop our views before closing, or the buffer can't be released.
+        del columns, xs, ys
+    finally:
+        shm.close()
+
+
+class DataParallel:
+    """
+    A persistent pool of shard workers over shared-memory x/y columns.
+
+    Use as a context manager (or call close()) so workers exit and the shared
+    block is unlinked. `step_fn` plugs into the same driver as the serial
+    engines; `train_parallel` wraps the common case.
+    """
+
+    def __init__(
+        self,
+        data: BatchData,
+        predict: PredictFn,
+        loss: LossFn,
+        rule: RuleFn,
+        *,
+        workers: int,
+        batched: bool = False,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        xs, ys = as_columns(data)
+        self.n = xs.shape[0]
+        if self.n == 0:
+            raise ValueError("data-parallel training needs at least one data point")
+        workers = min(workers, self.n)
+
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+
+        self._conns: List[Connection] = []
+        self._procs: List[mp.process.BaseProcess] = []
+        self._shm: SharedMemory | None = SharedMemory(create=True, size=max(1, xs.nbytes + ys.nbytes))
+        try:
+            shared_x, shared_y = _shared_columns(self._shm, xs.shape, ys.shape)
+            shared_x[...] = xs
+            shared_y[...] = ys
+            del shared_x, shared_y
+
+            methods = mp.get_all_start_methods()
+            ctx = mp.get_context("fork" if "fork" in methods else None)
+            bounds = np.linspace(0, self.n, workers + 1).astype(int).tolist()
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                parent_conn, child_conn = ctx.Pipe()
+                proc = ctx.Process(
+                    target=_worker,
+                    args=(child_conn, self._shm.name, xs.shape, ys.shape, start, stop, predict, loss, rule, batched),
+                    daemon=True,
+                )
+                proc.start()
+                child_conn.close()
+                self._conns.append(parent_conn)
+                self._procs.append(proc)
+        except BaseException:
+            # Stop any workers already started and unlink the block, or it
+            # outlives the process as a leaked /psm_* segment.
+            self.close()
+            raise
+
+    @property
+    def workers(self) -> int:
+        return len(self._procs)
+
+    def step_fn(self, params: Params) -> Tuple[Scalar, Mapping[str, Scalar]]:
+        snapshot = dict(params)
+        for conn in self._conns:
+            conn.send(snapshot)
+
+        total_loss = 0.0
+        grads_sum: Dict[str, Scalar] = {k: 0.0 for k in params}
+        # Reduce in shard order so results are deterministic run to run.
+        for conn in self._conns:
+            status, payload = conn.recv()
+            if status != "ok":
+                raise RuntimeError(f"data-parallel worker failed:\n{payload}")
+            shard_loss, shard_grads = payload
+            total_loss += shard_loss
+            for name, value in shard_grads.items():
+                grads_sum[name] = grads_sum.get(name, 0.0) + value
+
+        n = float(self.n)
+        if isinstance(params, BufferedParams):
+            params.zero_grad()
+            params.accumulate(grads_sum)
+            return total_loss / n, params.finish_grad(n)
+        for name in grads_sum:
+            grads_sum[name] /= n
+        return total_loss / n, grads_sum
+
+    def close(self) -> None:
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._conns, self._procs = [], []
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> DataParallel:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def train_parallel(
+    data: BatchData,
+    params: Params,
+    predict: PredictFn,
+    loss: LossFn,
+    rule: RuleFn,
+    *,
+    steps: int,
+    lr: float,
+    workers: int,
+    batched: bool = False,
+    observer: ObserverFn | Sequence[ObserverFn] | None = None,
+    recorder: Recorder | None = None,
+    optimizer: Optimizer | None = None,
+    profiler: StepProfiler | None = None,
+) -> List[Scalar]:
+    """
+    Full-batch training with the gradient computation sharded over processes.
+
+    `batched=False` calls predict/loss/rule per sample (scalar engine
+    contract); `batched=True` hands each worker its shard as NumPy columns
+    (batched engine contract). History and observers behave like train().
+    A profiler sees the whole sharded computation as the "gradient" phase;
+    per-sample phases run in the workers and aren't broken out.
+    """
+
+    if steps < 0:
+        raise ValueError("steps must be non-negative")
+    columns = as_columns(data)
+    if len(columns[0]) == 0:
+        return [0.0 for _ in range(steps)]
+
+    with DataParallel(columns, predict, loss, rule, workers=workers, batched=batched) as pool:
+        return _run_history(
+            pool.step_fn,
+            params,
+            steps=steps,
+            lr=lr,
+            observer=observer,
+            recorder=recorder,
+            optimizer=optimizer,
+            profiler=profiler,
+        )
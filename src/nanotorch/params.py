@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+# Array-backed parameter store.
+#
+# A plain Dict[str, float] is the most inspectable way to hold parameters, and
+# it stays the default. Its cost shows up with thousands of parameters: every
+# step builds a fresh grads_sum dict, and every update is a string-keyed
+# lookup that allocates a new float. ParamStore fixes the name -> index layout
+# once and keeps values and gradients in two contiguous float64 arrays that
+# are reused for the whole run.
+#
+# Reads and writes from user code go through memoryviews over those arrays,
+# which hand back plain Python floats without going through NumPy's scalar
+# machinery, so `p["w"] * x + p["b"]` in a predict function stays cheap.
+
+from typing import Dict, Iterable, Iterator, Mapping, MutableMapping, Tuple
+
+import numpy as np
+
+Scalar = float
+
+
+def require_scalars(params: Mapping[str, object], what: str) -> None:
+    """
+    Raise ValueError if any param is an array; `what` names the consumer.
+
+    Traces, the result cache, charts and ParamStore hold one float per
+    param. Matrix params train fine, but these consumers reject them up
+    front rather than failing deep inside NumPy.
+    """
+
+    for name, value in params.items():
+        if np.ndim(value):
+            raise ValueError(f"{what} needs scalar params; {name!r} is an array of shape {np.shape(value)}")
+
+
+class GradView(Mapping[str, Scalar]):
+    """Read-only name -> gradient view over a ParamStore's gradient buffer."""
+
+    def __init__(self, store: ParamStore) -> None:
+        self._store = store
+
+    def __getitem__(self, name: str) -> Scalar:
+        return self._store._grad_view[self._store.index[name]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.names)
+
+    def __len__(self) -> int:
+        return len(self._store.names)
+
+
+class ParamStore(MutableMapping[str, Scalar]):
+    """
+    Fixed-layout parameter container over a contiguous float array.
+
+    Behaves like the dict it replaces for reading and updating existing
+    names, but the set of names is fixed at construction: adding or deleting
+    a key raises, because the array layout (and any buffers sized from it)
+    would silently go stale.
+    """
+
+    def __init__(self, values: Mapping[str, Scalar] | Iterable[Tuple[str, Scalar]]) -> None:
+        items = list(values.items()) if isinstance(values, Mapping) else list(values)
+        require_scalars(dict(items), "ParamStore")
+        self.names: Tuple[str, ...] = tuple(name for name, _ in items)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        if len(self.index) != len(self.names):
+            raise ValueError("parameter names must be unique")
+
+        self.values = np.array([float(v) for _, v in items], dtype=np.float64)
+        # Gradient buffer plus a scratch array for the update, both allocated
+        # once so steady-state training allocates nothing per step here.
+        self.grad = np.zeros_like(self.values)
+        self._scratch = np.zeros_like(self.values)
+        self._value_view = memoryview(self.values)
+        self._grad_view = memoryview(self.grad)
+        self.grads = GradView(self)
+
+    # -- Mapping interface used by predict/loss/rules -------------------------
+
+    def __getitem__(self, name: str) -> Scalar:
+        return self._value_view[self.index[name]]
+
+    def __setitem__(self, name: str, value: Scalar) -> None:
+        try:
+            i = self.index[name]
+        except KeyError:
+            raise KeyError(f"'{name}' is not in this ParamStore's fixed layout") from None
+        self._value_view[i] = value
+
+    def __delitem__(self, name: str) -> None:
+        raise TypeError("ParamStore has a fixed layout; parameters can't be removed")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __repr__(self) -> str:
+        return f"ParamStore({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Scalar]:
+        return dict(zip(self.names, self.values.tolist()))
+
+    # -- Buffered-gradient protocol used by the training loop -----------------
+
+    def zero_grad(self) -> None:
+        self.grad.fill(0.0)
+
+    def accumulate(self, grads: Mapping[str, object]) -> None:
+        """Add one rule result (scalars or per-sample columns) into the buffer."""
+
+        index = self.index
+        view = self._grad_view
+        for name, value in grads.items():
+            if isinstance(value, float):
+                view[index[name]] += value
+            else:
+                # Batched rules hand back whole columns; reduce without
+                # leaving NumPy.
+                self.grad[index[name]] += np.sum(value)
+
+    def finish_grad(self, n: float) -> Mapping[str, Scalar]:
+        """Turn the accumulated sum into a mean in place and expose it by name."""
+
+        self.grad /= n
+        return self.grads
+
+    def apply_update(self, lr: float) -> None:
+        # values -= lr * grad, staged through the scratch buffer so neither
+        # step allocates a temporary array.
+        np.multiply(self.grad, lr, out=self._scratch)
+        np.subtract(self.values, self._scratch, out=self.values)
+
+
+class FlatLayout:
+    """
+    Where each parameter lives in one flat float64 vector.
+
+    Params may mix plain floats with NumPy arrays (a weight matrix, a bias
+    vector). Code that works on a single parameter vector (optimizers,
+    numeric gradient estimators) packs them through this layout and unpacks
+    results back into the same names and shapes. `shapes` lists only the
+    array-valued params; the rest take one slot each.
+    """
+
+    def __init__(self, names: Iterable[str], shapes: Mapping[str, Tuple[int, ...]] | None = None) -> None:
+        self.names: Tuple[str, ...] = tuple(names)
+        self.shapes: Dict[str, Tuple[int, ...]] = dict(shapes or {})
+        self.slices: Dict[str, slice] = {}
+        offset = 0
+        for name in self.names:
+            size = int(np.prod(self.shapes[name])) if name in self.shapes else 1
+            self.slices[name] = slice(offset, offset + size)
+            offset += size
+        self.size = offset
+
+    @classmethod
+    def of(cls, params: Mapping[str, object]) -> FlatLayout:
+        shapes = {name: np.shape(v) for name, v in params.items() if not isinstance(v, float) and np.ndim(v)}
+        return cls(params, shapes)
+
+    @property
+    def scalar_only(self) -> bool:
+        return not self.shapes
+
+    def pack(self, values: Mapping[str, object], out: np.ndarray) -> np.ndarray:
+        """Write `values` (missing names count as 0) into `out` and return it."""
+
+        for name in self.names:
+            out[self.slices[name]] = np.ravel(values.get(name, 0.0))
+        return out
+
+    def unpack(self, flat: np.ndarray) -> Dict[str, object]:
+        """Values by name: floats, or arrays that are views into `flat`."""
+
+        out: Dict[str, object] = {}
+        for name in self.names:
+            where = self.slices[name]
+            shape = self.shapes.get(name)
+            out[name] = flat[where].reshape(shape) if shape is not None else float(flat[where.start])
+        return out
+
+    def write(self, params: MutableMapping[str, object], flat: np.ndarray) -> None:
+        """Store `flat` into `params`; array params are updated in place."""
+
+        for name, value in self.unpack(flat).items():
+            if name in self.shapes:
+                np.copyto(params[name], value)
+            else:
+                params[name] = value
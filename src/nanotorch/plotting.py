@@ -2,13 +2,44 @@ from __future__ import annotations
 
 # Plotting lives in the library so it can be exposed as a console script
 # ("nanotorch-plot") and so the logic is reusable from other contexts.
+#
+# Charts are drawn with the object-oriented Figure API rather than pyplot, so
+# there is no global figure state and any number of worker processes can
+# render side by side. `plot_all` only renders charts whose inputs changed:
+# a manifest next to the PNGs records a hash per chart, namely the run's
+# result-cache key (data, params, functions, lr, steps) plus the renderer
+# version. Unchanged charts are skipped without touching matplotlib.
+#
+# matplotlib, NumPy and the result cache are imported inside the functions
+# that use them, so `nanotorch-plot --help` (and importing this module) stays
+# cheap.
+#
+# Keyword arguments (`--param n=1000000` on the command line) select members
+# of scenario families. Large datasets are drawn as an evenly strided sample
+# of at most _MAX_POINTS points; the model lines still come from the full
+# run.
 
+import argparse
+import ast
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Sequence, Tuple
 
-import matplotlib.pyplot as plt
+from nanotorch.scenarios import Scenario, get_scenario, list_scenarios
 
-from nanotorch import manual_gradient, train
-from nanotorch.scenarios import get_scenario, list_scenarios
+if TYPE_CHECKING:
+    import numpy as np
+
+    from nanotorch.cache import ResultCache
+
+MANIFEST = "manifest.json"
+# Bump whenever the chart's appearance changes, so every chart re-renders.
+RENDER_VERSION = 2
+# Scatter at most this many data points per chart.
+_MAX_POINTS = 5_000
 
 
 def _x_range(xs: list[float]) -> list[float]:
@@ -23,60 +54,220 @@ def _x_range(xs: list[float]) -> list[float]:
     return [lo - pad, hi + pad]
 
 
-def _line(predict, params, x_min: float, x_max: float, steps: int = 50) -> tuple[list[float], list[float]]:
-    xs = [x_min + i * (x_max - x_min) / (steps - 1) for i in range(steps)]
-    ys = [predict(x, params) for x in xs]
+def _line(
+    predict, params, x_min: float, x_max: float, steps: int = 50, batch_predict=None
+) -> tuple[np.ndarray, np.ndarray]:
+    import numpy as np
+
+    xs = np.linspace(x_min, x_max, steps)
+    if batch_predict is not None:
+        # One vectorized call instead of `steps` scalar ones.
+        ys = np.broadcast_to(np.asarray(batch_predict(xs, params), dtype=np.float64), xs.shape)
+    else:
+        ys = np.fromiter((predict(x, params) for x in xs.tolist()), dtype=np.float64, count=steps)
     return xs, ys
 
 
-def plot_scenario(name: str, out_dir: Path) -> Path:
-    scenario = get_scenario(name)
+def chart_path(scenario: Scenario, out_dir: Path) -> Path:
+    return out_dir / f"{scenario.test_name}_chart.png"
 
-    xs = [x for x, _ in scenario.data]
-    ys = [y for _, y in scenario.data]
 
-    x_min, x_max = _x_range(xs)
+def _points(data: Any) -> Tuple[np.ndarray, np.ndarray]:
+    import numpy as np
 
-    # Preserve the initial params for the "before" line.
-    initial_params = dict(scenario.params)
+    from nanotorch.dataset import ArrayDataset
 
-    rule = manual_gradient(scenario.grad)
-    train(
-        scenario.data,
-        scenario.params,
-        scenario.predict,
-        scenario.loss,
-        rule,
-        steps=scenario.steps,
-        lr=scenario.lr,
-    )
+    if isinstance(data, ArrayDataset):
+        xs, ys = data.columns()
+    else:
+        xs = np.asarray([x for x, _ in data], dtype=np.float64)
+        ys = np.asarray([y for _, y in data], dtype=np.float64)
+    stride = -(-len(xs) // _MAX_POINTS)
+    return xs[::stride], ys[::stride]
+
+
+def plot_scenario(name: str, out_dir: Path, cache: ResultCache | None = None, **params: Any) -> Path:
+    """
+    Render one scenario's chart; keyword arguments select a family member,
+    e.g. plot_scenario("noisy_linear", out, n=10_000_000).
+    """
+
+    from matplotlib.figure import Figure
+
+    from nanotorch.cache import scenario_run
+
+    from nanotorch.params import require_scalars
+
+    scenario = get_scenario(name, **params)
+    require_scalars(scenario.params, f"plotting '{name}'")
 
-    x_line, y_init = _line(scenario.predict, initial_params, x_min, x_max)
-    _, y_final = _line(scenario.predict, scenario.params, x_min, x_max)
+    xs, ys = _points(scenario.data)
+    x_min, x_max = _x_range(xs.tolist())
 
-    plt.figure(figsize=(6, 4))
-    plt.scatter(xs, ys, color="black", label="data")
-    plt.plot(x_line, y_init, linestyle="--", label="initial")
-    plt.plot(x_line, y_final, linestyle="-", label="trained")
-    plt.title(f"{scenario.test_name}")
-    plt.xlabel("x")
-    plt.ylabel("y")
-    plt.legend()
-    plt.tight_layout()
+    # Read the run from the result cache instead of re-training; it only
+    # trains when no run with identical inputs has been stored yet.
+    run = scenario_run(name, cache, **params)
+    initial_params = run.initial_params
+    final_params = run.final_params
+
+    x_line, y_init = _line(scenario.predict, initial_params, x_min, x_max, batch_predict=scenario.batch_predict)
+    _, y_final = _line(scenario.predict, final_params, x_min, x_max, batch_predict=scenario.batch_predict)
+
+    fig = Figure(figsize=(6, 4), layout="tight")
+    ax = fig.subplots()
+    ax.scatter(xs, ys, color="black", label="data")
+    ax.plot(x_line, y_init, linestyle="--", label="initial")
+    ax.plot(x_line, y_final, linestyle="-", label="trained")
+    ax.set_title(f"{scenario.test_name}")
+    ax.set_xlabel("x")
+    ax.set_ylabel("y")
+    ax.legend()
 
     out_dir.mkdir(parents=True, exist_ok=True)
-    out_path = out_dir / f"{scenario.test_name}_chart.png"
-    plt.savefig(out_path)
-    plt.close()
+    out_path = chart_path(scenario, out_dir)
+    fig.savefig(out_path)
 
     return out_path
 
 
-def main() -> None:
-    out_dir = Path("artifacts/plots")
-    for name in list_scenarios():
-        path = plot_scenario(name, out_dir)
+def input_hash(scenario: Scenario, salt: str = "", *, family: bool = False) -> str | None:
+    """
+    Hash of everything a scenario's chart depends on; None if not hashable.
+
+    `salt` is the result cache's salt and `family` whether the scenario is a
+    family member, so charts follow the runs they draw.
+    """
+
+    from nanotorch.cache import run_key, standard_run
+
+    key = run_key(**standard_run(scenario, family=family), salt=salt)
+    if key is None:
+        return None
+    return hashlib.sha256(f"{key}:{scenario.test_name}:{RENDER_VERSION}".encode()).hexdigest()
+
+
+def _read_manifest(out_dir: Path) -> Dict[str, str]:
+    try:
+        return json.loads((out_dir / MANIFEST).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_manifest(out_dir: Path, manifest: Dict[str, str]) -> None:
+    path = out_dir / MANIFEST
+    tmp = path.with_name(f".{MANIFEST}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _render(name: str, out_dir: Path, cache: ResultCache, params: Mapping[str, Any]) -> Path:
+    # Top-level so worker processes can unpickle it. The cache itself is
+    # passed (it pickles), so workers keep its salt and eviction limits.
+    return plot_scenario(name, out_dir, cache, **params)
+
+
+@dataclass
+class PlotResult:
+    rendered: List[Path] = field(default_factory=list)
+    skipped: List[Path] = field(default_factory=list)
+
+
+def plot_all(
+    names: Sequence[str] | None = None,
+    out_dir: Path = Path("artifacts/plots"),
+    *,
+    workers: int | None = None,
+    force: bool = False,
+    cache: ResultCache | None = None,
+    **params: Any,
+) -> PlotResult:
+    """
+    Render the charts for `names` (default: every registry scenario).
+
+    Keyword arguments select the same member of every named family, e.g.
+    plot_all(["noisy_linear"], n=10_000_000). Charts whose manifest hash still matches and whose PNG exists are
+    skipped unless `force`. The rest render in up to `workers` processes
+    (default: one per CPU; 1 renders in this process).
+    """
+
+    from nanotorch.cache import ResultCache
+    from nanotorch.params import require_scalars
+
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be at least 1")
+    if params and names is None:
+        raise ValueError("family parameters need the scenario names to apply them to")
+    names = list(list_scenarios() if names is None else names)
+    if cache is None:
+        cache = ResultCache()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = _read_manifest(out_dir)
+
+    result = PlotResult()
+    todo: Dict[str, str | None] = {}
+    for name in names:
+        scenario = get_scenario(name, **params)
+        # Checked before any chart is scheduled, not inside a worker.
+        require_scalars(scenario.params, f"plotting '{name}'")
+        path = chart_path(scenario, out_dir)
+        digest = input_hash(scenario, cache.salt, family=bool(params))
+        if not force and digest is not None and manifest.get(path.name) == digest and path.exists():
+            result.skipped.append(path)
+        else:
+            todo[name] = digest
+
+    workers = min(workers or os.cpu_count() or 1, len(todo))
+    if workers <= 1:
+        paths = [_render(name, out_dir, cache, params) for name in todo]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            n = len(todo)
+            paths = list(pool.map(_render, todo, [out_dir] * n, [cache] * n, [params] * n))
+
+    for path, digest in zip(paths, todo.values()):
+        result.rendered.append(path)
+        if digest is None:
+            manifest.pop(path.name, None)
+        else:
+            manifest[path.name] = digest
+    if todo:
+        _write_manifest(out_dir, manifest)
+    return result
+
+
+def _param(text: str) -> Tuple[str, Any]:
+    # "n=1000000" -> ("n", 1000000); values that aren't Python literals stay strings.
+    key, sep, value = text.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got {text!r}")
+    try:
+        return key, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return key, value
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="nanotorch-plot", description="Render scenario charts.")
+    parser.add_argument("names", nargs="*", help="scenarios to plot (default: all)")
+    parser.add_argument("--out", type=Path, default=Path("artifacts/plots"))
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="re-render charts even if unchanged")
+    parser.add_argument(
+        "--param", type=_param, action="append", default=[], metavar="KEY=VALUE",
+        help="scenario family parameter, e.g. --param n=1000000 (repeatable)",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        result = plot_all(args.names or None, args.out, workers=args.workers, force=args.force, **dict(args.param))
+    except ValueError as exc:
+        parser.error(str(exc))
+    for path in result.rendered:
         print(f"wrote {path}")
+    for path in result.skipped:
+        print(f"up to date {path}")
 
 
 if __name__ == "__main__":
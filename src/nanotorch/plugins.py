@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+# Third-party scenarios and rules, discovered through package entry points.
+#
+# A distribution can ship extra registry entries without nanotorch importing
+# it up front:
+#
+#   [project.entry-points."nanotorch.scenarios"]
+#   my_fit = "mypkg.scenarios:my_fit"          # () -> Scenario
+#
+#   [project.entry-points."nanotorch.rules"]
+#   my_rule = "mypkg.rules:my_rule"            # (Scenario) -> RuleFn
+#
+# Discovery only reads installed metadata (the names); the target module is
+# imported the first time its factory is called. Nothing happens at all until
+# a registry lookup misses or the full list of names is asked for, so
+# `import nanotorch` never scans site-packages.
+
+from typing import Any, Callable, Dict
+
+SCENARIO_GROUP = "nanotorch.scenarios"
+RULE_GROUP = "nanotorch.rules"
+
+
+def _deferred(entry_point: Any) -> Callable[..., Any]:
+    def factory(*args: Any, **kwargs: Any) -> Any:
+        return entry_point.load()(*args, **kwargs)
+
+    factory.__name__ = entry_point.name
+    factory.__qualname__ = f"entry point {entry_point.value}"
+    return factory
+
+
+def entry_point_factories(group: str) -> Dict[str, Callable[..., Any]]:
+    """Factories for every entry point in `group`, loaded on first call."""
+
+    from importlib.metadata import entry_points
+
+    return {ep.name: _deferred(ep) for ep in entry_points(group=group)}
+
+
+def discover(registry: Dict[str, Callable[..., Any]], group: str) -> None:
+    """Add `group`'s entry points to `registry`; entries already there win."""
+
+    for name, factory in entry_point_factories(group).items():
+        registry.setdefault(name, factory)
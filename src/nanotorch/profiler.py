@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+# Opt-in per-phase profiler for the training loop.
+#
+# A step splits into phases:
+#   gradient   the engine's step function: predict + loss + rule for every
+#              sample (or one call each for the batched engine), plus the
+#              accumulation around them
+#     predict / loss / rule   time inside the user's functions, nested in
+#              "gradient"
+#   update     applying the gradients (plain update or an optimizer)
+#   recorder / observers      the per-step hooks
+#
+# Profiling costs nothing unless a Profiler is passed in. Without one, the
+# loop runs exactly the uninstrumented code. With one, predict/loss/rule are
+# wrapped in timing closures and the driver brackets each phase with
+# perf_counter_ns() calls.
+#
+# Per-step totals land in `profiler.steps` and on StepState.profile. The
+# whole run exports as Chrome trace-event JSON, which chrome://tracing and
+# ui.perfetto.dev open as a timeline.
+
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+SAMPLE_PHASES = ("predict", "loss", "rule")
+STEP_PHASES = ("gradient", "update", "recorder", "observers")
+
+
+class Profiler:
+    """
+    Collect per-phase wall time for a training run.
+
+    Pass it as `train(..., profiler=Profiler())`. With `sample_events=True`,
+    every predict/loss/rule call also becomes its own trace event (capped at
+    `max_events`); otherwise per-sample phases show up as per-step totals.
+    """
+
+    def __init__(self, *, sample_events: bool = False, max_events: int = 1_000_000) -> None:
+        self.sample_events = sample_events
+        self.max_events = max_events
+        # Nanosecond totals for the whole run and for the step in progress.
+        self.totals: Dict[str, int] = {}
+        self.calls: Dict[str, int] = {}
+        self._current: Dict[str, int] = {}
+        # One dict of phase -> seconds per finished step.
+        self.steps: List[Dict[str, float]] = []
+        self._step = -1
+        self._step_start = 0
+        # (name, start_ns, duration_ns, args) in the order they finished.
+        self._events: List[Tuple[str, int, int, Dict[str, Any]]] = []
+        self._origin = time.perf_counter_ns()
+
+    # -- Instrumentation hooks used by the engines -----------------------------
+
+    def wrap(self, phase: str, fn: F) -> F:
+        """Return `fn` timed under `phase` (used for predict/loss/rule)."""
+
+        clock = time.perf_counter_ns
+        current, calls, events = self._current, self.calls, self._events
+        detailed, cap = self.sample_events, self.max_events
+
+        def timed(*args: Any) -> Any:
+            start = clock()
+            try:
+                return fn(*args)
+            finally:
+                elapsed = clock() - start
+                current[phase] = current.get(phase, 0) + elapsed
+                calls[phase] = calls.get(phase, 0) + 1
+                if detailed and len(events) < cap:
+                    events.append((phase, start, elapsed, {}))
+
+        return timed  # type: ignore[return-value]
+
+    def instrument(self, predict: F, loss: F, rule: F) -> Tuple[F, F, F]:
+        return self.wrap("predict", predict), self.wrap("loss", loss), self.wrap("rule", rule)
+
+    def start_step(self, step: int) -> None:
+        self._step = step
+        self._current.clear()
+        self._step_start = time.perf_counter_ns()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            self._current[name] = self._current.get(name, 0) + elapsed
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if len(self._events) < self.max_events:
+                self._events.append((name, start, elapsed, {"step": self._step}))
+
+    def step_profile(self) -> Dict[str, float]:
+        """Seconds per phase so far in the current step."""
+
+        return {name: ns / 1e9 for name, ns in self._current.items()}
+
+    def end_step(self) -> Dict[str, float]:
+        end = time.perf_counter_ns()
+        for name, ns in self._current.items():
+            self.totals[name] = self.totals.get(name, 0) + ns
+        profile = self.step_profile()
+        profile["step"] = (end - self._step_start) / 1e9
+        self.totals["step"] = self.totals.get("step", 0) + (end - self._step_start)
+        self.steps.append(profile)
+        if len(self._events) < self.max_events:
+            # Per-sample phases are totals, so they go on the step event as
+            # args instead of pretending to be one contiguous span.
+            args = {"step": self._step}
+            args.update({f"{p}_ms": self._current[p] / 1e6 for p in SAMPLE_PHASES if p in self._current})
+            self._events.append(("step", self._step_start, end - self._step_start, args))
+        return profile
+
+    # -- Reporting --------------------------------------------------------------
+
+    def summary(self) -> str:
+        """Text table of total time, share of the run and calls per phase."""
+
+        total = self.totals.get("step", 0) or 1
+        lines = [f"{'phase':<10} {'total ms':>10} {'share':>7} {'calls':>9}"]
+        for name in ("step", *STEP_PHASES, *SAMPLE_PHASES):
+            if name in self.totals:
+                ns = self.totals[name]
+                calls = self.calls.get(name, len(self.steps))
+                lines.append(f"{name:<10} {ns / 1e6:>10.3f} {ns / total:>7.1%} {calls:>9}")
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The run as Chrome trace-event JSON (complete events plus per-step counters)."""
+
+        events: List[Dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "nanotorch training"}}
+        ]
+        for name, start, duration, args in self._events:
+            events.append(
+                {
+                    "name": name,
+                    "cat": "sample" if name in SAMPLE_PHASES else "step",
+                    "ph": "X",
+                    "ts": (start - self._origin) / 1e3,
+                    "dur": duration / 1e3,
+                    "pid": 1,
+                    "tid": 1,
+                    "args": args,
+                }
+            )
+            if name == "step":
+                # Counter track: how each step's time splits across phases.
+                split = {p: v for p, v in args.items() if p.endswith("_ms")}
+                if split:
+                    events.append(
+                        {
+                            "name": "per-sample phases (ms)",
+                            "ph": "C",
+                            "ts": (start - self._origin) / 1e3,
+                            "pid": 1,
+                            "args": split,
+                        }
+                    )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
+        return path
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Tuple
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .dataset import ArrayDataset
 
 # Scenario registry exists to keep tests and visualizations in sync.
 # If we change a dataset or model, we change it once here and both
@@ -20,13 +24,25 @@ class Scenario:
     name: str
     test_name: str
     description: str
-    data: List[DataPoint]
+    # Hand-written scenarios use a list of points; file-backed ones use a
+    # memory-mapped ArrayDataset, which iterates exactly like that list.
+    # x and y may be vectors and params arrays (see the linear_regression
+    # family in nanotorch.synthetic).
+    data: List[DataPoint] | ArrayDataset
     params: Params
     predict: PredictFn
     loss: LossFn
     grad: GradFn
     steps: int
     lr: float
+    # Batched equivalents for nanotorch.batched: same math, but x/y/y_hat are
+    # whole NumPy columns. Optional so hand-built scenarios stay scalar-only.
+    batch_predict: Optional[PredictFn] = None
+    batch_loss: Optional[LossFn] = None
+    batch_grad: Optional[GradFn] = None
+    # (weight,) or (weight, bias) when the model is y = w*x (+ b) with squared
+    # loss, which lets nanotorch.linear train it from sufficient statistics.
+    linear: Optional[Tuple[str, ...]] = None
 
 
 def _single_point() -> Scenario:
@@ -54,6 +70,12 @@ def _single_point() -> Scenario:
         grad=grad,
         steps=10,
         lr=0.1,
+        # Every operation above is elementwise, so the same closures broadcast
+        # over NumPy columns unchanged; no separate batched math to drift.
+        batch_predict=predict,
+        batch_loss=loss,
+        batch_grad=grad,
+        linear=("w", "b"),
     )
 
 
@@ -82,6 +104,10 @@ def _multi_point_no_bias() -> Scenario:
         grad=grad,
         steps=25,
         lr=0.05,
+        batch_predict=predict,
+        batch_loss=loss,
+        batch_grad=grad,
+        linear=("w",),
     )
 
 
@@ -110,6 +136,10 @@ def _with_bias() -> Scenario:
         grad=grad,
         steps=40,
         lr=0.05,
+        batch_predict=predict,
+        batch_loss=loss,
+        batch_grad=grad,
+        linear=("w", "b"),
     )
 
 
@@ -138,6 +168,10 @@ def _constant_target() -> Scenario:
         grad=grad,
         steps=40,
         lr=0.05,
+        batch_predict=predict,
+        batch_loss=loss,
+        batch_grad=grad,
+        linear=("w", "b"),
     )
 
 
@@ -167,6 +201,59 @@ def _noisy_linear() -> Scenario:
         grad=grad,
         steps=60,
         lr=0.03,
+        batch_predict=predict,
+        batch_loss=loss,
+        batch_grad=grad,
+        linear=("w", "b"),
+    )
+
+
+def dataset_scenario(
+    name: str,
+    data: str | Path | ArrayDataset,
+    *,
+    steps: int,
+    lr: float,
+    bias: bool = True,
+    description: str | None = None,
+) -> Scenario:
+    """
+    Build a linear squared-error scenario around an on-disk or in-memory dataset.
+
+    `data` may be a path to a columnar dataset file (opened via mmap, so this
+    is O(1) in file size) or an already-open ArrayDataset.
+    """
+
+    from .dataset import ArrayDataset, open_dataset
+
+    dataset = data if isinstance(data, ArrayDataset) else open_dataset(data)
+    params = {"w": 0.0, "b": 0.0} if bias else {"w": 0.0}
+
+    def predict(x: Scalar, p: Params) -> Scalar:
+        return p["w"] * x + p["b"] if bias else p["w"] * x
+
+    def loss(y_hat: Scalar, y: Scalar) -> Scalar:
+        return (y_hat - y) ** 2
+
+    def grad(x: Scalar, y: Scalar, y_hat: Scalar, p: Params) -> Dict[str, Scalar]:
+        err = y_hat - y
+        return {"w": 2 * err * x, "b": 2 * err} if bias else {"w": 2 * err * x}
+
+    return Scenario(
+        name=name,
+        test_name=f"test_{name}",
+        description=description or f"Linear fit on dataset '{name}' ({len(dataset)} points).",
+        data=dataset,
+        params=params,
+        predict=predict,
+        loss=loss,
+        grad=grad,
+        steps=steps,
+        lr=lr,
+        batch_predict=predict,
+        batch_loss=loss,
+        batch_grad=grad,
+        linear=("w", "b") if bias else ("w",),
     )
 
 
@@ -179,11 +266,85 @@ _SCENARIOS = {
 }
 
 
+def _family(attr: str) -> Callable[..., Scenario]:
+    # Families live in nanotorch.synthetic, which needs NumPy; import it only
+    # when a family is actually requested.
+    def factory(**params: object) -> Scenario:
+        from . import synthetic
+
+        return getattr(synthetic, attr)(**params)
+
+    return factory
+
+
+# Parameterized families: get_scenario(name, n=..., noise=..., seed=...).
+# A name can be both a fixed scenario and a family; without keyword
+# arguments the fixed one is returned.
+_FAMILIES: Dict[str, Callable[..., Scenario]] = {
+    "noisy_linear": _family("noisy_linear"),
+    "polynomial": _family("polynomial"),
+    "linear_regression": _family("linear_regression"),
+}
+
+
+# Entry-point scenarios (see nanotorch.plugins) join the registry the first
+# time a lookup misses or the names are listed, not at import.
+_discovered = False
+
+
+def _discover() -> None:
+    global _discovered
+    if not _discovered:
+        from .plugins import SCENARIO_GROUP, discover
+
+        discover(_SCENARIOS, SCENARIO_GROUP)
+        _discovered = True
+
+
+def register_scenario(name: str, factory: Callable[[], Scenario]) -> None:
+    """
+    Add a scenario factory to the registry (e.g. one wrapping dataset_scenario).
+
+    Factories are called on every get_scenario() so each caller gets fresh,
+    unshared params; a file-backed factory only pays for an mmap each time.
+    """
+
+    if name in _SCENARIOS:
+        raise ValueError(f"Scenario '{name}' is already registered")
+    _SCENARIOS[name] = factory
+
+
+def register_family(name: str, factory: Callable[..., Scenario]) -> None:
+    """Add a parameterized scenario factory, called as factory(**params)."""
+
+    if name in _FAMILIES:
+        raise ValueError(f"Scenario family '{name}' is already registered")
+    _FAMILIES[name] = factory
+
+
 def list_scenarios() -> List[str]:
+    _discover()
     return sorted(_SCENARIOS.keys())
 
 
-def get_scenario(name: str) -> Scenario:
+def list_families() -> List[str]:
+    return sorted(_FAMILIES.keys())
+
+
+def get_scenario(name: str, **params: object) -> Scenario:
+    """
+    A fresh instance of a registry scenario.
+
+    With keyword arguments, `name` must be a family and they are passed to
+    its factory, e.g. get_scenario("noisy_linear", n=10_000_000, seed=3).
+    """
+
+    if params or (name in _FAMILIES and name not in _SCENARIOS):
+        if name not in _FAMILIES:
+            raise ValueError(f"Unknown scenario family '{name}'. Available: {', '.join(list_families())}")
+        return _FAMILIES[name](**params)
+    if name not in _SCENARIOS:
+        _discover()
     try:
         return _SCENARIOS[name]()
     except KeyError as exc:
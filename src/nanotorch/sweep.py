@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+# Hyperparameter sweeps over registry scenarios.
+#
+# A trial is one (lr, steps, rule) configuration of a named scenario. Trials
+# are fanned out over a process pool and pruned with successive halving:
+# everyone trains for a small budget, only the best 1/eta continue to the
+# next (eta times larger) budget, and so on until the survivors reach their
+# full step count. Diverged runs (non-finite or exploding loss) are dropped
+# at the first rung they show it, so they never burn a full budget.
+#
+# Workers receive only picklable values (scenario name, rule name, params,
+# history) and rebuild the scenario themselves, because scenario closures
+# can't cross a process boundary. Plain gradient descent is stateless beyond
+# the params, so resuming a trial from its params is exactly equivalent to
+# never having paused it.
+
+import math
+import os
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from .scenarios import Scenario, get_scenario
+from .training import Params, RuleFn, Scalar, finite_difference, manual_gradient, train
+
+
+def _autodiff_rule(s: Scenario) -> RuleFn:
+    from .autodiff import autodiff
+
+    return autodiff(predict=s.predict, loss=s.loss)
+
+
+# Rule names a sweep can search over, mapped to how each is built for a
+# scenario. Entry points in the "nanotorch.rules" group (see nanotorch.plugins)
+# are added the first time a name isn't found here.
+RULES: Dict[str, Callable[[Scenario], RuleFn]] = {
+    "manual": lambda s: manual_gradient(s.grad),
+    "finite_difference": lambda s: finite_difference(predict=s.predict, loss=s.loss),
+    "central": lambda s: finite_difference(predict=s.predict, loss=s.loss, method="central"),
+    "autodiff": _autodiff_rule,
+}
+_discovered = False
+
+
+def register_rule(name: str, factory: Callable[[Scenario], RuleFn]) -> None:
+    """Make `factory(scenario) -> rule` available to sweeps as `name`."""
+
+    if name in RULES:
+        raise ValueError(f"Rule '{name}' is already registered")
+    RULES[name] = factory
+
+
+def get_rule(name: str) -> Callable[[Scenario], RuleFn]:
+    global _discovered
+    if name not in RULES and not _discovered:
+        from .plugins import RULE_GROUP, discover
+
+        discover(RULES, RULE_GROUP)
+        _discovered = True
+    try:
+        return RULES[name]
+    except KeyError as exc:
+        raise ValueError(f"Unknown rule '{name}'. Available: {', '.join(sorted(RULES))}") from exc
+
+
+@dataclass(frozen=True)
+class Trial:
+    trial_id: int
+    lr: float
+    steps: int
+    rule: str = "manual"
+
+
+@dataclass
+class TrialResult:
+    trial: Trial
+    status: str = "running"  # running -> completed | pruned | diverged
+    params: Params = field(default_factory=dict)
+    history: List[Scalar] = field(default_factory=list)
+
+    @property
+    def steps_run(self) -> int:
+        return len(self.history)
+
+    @property
+    def final_loss(self) -> Scalar:
+        return self.history[-1] if self.history else math.inf
+
+    @property
+    def best_loss(self) -> Scalar:
+        finite = [v for v in self.history if math.isfinite(v)]
+        return min(finite) if finite else math.inf
+
+
+def grid_space(
+    *, lr: Sequence[float], steps: Sequence[int], rule: Sequence[str] = ("manual",)
+) -> List[Trial]:
+    """Every combination of the given values."""
+
+    return [
+        Trial(trial_id=i, lr=a, steps=b, rule=c)
+        for i, (a, b, c) in enumerate(product(lr, steps, rule))
+    ]
+
+
+def random_space(
+    *,
+    trials: int,
+    lr: Tuple[float, float],
+    steps: Sequence[int],
+    rule: Sequence[str] = ("manual",),
+    seed: int | None = None,
+) -> List[Trial]:
+    """`trials` random configurations; lr is drawn log-uniformly from its range."""
+
+    lo, hi = lr
+    if not 0 < lo <= hi:
+        raise ValueError("lr range must be positive and ordered")
+    rng = random.Random(seed)
+    return [
+        Trial(
+            trial_id=i,
+            lr=math.exp(rng.uniform(math.log(lo), math.log(hi))),
+            steps=rng.choice(list(steps)),
+            rule=rng.choice(list(rule)),
+        )
+        for i in range(trials)
+    ]
+
+
+def _advance(
+    scenario_name: str, trial: Trial, params: Params, history: List[Scalar], target: int
+) -> Tuple[Params, List[Scalar]]:
+    """Worker entry point: continue one trial from `params` up to `target` steps."""
+
+    scenario = get_scenario(scenario_name)
+    if params:
+        scenario.params.update(params)
+    rule = get_rule(trial.rule)(scenario)
+    # Non-finite losses raise floating-point warnings/errors in some models;
+    # report them as inf so the parent can classify the run as diverged.
+    try:
+        more = train(
+            scenario.data,
+            scenario.params,
+            scenario.predict,
+            scenario.loss,
+            rule,
+            steps=target - len(history),
+            lr=trial.lr,
+        )
+    except (OverflowError, FloatingPointError, ZeroDivisionError):
+        more = [math.inf]
+    return dict(scenario.params), history + more
+
+
+def _diverged(history: List[Scalar], factor: float) -> bool:
+    last = history[-1]
+    return not math.isfinite(last) or last > factor * max(history[0], 1e-12)
+
+
+def _budgets(max_steps: int, eta: int, rungs: int) -> List[int]:
+    # Geometric budgets ending at the full step count, e.g. 60 steps with
+    # eta=3, rungs=3 -> [6, 20, 60]. Duplicates collapse for tiny runs.
+    budgets = [max(1, round(max_steps / eta**k)) for k in reversed(range(rungs))]
+    return sorted(set(budgets))
+
+
+@dataclass
+class SweepResult:
+    scenario: str
+    results: List[TrialResult]
+
+    def ranked(self) -> List[TrialResult]:
+        # Completed runs first (by final loss), then pruned, then diverged.
+        order = {"completed": 0, "pruned": 1, "diverged": 2}
+        return sorted(self.results, key=lambda r: (order.get(r.status, 3), r.final_loss))
+
+    @property
+    def best(self) -> TrialResult:
+        return self.ranked()[0]
+
+    def table(self) -> str:
+        lines = [f"{'id':>4} {'rule':<18} {'lr':>10} {'steps':>6} {'run':>5} {'final_loss':>12}  status"]
+        for r in self.ranked():
+            t = r.trial
+            lines.append(
+                f"{t.trial_id:>4} {t.rule:<18} {t.lr:>10.4g} {t.steps:>6} {r.steps_run:>5}"
+                f" {r.final_loss:>12.6g}  {r.status}"
+            )
+        return "\n".join(lines)
+
+
+def run_sweep(
+    scenario: str,
+    trials: Sequence[Trial],
+    *,
+    workers: int | None = None,
+    eta: int = 3,
+    rungs: int = 3,
+    divergence_factor: float = 1e6,
+    executor: Executor | None = None,
+) -> SweepResult:
+    """
+    Run `trials` on a registry scenario with successive-halving pruning.
+
+    `workers` defaults to every core. Pass `rungs=1` to disable pruning and
+    simply run every trial to completion in parallel. A caller-owned
+    `executor` can be reused across many sweeps to avoid pool start-up cost.
+    """
+
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    if rungs < 1:
+        raise ValueError("rungs must be at least 1")
+    for trial in trials:
+        get_rule(trial.rule)  # fail fast on a bad rule name
+    get_scenario(scenario)  # fail fast on a bad name, before spawning workers
+
+    results = [TrialResult(trial=t) for t in trials]
+    if not results:
+        return SweepResult(scenario, results)
+
+    own_pool = executor is None
+    pool = executor or ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+    try:
+        budgets = _budgets(max(t.steps for t in trials), eta, rungs)
+        for rung, budget in enumerate(budgets):
+            running = [r for r in results if r.status == "running"]
+            if not running:
+                break
+
+            targets = [min(budget, r.trial.steps) for r in running]
+            futures = [
+                pool.submit(_advance, scenario, r.trial, r.params, r.history, target)
+                for r, target in zip(running, targets)
+            ]
+            for r, future in zip(running, futures):
+                r.params, r.history = future.result()
+                if _diverged(r.history, divergence_factor):
+                    r.status = "diverged"
+                elif r.steps_run >= r.trial.steps:
+                    r.status = "completed"
+
+            if rung == len(budgets) - 1:
+                break
+            # Keep the best 1/eta of the trials still in the race. Ranking is
+            # by loss at the shared budget, which is what makes it fair.
+            alive = sorted((r for r in running if r.status == "running"), key=lambda r: r.final_loss)
+            keep = math.ceil(len(alive) / eta)
+            for r in alive[keep:]:
+                r.status = "pruned"
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+    return SweepResult(scenario, results)
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+# Parameterized synthetic scenario families.
+#
+# The hand-written registry scenarios have 1-4 points, which is right for
+# reading a test but says nothing about the loop at production scale. A
+# family is a scenario factory with knobs (number of points `n`, `noise`,
+# `features`, `seed`, ...) that generates its data with NumPy in one vectorized
+# pass and wraps it in an ArrayDataset, so every engine accepts it as is:
+#
+#   get_scenario("noisy_linear", n=10_000_000)
+#
+# Data is deterministic and prefix-stable. Points are drawn in fixed-size
+# chunks, and chunk k always comes from generators seeded with (seed, stream,
+# k), so the first 1000 points of n=10_000_000 are exactly the n=1000 dataset.
+# A small test run therefore sees the same data as a large one.
+#
+# Generated columns are memoized per parameter set (a small LRU) and marked
+# read-only, because every scenario built from them shares the same arrays.
+# Params and closures are still fresh on every call, as with the other
+# registry factories.
+
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .dataset import ArrayDataset
+from .scenarios import Params, Scalar, Scenario
+
+_CHUNK = 1 << 16
+# Generated datasets kept around; at 10M points each one is 160 MB.
+_MEMO_SIZE = 4
+
+
+def _uniform(n: int, seed: int, low: float, high: float) -> Tuple[np.ndarray, np.ndarray]:
+    # x ~ U(low, high) and unit normal noise, chunk by chunk (prefix-stable).
+    x = np.empty(n, dtype=np.float64)
+    z = np.empty(n, dtype=np.float64)
+    for k, start in enumerate(range(0, n, _CHUNK)):
+        stop = min(start + _CHUNK, n)
+        # Separate streams for x and noise: a partial last chunk must not
+        # shift where the noise draws start.
+        x[start:stop] = np.random.default_rng((seed, 1, k)).uniform(low, high, stop - start)
+        z[start:stop] = np.random.default_rng((seed, 2, k)).standard_normal(stop - start)
+    return x, z
+
+
+def _frozen(x: np.ndarray, y: np.ndarray) -> ArrayDataset:
+    x.flags.writeable = False
+    y.flags.writeable = False
+    return ArrayDataset(x, y)
+
+
+def _check(n: int, noise: float, seed: int) -> None:
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    if noise < 0:
+        raise ValueError("noise must be non-negative")
+    if seed < 0:
+        raise ValueError("seed must be non-negative")
+
+
+def _label(family: str, **knobs: object) -> str:
+    return f"{family}(" + ", ".join(f"{k}={v}" for k, v in knobs.items()) + ")"
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _linear_data(
+    n: int, noise: float, slope: float, intercept: float, low: float, high: float, seed: int
+) -> ArrayDataset:
+    x, z = _uniform(n, seed, low, high)
+    y = slope * x + intercept
+    y += noise * z
+    return _frozen(x, y)
+
+
+def noisy_linear(
+    *,
+    n: int = 10_000,
+    noise: float = 0.1,
+    seed: int = 0,
+    slope: float = 2.0,
+    intercept: float = 1.0,
+    low: float = 0.0,
+    high: float = 3.0,
+    steps: int = 60,
+    lr: float = 0.03,
+) -> Scenario:
+    """y = slope*x + intercept + noise*N(0, 1) with x ~ U(low, high); fit w and b."""
+
+    _check(n, noise, seed)
+    if not low < high:
+        raise ValueError("low must be less than high")
+    data = _linear_data(n, float(noise), float(slope), float(intercept), float(low), float(high), seed)
+
+    def predict(x: Scalar, p: Params) -> Scalar:
+        return p["w"] * x + p["b"]
+
+    def loss(y_hat: Scalar, y: Scalar) -> Scalar:
+        return (y_hat - y) ** 2
+
+    def grad(x: Scalar, y: Scalar, y_hat: Scalar, p: Params) -> Dict[str, Scalar]:
+        err = y_hat - y
+        return {"w": 2 * err * x, "b": 2 * err}
+
+    label = _label("noisy_linear", n=n, noise=noise, seed=seed)
+    return Scenario(
+        name=label,
+        test_name=f"test_noisy_linear_n{n}_seed{seed}",
+        description=f"{label}: learn slope ~{slope:g} and intercept ~{intercept:g} from {n} noisy points.",
+        data=data,
+        params={"w": 0.0, "b": 0.0},
+        predict=predict,
+        loss=loss,
+        grad=grad,
+        steps=steps,
+        lr=lr,
+        batch_predict=predict,
+        batch_loss=loss,
+        batch_grad=grad,
+        linear=("w", "b"),
+    )
+
+
+def _coefficients(features: int, seed: int) -> list[float]:
+    # Drawn from their own stream, so they don't depend on n.
+    return np.random.default_rng((seed, 0)).uniform(-2.0, 2.0, features + 1).tolist()
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _polynomial_data(n: int, features: int, noise: float, seed: int) -> ArrayDataset:
+    coefs = _coefficients(features, seed)
+    x, z = _uniform(n, seed, -1.0, 1.0)
+    # Horner's rule: one pass over the column per coefficient.
+    y = np.full(n, coefs[-1])
+    for c in reversed(coefs[:-1]):
+        y *= x
+        y += c
+    y += noise * z
+    return _frozen(x, y)
+
+
+def polynomial(
+    *,
+    n: int = 10_000,
+    features: int = 3,
+    noise: float = 0.1,
+    seed: int = 0,
+    steps: int = 200,
+    lr: float = 0.1,
+) -> Scenario:
+    """
+    y = c0 + c1*x + ... + cF*x**F + noise with x ~ U(-1, 1), F = `features`.
+
+    The features are the powers x**1..x**F of a scalar x, one named param
+    each (b, w1..wF). For vector inputs see `linear_regression`.
+    """
+
+    if features < 1:
+        raise ValueError("features must be at least 1")
+    _check(n, noise, seed)
+    data = _polynomial_data(n, features, float(noise), seed)
+    powers = tuple(range(1, features + 1))
+    names = [f"w{j}" for j in powers]
+
+    def predict(x: Scalar, p: Params) -> Scalar:
+        y_hat = p["b"]
+        for j, name in zip(powers, names):
+            y_hat = y_hat + p[name] * x**j
+        return y_hat
+
+    def loss(y_hat: Scalar, y: Scalar) -> Scalar:
+        return (y_hat - y) ** 2
+
+    def grad(x: Scalar, y: Scalar, y_hat: Scalar, p: Params) -> Dict[str, Scalar]:
+        err = 2 * (y_hat - y)
+        out = {"b": err}
+        for j, name in zip(powers, names):
+            out[name] = err * x**j
+        return out
+
+    label = _label("polynomial", n=n, features=features, noise=noise, seed=seed)
+    return Scenario(
+        name=label,
+        test_name=f"test_polynomial_n{n}_f{features}_seed{seed}",
+        description=f"{label}: fit a degree-{features} polynomial to {n} noisy points.",
+        data=data,
+        params={"b": 0.0, **{name: 0.0 for name in names}},
+        predict=predict,
+        loss=loss,
+        grad=grad,
+        steps=steps,
+        lr=lr,
+        batch_predict=predict,
+        batch_loss=loss,
+        batch_grad=grad,
+    )
+
+
+def _normal_rows(n: int, width: int, seed: int, stream: int) -> np.ndarray:
+    # (n, width) standard normals, chunk by chunk like _uniform (prefix-stable).
+    out = np.empty((n, width), dtype=np.float64)
+    for k, start in enumerate(range(0, n, _CHUNK)):
+        stop = min(start + _CHUNK, n)
+        out[start:stop] = np.random.default_rng((seed, stream, k)).standard_normal((stop - start, width))
+    return out
+
+
+def _true_weights(features: int, outputs: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng((seed, 0))
+    return rng.uniform(-2.0, 2.0, (features, outputs)), rng.uniform(-2.0, 2.0, outputs)
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _regression_data(n: int, features: int, outputs: int, noise: float, seed: int) -> ArrayDataset:
+    w, b = _true_weights(features, outputs, seed)
+    x = _normal_rows(n, features, seed, 1)
+    y = x @ w
+    y += b
+    y += noise * _normal_rows(n, outputs, seed, 2)
+    return _frozen(x, y[:, 0].copy() if outputs == 1 else y)
+
+
+def linear_regression(
+    *,
+    n: int = 10_000,
+    features: int = 8,
+    outputs: int = 1,
+    noise: float = 0.1,
+    seed: int = 0,
+    steps: int = 100,
+    lr: float = 0.1,
+) -> Scenario:
+    """
+    y = x @ W + b + noise with x ~ N(0, I) in R^features and y in R^outputs.
+
+    Params are a dense weight matrix "W" (features x outputs) and a bias
+    vector "b"; with outputs == 1, W is a vector and b a float. One batched
+    step is x @ W forward and x.T @ err backward. `predict` and `loss` work
+    both per sample (train) and per batch (train_batched); `grad` is the
+    per-sample gradient and `batch_grad` the already-reduced batch total.
+    """
+
+    if features < 1 or outputs < 1:
+        raise ValueError("features and outputs must be at least 1")
+    _check(n, noise, seed)
+    data = _regression_data(n, features, outputs, float(noise), seed)
+    vector_y = outputs > 1
+
+    def predict(x: Scalar, p: Params) -> Scalar:
+        return x @ p["W"] + p["b"]
+
+    def loss(y_hat: Scalar, y: Scalar) -> Scalar:
+        # One number per sample: summed over outputs when y is a vector.
+        sq = (y_hat - y) ** 2
+        return sq.sum(axis=-1) if vector_y else sq
+
+    def grad(x: Scalar, y: Scalar, y_hat: Scalar, p: Params) -> Dict[str, Scalar]:
+        err = 2 * (y_hat - y)
+        return {"W": np.multiply.outer(x, err), "b": err}
+
+    def batch_grad(x: Scalar, y: Scalar, y_hat: Scalar, p: Params) -> Dict[str, Scalar]:
+        # Summed over the batch with two reductions instead of N outer products.
+        # (err.T @ x).T is x.T @ err, but streams the large x in its own row
+        # order, which is about twice as fast for a handful of outputs.
+        err = 2 * (y_hat - y)
+        return {"W": (err.T @ x).T, "b": err.sum(axis=0)}
+
+    label = _label("linear_regression", n=n, features=features, outputs=outputs, noise=noise, seed=seed)
+    return Scenario(
+        name=label,
+        test_name=f"test_linear_regression_n{n}_d{features}_k{outputs}_seed{seed}",
+        description=f"{label}: fit a {features}x{outputs} weight matrix to {n} noisy points.",
+        data=data,
+        params={
+            "W": np.zeros((features, outputs) if vector_y else features),
+            "b": np.zeros(outputs) if vector_y else 0.0,
+        },
+        predict=predict,
+        loss=loss,
+        grad=grad,
+        steps=steps,
+        lr=lr,
+        batch_predict=predict,
+        batch_loss=loss,
+        batch_grad=batch_grad,
+    )
+
+
+def true_weights(*, features: int = 8, outputs: int = 1, seed: int = 0) -> Dict[str, object]:
+    """The linear_regression family's generating W and b, shaped like its params."""
+
+    w, b = _true_weights(features, outputs, seed)
+    if outputs == 1:
+        return {"W": w[:, 0], "b": float(b[0])}
+    return {"W": w, "b": b}
+
+
+def true_coefficients(*, features: int = 3, seed: int = 0) -> Dict[str, float]:
+    """The polynomial family's generating coefficients, keyed like its params."""
+
+    coefs = _coefficients(features, seed)
+    return {"b": coefs[0], **{f"w{j}": c for j, c in enumerate(coefs[1:], start=1)}}
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+# Columnar trace recording.
+#
+# StepState is the friendliest shape for one step, but keeping a list of them
+# for a long run means two fresh dicts per step, forever. TraceRecorder keeps
+# the same information as columns instead (steps, losses, and a params/grads
+# matrix with one column per parameter) in preallocated arrays. StepState
+# objects are only built when someone indexes into the trace.
+#
+# Two knobs bound the cost of full-run observability:
+# - `stride` records every k-th step only;
+# - `ring=True` keeps just the most recent `capacity` records.
+
+from typing import Iterator, Mapping, Sequence
+
+import numpy as np
+
+from .params import require_scalars
+from .training import Scalar, StepState
+
+# Growable traces start here and double, so a run of S steps costs
+# O(log S) reallocations rather than one per step.
+_INITIAL_CAPACITY = 1024
+
+
+class TraceRecorder:
+    """
+    Record loss, params and grads per step into columnar arrays.
+
+    Pass it to `train(..., recorder=...)`. Indexing (`trace[i]`, negative
+    indices included) returns a StepState built on demand from row i of the
+    retained records, oldest first.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        *,
+        capacity: int | None = None,
+        stride: int = 1,
+        ring: bool = False,
+    ) -> None:
+        if stride < 1:
+            raise ValueError("stride must be at least 1")
+        if ring and capacity is None:
+            raise ValueError("ring mode needs an explicit capacity")
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.names = tuple(names)
+        self.index = {name: j for j, name in enumerate(self.names)}
+        self.stride = stride
+        self.ring = ring
+        self._growable = capacity is None
+        self._allocate(capacity or _INITIAL_CAPACITY)
+        # `_count` is how many records were ever written; with a ring buffer
+        # only the last `capacity` of them are still retained.
+        self._count = 0
+
+    def _allocate(self, capacity: int) -> None:
+        width = len(self.names)
+        self.capacity = capacity
+        self._steps = np.zeros(capacity, dtype=np.int64)
+        self._losses = np.zeros(capacity, dtype=np.float64)
+        self._params = np.zeros((capacity, width), dtype=np.float64)
+        self._grads = np.zeros((capacity, width), dtype=np.float64)
+        self._bind_views()
+
+    def _bind_views(self) -> None:
+        # Flat memoryviews let record() store Python floats element by element
+        # without creating NumPy scalars or temporary row arrays.
+        self._step_view = memoryview(self._steps)
+        self._loss_view = memoryview(self._losses)
+        self._param_view = memoryview(self._params.reshape(-1))
+        self._grad_view = memoryview(self._grads.reshape(-1))
+
+    def _grow(self) -> None:
+        old = self.capacity
+        steps, losses, params, grads = self._steps, self._losses, self._params, self._grads
+        self._allocate(old * 2)
+        self._steps[:old] = steps
+        self._losses[:old] = losses
+        self._params[:old] = params
+        self._grads[:old] = grads
+
+    # -- Recording -------------------------------------------------------------
+
+    def record(
+        self, step: int, loss: Scalar, params: Mapping[str, Scalar], grads: Mapping[str, Scalar]
+    ) -> None:
+        if step % self.stride:
+            return
+
+        if self._count == self.capacity and not self.ring:
+            if not self._growable:
+                raise ValueError(
+                    f"trace is full ({self.capacity} records); raise capacity, "
+                    "increase stride or use ring=True"
+                )
+            self._grow()
+
+        slot = self._count % self.capacity
+        self._step_view[slot] = step
+        self._loss_view[slot] = loss
+        width = len(self.names)
+        base = slot * width
+        param_view, grad_view = self._param_view, self._grad_view
+        try:
+            for j, name in enumerate(self.names):
+                param_view[base + j] = params[name]
+                # Rules may omit a parameter's gradient; treat that as zero
+                # like the training loop does.
+                grad_view[base + j] = grads.get(name, 0.0)
+        except TypeError:
+            require_scalars(params, "TraceRecorder")
+            raise
+        self._count += 1
+
+    # -- Reading ---------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def _order(self) -> np.ndarray | slice:
+        # Chronological row order of the retained records.
+        if self._count <= self.capacity:
+            return slice(0, self._count)
+        start = self._count % self.capacity
+        return np.r_[start : self.capacity, 0:start]
+
+    def _slot(self, i: int) -> int:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("trace index out of range")
+        if self._count <= self.capacity:
+            return i
+        return (self._count + i) % self.capacity
+
+    def __getitem__(self, i: int) -> StepState:
+        slot = self._slot(i)
+        return StepState(
+            step=int(self._steps[slot]),
+            loss=float(self._losses[slot]),
+            params=dict(zip(self.names, self._params[slot].tolist())),
+            grads=dict(zip(self.names, self._grads[slot].tolist())),
+        )
+
+    def __iter__(self) -> Iterator[StepState]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def steps(self) -> np.ndarray:
+        return self._steps[self._order()]
+
+    @property
+    def losses(self) -> np.ndarray:
+        return self._losses[self._order()]
+
+    def param(self, name: str) -> np.ndarray:
+        """One parameter's value over the retained steps."""
+        return self._params[self._order(), self.index[name]]
+
+    def grad(self, name: str) -> np.ndarray:
+        """One parameter's gradient over the retained steps."""
+        return self._grads[self._order(), self.index[name]]
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+# Persistent, append-only trace files.
+#
+# TraceRecorder keeps a run's trace in memory, which disappears with the
+# process (or the notebook kernel). A TraceWriter streams the same columns to
+# disk as fixed-size binary records while training runs, and a TraceReader
+# memory-maps them back. Because every record has the same size, step N lives
+# at a computable offset: seeking is O(1), and a reader can open the file
+# while training is still appending to it and simply see more steps later.
+#
+# File layout:
+#   [fixed header][JSON blob: names + metadata][padding to 64]
+#   [record 0][record 1]...   record = step:int64, loss:f64, params:f64[P], grads:f64[P]
+
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Sequence
+
+import numpy as np
+
+from .params import require_scalars
+from .training import Scalar, StepState
+
+MAGIC = b"NTTR"
+VERSION = 1
+# magic, version, number of params, JSON blob length, data offset
+_HEADER = struct.Struct("<4sHxxIIQ")
+_ALIGN = 64
+
+
+def _record_dtype(width: int) -> np.dtype:
+    return np.dtype(
+        [("step", "<i8"), ("loss", "<f8"), ("params", "<f8", (width,)), ("grads", "<f8", (width,))]
+    )
+
+
+class TraceWriter:
+    """
+    Append one fixed-size record per step to a trace file.
+
+    Implements the same `record()` hook as TraceRecorder, so it plugs into
+    `train(..., recorder=...)`. Records are flushed every `flush_every` steps
+    so concurrent readers see progress without an fsync per step.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        names: Sequence[str],
+        *,
+        meta: Mapping[str, Any] | None = None,
+        flush_every: int = 1,
+    ) -> None:
+        if flush_every < 1:
+            raise ValueError("flush_every must be at least 1")
+
+        self.path = Path(path)
+        self.names = tuple(names)
+        self.flush_every = flush_every
+        width = len(self.names)
+
+        blob = json.dumps({"names": list(self.names), "meta": dict(meta or {})}).encode("utf-8")
+        data_offset = -(-(_HEADER.size + len(blob)) // _ALIGN) * _ALIGN
+        header = _HEADER.pack(MAGIC, VERSION, width, len(blob), data_offset) + blob
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._file.write(header.ljust(data_offset, b"\0"))
+        self._file.flush()
+
+        # One reusable record buffer: floats are written through a memoryview
+        # and the whole record goes to disk without an intermediate bytes copy.
+        self._record = np.zeros(2 + 2 * width, dtype=np.float64)
+        self._floats = memoryview(self._record)
+        self._step = memoryview(self._record[:1].view(np.int64))
+        self._bytes = memoryview(self._record).cast("B")
+        self._pending = 0
+
+    def record(
+        self, step: int, loss: Scalar, params: Mapping[str, Scalar], grads: Mapping[str, Scalar]
+    ) -> None:
+        floats = self._floats
+        width = len(self.names)
+        self._step[0] = step
+        floats[1] = loss
+        try:
+            for j, name in enumerate(self.names):
+                floats[2 + j] = params[name]
+                floats[2 + width + j] = grads.get(name, 0.0)
+        except TypeError:
+            require_scalars(params, "TraceWriter")
+            raise
+        self._file.write(self._bytes)
+
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self._file.flush()
+            self._pending = 0
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def __enter__(self) -> TraceWriter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class TraceReader:
+    """
+    Memory-mapped, random-access view of a trace file.
+
+    Offers the same read API as TraceRecorder (len, indexing to StepState,
+    `losses`, `param(name)`, `grad(name)`). The length is re-checked against
+    the file size on access, so a reader opened mid-run keeps up with the
+    writer; a partially written trailing record is ignored.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as handle:
+            raw = handle.read(_HEADER.size)
+            if len(raw) < _HEADER.size:
+                raise ValueError(f"{path}: file too small to be a nanotorch trace")
+            magic, version, width, blob_len, data_offset = _HEADER.unpack(raw)
+            if magic != MAGIC:
+                raise ValueError(f"{path}: not a nanotorch trace (bad magic)")
+            if version != VERSION:
+                raise ValueError(f"{path}: unsupported trace version {version}")
+            blob = json.loads(handle.read(blob_len).decode("utf-8"))
+
+        self.names = tuple(blob["names"])
+        self.meta: Dict[str, Any] = blob["meta"]
+        self.index = {name: j for j, name in enumerate(self.names)}
+        self._dtype = _record_dtype(width)
+        self._offset = data_offset
+        self._records: np.ndarray = np.empty(0, dtype=self._dtype)
+
+    def refresh(self) -> int:
+        """Re-map if the file has grown; returns the number of complete records."""
+
+        size = os.path.getsize(self.path)
+        count = max(0, (size - self._offset) // self._dtype.itemsize)
+        if count != self._records.shape[0]:
+            if count == 0:
+                self._records = np.empty(0, dtype=self._dtype)
+            else:
+                self._records = np.memmap(
+                    self.path, dtype=self._dtype, mode="r", offset=self._offset, shape=(count,)
+                )
+        return count
+
+    def __len__(self) -> int:
+        return self.refresh()
+
+    def __getitem__(self, i: int) -> StepState:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("trace index out of range")
+        rec = self._records[i]
+        return StepState(
+            step=int(rec["step"]),
+            loss=float(rec["loss"]),
+            params=dict(zip(self.names, rec["params"].tolist())),
+            grads=dict(zip(self.names, rec["grads"].tolist())),
+        )
+
+    def __iter__(self) -> Iterator[StepState]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def _column(self, field: str) -> np.ndarray:
+        self.refresh()
+        return self._records[field]
+
+    @property
+    def steps(self) -> np.ndarray:
+        return self._column("step")
+
+    @property
+    def losses(self) -> np.ndarray:
+        return self._column("loss")
+
+    def param(self, name: str) -> np.ndarray:
+        return self._column("params")[:, self.index[name]]
+
+    def grad(self, name: str) -> np.ndarray:
+        return self._column("grads")[:, self.index[name]]
+
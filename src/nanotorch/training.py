@@ -1,12 +1,37 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+from copy import copy
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Protocol,
+    Sequence,
+    Sized,
+    Tuple,
+    runtime_checkable,
+)
+
+from .checkpoint import Checkpoint, Checkpointer, as_checkpoint, restore
+from .data import DataLoader
 
 
 Scalar = float
 # We model parameters as a simple name -> value map to keep the first slice
 # explicit and inspectable. This avoids hiding learning behind objects.
+#
+# The annotations below say float because that is the common case, but the
+# loop itself only adds, subtracts and scales values. So x may be a feature
+# vector, y a vector of outputs, and a param a NumPy weight matrix or bias
+# vector, with predict written as `x @ p["W"] + p["b"]`. Loss must still
+# reduce to one number per sample. Array params are updated in place.
 Params = Dict[str, Scalar]
 DataPoint = Tuple[Scalar, Scalar]
 PredictFn = Callable[[Scalar, Params], Scalar]
@@ -19,6 +44,24 @@ GradFn = Callable[[Scalar, Scalar, Scalar, Params], Dict[str, Scalar]]
 RuleFn = Callable[[Scalar, Scalar, Scalar, Params], Dict[str, Scalar]]
 
 
+@runtime_checkable
+class BufferedParams(Protocol):
+    """
+    Parameter containers that own a reusable gradient buffer (see ParamStore).
+
+    When `params` implements this, the loop accumulates into that buffer and
+    applies the update in place instead of building a grads dict per step.
+    """
+
+    def zero_grad(self) -> None: ...
+
+    def accumulate(self, grads: Mapping[str, Scalar]) -> None: ...
+
+    def finish_grad(self, n: float) -> Mapping[str, Scalar]: ...
+
+    def apply_update(self, lr: float) -> None: ...
+
+
 @dataclass(frozen=True)
 class StepState:
     """
@@ -33,10 +76,70 @@ class StepState:
     loss: Scalar
     params: Dict[str, Scalar]
     grads: Dict[str, Scalar]
+    # Optimizer state after this step's update (e.g. Adam's "m"/"v" per
+    # param); empty for plain gradient descent.
+    opt_state: Dict[str, Dict[str, Scalar]] = field(default_factory=dict)
+    # Per-phase measurements for this step when a profiler is attached:
+    # seconds from nanotorch.profiler.Profiler, bytes from
+    # nanotorch.memory.AllocationTracker. Empty otherwise.
+    profile: Dict[str, float] = field(default_factory=dict)
 
 
 ObserverFn = Callable[[StepState], None]
 
+
+class Recorder(Protocol):
+    """
+    Sink for raw per-step values (see nanotorch.trace.TraceRecorder).
+
+    Unlike observers, recorders get the live params/grads mappings rather than
+    a StepState, so they can copy what they need without per-step dicts.
+    """
+
+    def record(
+        self, step: int, loss: Scalar, params: Mapping[str, Scalar], grads: Mapping[str, Scalar]
+    ) -> None: ...
+
+# An engine's unit of work: given current params, return the step's mean loss
+# and mean gradient per parameter. The shared driver does everything else.
+StepFn = Callable[[Params], Tuple[Scalar, Mapping[str, Scalar]]]
+
+
+class StepProfiler(Protocol):
+    """
+    Phase instrumentation hooks (see nanotorch.profiler and nanotorch.memory).
+
+    Engines wrap predict/loss/rule via `instrument`, and the driver brackets
+    every step and its phases with the other hooks.
+    """
+
+    def instrument(self, predict: Any, loss: Any, rule: Any) -> Tuple[Any, Any, Any]: ...
+
+    def start_step(self, step: int) -> None: ...
+
+    def phase(self, name: str) -> ContextManager[None]: ...
+
+    def step_profile(self) -> Dict[str, float]: ...
+
+    def end_step(self) -> Dict[str, float]: ...
+
+
+class Optimizer(Protocol):
+    """
+    Update rule applied after each step (see nanotorch.optim).
+
+    Learning rules still only produce gradients; the optimizer decides how
+    those gradients move the params. `evaluate` is the engine's step function,
+    for optimizers that need extra loss/gradient evaluations (line searches).
+    """
+
+    def step(
+        self, params: Params, loss: Scalar, grads: Mapping[str, Scalar], lr: float, evaluate: StepFn
+    ) -> None: ...
+
+    def state(self) -> Dict[str, Dict[str, Scalar]]: ...
+
+
 def manual_gradient(grad_fn: GradFn) -> RuleFn:
     """Wrap a user-supplied gradient function as a learning rule."""
 
@@ -49,10 +152,17 @@ def manual_gradient(grad_fn: GradFn) -> RuleFn:
 
 
 def finite_difference(
-    *, eps: float = 1e-4, predict: PredictFn | None = None, loss: LossFn | None = None
+    *,
+    eps: float = 1e-4,
+    predict: PredictFn | None = None,
+    loss: LossFn | None = None,
+    method: str = "forward",
+    vectorized: bool = False,
+    samples: int = 1,
+    seed: int | None = None,
 ) -> RuleFn:
     """
-    Estimate gradients numerically using forward finite differences.
+    Estimate gradients numerically using finite differences.
 
     This lets users train without providing analytic gradients. It's slower
     (O(P) extra evaluations per step, where P is number of parameters) and
@@ -61,11 +171,32 @@ def finite_difference(
     Design choice: we close over predict/loss at rule creation time to avoid
     changing the train() signature. This keeps the training loop stable while
     allowing different learning rules to plug in.
+
+    `method` selects the estimator: "forward" (default), "central", or the
+    two-evaluation random-direction estimators "spsa" and "random" (averaged
+    over `samples` directions, seeded by `seed`). With `vectorized=True` all
+    perturbed parameter sets are evaluated in one broadcasting `predict` call.
+    See nanotorch.estimators for the details of each method.
     """
 
     if eps <= 0:
         raise ValueError("eps must be positive")
 
+    if method != "forward" or vectorized:
+        # Imported lazily: the estimator family needs NumPy, while the default
+        # forward rule below stays pure Python.
+        from .estimators import numeric_gradient
+
+        return numeric_gradient(
+            method=method,
+            eps=eps,
+            predict=predict,
+            loss=loss,
+            vectorized=vectorized,
+            samples=samples,
+            seed=seed,
+        )
+
     def rule(x: Scalar, y: Scalar, y_hat: Scalar, params: Params) -> Dict[str, Scalar]:
         if predict is None or loss is None:
             raise ValueError("finite_difference requires predict and loss to be provided")
@@ -76,6 +207,17 @@ def finite_difference(
         # For each parameter, perturb it slightly and see how the loss changes.
         for name in params:
             original = params[name]
+            if getattr(original, "ndim", 0) > 0:
+                # Array param (e.g. a weight matrix): nudge one entry at a
+                # time, in place, so predict sees the rest unchanged.
+                grad = original * 0.0
+                for i in range(original.size):
+                    saved = original.flat[i]
+                    original.flat[i] = saved + eps
+                    grad.flat[i] = (loss(predict(x, params), y) - base_loss) / eps
+                    original.flat[i] = saved
+                grads[name] = grad
+                continue
             params[name] = original + eps
             y_hat_eps = predict(x, params)
             loss_eps = loss(y_hat_eps, y)
@@ -86,8 +228,329 @@ def finite_difference(
 
     return rule
 
+def _drive(
+    step_fn: StepFn,
+    params: Params,
+    *,
+    steps: int,
+    lr: float,
+    optimizer: Optimizer | None = None,
+    profiler: StepProfiler | None = None,
+    start: int = 0,
+) -> Iterator[Tuple[int, Scalar, Mapping[str, Scalar]]]:
+    """
+    Shared step driver for every training engine.
+
+    An engine only has to answer "what is the mean loss and mean gradient for
+    these params?" via `step_fn`. Everything after that (the update, history,
+    snapshots) lives here so the scalar and batched engines can't drift apart.
+
+    With a profiler, the gradient and update phases are measured and the caller
+    closes each step with `profiler.end_step()` once its hooks have run.
+    A resumed run passes `start`, the number of steps already completed.
+    """
+
+    buffered = isinstance(params, BufferedParams)
+
+    def update(step_loss: Scalar, grads_mean: Mapping[str, Scalar]) -> None:
+        if optimizer is not None:
+            optimizer.step(params, step_loss, grads_mean, lr, step_fn)
+        elif buffered:
+            # One vectorized in-place update over the whole parameter array.
+            params.apply_update(lr)
+        else:
+            for name in grads_mean:
+                # Plain gradient descent update; learning rules can change this
+                # without modifying the training loop.
+                params[name] -= lr * grads_mean[name]
+
+    for step in range(start, steps):
+        if profiler is None:
+            step_loss, grads_mean = step_fn(params)
+            update(step_loss, grads_mean)
+        else:
+            profiler.start_step(step)
+            with profiler.phase("gradient"):
+                step_loss, grads_mean = step_fn(params)
+            with profiler.phase("update"):
+                update(step_loss, grads_mean)
+        yield step, step_loss, grads_mean
+
+
+def _accumulate(
+    batch: Sequence[DataPoint], params: Params, predict: PredictFn, loss: LossFn, rule: RuleFn
+) -> Tuple[Scalar, Mapping[str, Scalar]]:
+    if isinstance(params, BufferedParams):
+        return _accumulate_buffered(batch, params, predict, loss, rule)
+
+    total_loss = 0.0
+    # We accumulate gradients across the batch and average them so the
+    # learning rate is stable w.r.t. batch size (simple batch gradient).
+    grads_sum: Dict[str, Scalar] = {k: 0.0 for k in params}
+
+    for x, y in batch:
+        y_hat = predict(x, params)
+        # Loss is per-sample; we sum and later average to get a single
+        # comparable scalar per step.
+        total_loss += loss(y_hat, y)
+        grads = rule(x, y, y_hat, params)
+        for name, value in grads.items():
+            grads_sum[name] = grads_sum.get(name, 0.0) + value
+
+    n = float(len(batch))
+    for name in grads_sum:
+        grads_sum[name] /= n
+
+    # We report mean loss per step to make "learning progress" observable
+    # without requiring external logging in Sprint 0.
+    return total_loss / n, grads_sum
+
+
+def _accumulate_buffered(
+    batch: Sequence[DataPoint],
+    params: BufferedParams,
+    predict: PredictFn,
+    loss: LossFn,
+    rule: RuleFn,
+) -> Tuple[Scalar, Mapping[str, Scalar]]:
+    # Same math as _accumulate, but gradients land in the store's reused
+    # buffer instead of a fresh grads_sum dict every step.
+    total_loss = 0.0
+    params.zero_grad()
+    for x, y in batch:
+        y_hat = predict(x, params)
+        total_loss += loss(y_hat, y)
+        params.accumulate(rule(x, y, y_hat, params))
+
+    n = float(len(batch))
+    return total_loss / n, params.finish_grad(n)
+
+
+def _scalar_step_fn(
+    data_list: Sequence[DataPoint], predict: PredictFn, loss: LossFn, rule: RuleFn
+) -> StepFn:
+    # Full-batch: every step revisits the same materialized dataset.
+    def step_fn(params: Params) -> Tuple[Scalar, Mapping[str, Scalar]]:
+        return _accumulate(data_list, params, predict, loss, rule)
+
+    return step_fn
+
+
+def _next_batch(batches: Iterator[List[DataPoint]]) -> List[DataPoint]:
+    batch = next(batches, None)
+    if batch is None:
+        raise RuntimeError(
+            "data source ran out before the requested number of steps; use a "
+            "re-iterable source or generator function so each epoch can restart"
+        )
+    return batch
+
+
+def _first_batch(loader: DataLoader) -> Tuple[Iterator[List[DataPoint]], List[DataPoint] | None]:
+    # Peek one batch so an empty source can be treated exactly like an empty
+    # list (no steps to take) instead of failing mid-run.
+    batches = iter(loader)
+    return batches, next(batches, None)
+
+
+def _minibatch_step_fn(
+    batches: Iterator[List[DataPoint]],
+    first: List[DataPoint],
+    predict: PredictFn,
+    loss: LossFn,
+    rule: RuleFn,
+) -> StepFn:
+    # Minibatch: every step pulls the next batch from the stream, so only one
+    # batch (plus the loader's shuffle buffer) is ever resident.
+    pending = [first]
+
+    def step_fn(params: Params) -> Tuple[Scalar, Mapping[str, Scalar]]:
+        batch = pending.pop() if pending else _next_batch(batches)
+        return _accumulate(batch, params, predict, loss, rule)
+
+    return step_fn
+
+
+def _make_step_fn(
+    data: Iterable[DataPoint] | DataLoader, predict: PredictFn, loss: LossFn, rule: RuleFn
+) -> StepFn | None:
+    """Pick full-batch or minibatch stepping; None means there is no data."""
+
+    if isinstance(data, DataLoader):
+        batches, first = _first_batch(data)
+        if first is None:
+            return None
+        return _minibatch_step_fn(batches, first, predict, loss, rule)
+
+    # Materialize once so we can iterate multiple steps without re-consuming
+    # generators; this keeps behavior deterministic for tests. Sized
+    # collections (lists, memory-mapped ArrayDatasets) can already be
+    # re-iterated every step, so copying them would only cost memory.
+    data_list = data if isinstance(data, Sized) and not isinstance(data, Iterator) else list(data)
+    if len(data_list) == 0:
+        return None
+    return _scalar_step_fn(data_list, predict, loss, rule)
+
+
+def _normalize_observers(observer: ObserverFn | Sequence[ObserverFn] | None) -> List[ObserverFn]:
+    # Normalize observer to a list so we can call uniformly.
+    if observer is None:
+        return []
+    if isinstance(observer, (list, tuple)):
+        return list(observer)
+    return [observer]
+
+
+def _run_history(
+    step_fn: StepFn,
+    params: Params,
+    *,
+    steps: int,
+    lr: float,
+    observer: ObserverFn | Sequence[ObserverFn] | None,
+    recorder: Recorder | None = None,
+    optimizer: Optimizer | None = None,
+    profiler: StepProfiler | None = None,
+    resumed: Checkpoint | None = None,
+    checkpoint: Checkpointer | None = None,
+) -> List[Scalar]:
+    history: List[Scalar] = list(resumed.history) if resumed is not None else []
+    observers = _normalize_observers(observer)
+
+    try:
+        for step, step_loss, grads_mean in _drive(
+            step_fn,
+            params,
+            steps=steps,
+            lr=lr,
+            optimizer=optimizer,
+            profiler=profiler,
+            start=resumed.step if resumed is not None else 0,
+        ):
+            history.append(step_loss)
+            _run_hooks(step, step_loss, params, grads_mean, observers, recorder, optimizer, profiler)
+            if checkpoint is not None:
+                checkpoint.after_step(step + 1, history)
+    finally:
+        if checkpoint is not None:
+            checkpoint.flush()
+
+    return history
+
+
+def _run_hooks(
+    step: int,
+    step_loss: Scalar,
+    params: Params,
+    grads_mean: Mapping[str, Scalar],
+    observers: List[ObserverFn],
+    recorder: Recorder | None,
+    optimizer: Optimizer | None,
+    profiler: StepProfiler | None,
+) -> None:
+    if profiler is not None:
+        # Same hooks as below, measured; kept separate so the unprofiled
+        # path stays exactly as cheap as before.
+        if recorder is not None:
+            with profiler.phase("recorder"):
+                recorder.record(step, step_loss, params, grads_mean)
+        if observers:
+            with profiler.phase("observers"):
+                state = _snapshot(step, step_loss, params, grads_mean, optimizer, profiler)
+                for obs in observers:
+                    obs(state)
+        profiler.end_step()
+        return
+
+    if recorder is not None:
+        recorder.record(step, step_loss, params, grads_mean)
+
+    if observers:
+        # Emit a snapshot for visualization and debugging. We only pay
+        # for the dict copies when someone is actually listening.
+        state = _snapshot(step, step_loss, params, grads_mean, optimizer, None)
+        for obs in observers:
+            obs(state)
+
+
+def _snapshot(
+    step: int,
+    step_loss: Scalar,
+    params: Params,
+    grads_mean: Mapping[str, Scalar],
+    optimizer: Optimizer | None,
+    profiler: StepProfiler | None,
+) -> StepState:
+    return StepState(
+        step=step,
+        loss=step_loss,
+        # Snapshot to avoid later mutation confusion; array params are
+        # updated in place, so they are copied too.
+        params={name: value if type(value) is float else copy(value) for name, value in params.items()},
+        grads=dict(grads_mean),
+        opt_state=optimizer.state() if optimizer is not None else {},
+        profile=profiler.step_profile() if profiler is not None else {},
+    )
+
+
+def _run_states(
+    step_fn: StepFn,
+    params: Params,
+    *,
+    steps: int,
+    lr: float,
+    optimizer: Optimizer | None = None,
+    profiler: StepProfiler | None = None,
+    resumed: Checkpoint | None = None,
+    checkpoint: Checkpointer | None = None,
+) -> Iterator[StepState]:
+    # Only a checkpoint needs the loss history; train_iter otherwise keeps none.
+    history: List[Scalar] = list(resumed.history) if resumed is not None else []
+    try:
+        for step, step_loss, grads_mean in _drive(
+            step_fn,
+            params,
+            steps=steps,
+            lr=lr,
+            optimizer=optimizer,
+            profiler=profiler,
+            start=resumed.step if resumed is not None else 0,
+        ):
+            state = _snapshot(step, step_loss, params, grads_mean, optimizer, profiler)
+            if profiler is not None:
+                # Close the step before handing control to the consumer, so time
+                # spent in the caller's loop body isn't billed to training.
+                profiler.end_step()
+            if checkpoint is not None:
+                history.append(step_loss)
+                checkpoint.after_step(step + 1, history)
+            yield state
+    finally:
+        if checkpoint is not None:
+            checkpoint.flush()
+
+
+def _resume(
+    resume: Checkpoint | str | Path | None,
+    data: Iterable[DataPoint] | DataLoader,
+    params: Params,
+    rule: RuleFn,
+    optimizer: Optimizer | None,
+    steps: int,
+) -> Checkpoint | None:
+    # Restore before the step function peeks at the first batch, so a
+    # DataLoader picks up at the saved position.
+    if resume is None:
+        return None
+    resumed = as_checkpoint(resume)
+    if resumed.step > steps:
+        raise ValueError(f"the checkpoint is already at step {resumed.step}, past steps={steps}")
+    restore(resumed, params, optimizer=optimizer, rule=rule, data=data)
+    return resumed
+
+
 def train(
-    data: Iterable[DataPoint],
+    data: Iterable[DataPoint] | DataLoader,
     params: Params,
     predict: PredictFn,
     loss: LossFn,
@@ -96,69 +559,60 @@ def train(
     steps: int,
     lr: float,
     observer: ObserverFn | Sequence[ObserverFn] | None = None,
+    recorder: Recorder | None = None,
+    optimizer: Optimizer | None = None,
+    profiler: StepProfiler | None = None,
+    checkpoint: Checkpointer | None = None,
+    resume: Checkpoint | str | Path | None = None,
 ) -> List[Scalar]:
-    history: List[Scalar] = []
-    # Materialize once so we can iterate multiple steps without re-consuming
-    # generators; this keeps behavior deterministic for tests.
-    data_list = list(data)
+    """
+    Run `steps` gradient-descent updates and return the mean loss per step.
+
+    By default every step is a full-batch pass over `data`. Passing a
+    DataLoader instead makes each step consume the loader's next minibatch,
+    which turns this into streaming SGD / minibatch GD.
+
+    `observer` receives a StepState snapshot per step; `recorder` receives the
+    raw values instead (e.g. a TraceRecorder for long runs). `optimizer`
+    replaces the plain `params -= lr * grad` update (see nanotorch.optim).
+    `profiler` times each phase of every step (see nanotorch.profiler).
+
+    `checkpoint` saves the run's state on a step or time interval, and
+    `resume` (a Checkpoint or its file) continues a saved run: `steps` is
+    still the total, the returned history includes the saved steps, and the
+    continuation is bit-identical to an uninterrupted run (see
+    nanotorch.checkpoint).
+    """
+
     if steps < 0:
         raise ValueError("steps must be non-negative")
-    if len(data_list) == 0:
+    resumed = _resume(resume, data, params, rule, optimizer, steps)
+    if checkpoint is not None:
+        checkpoint.attach(params, optimizer=optimizer, rule=rule, data=data)
+    if profiler is not None:
+        predict, loss, rule = profiler.instrument(predict, loss, rule)
+    step_fn = _make_step_fn(data, predict, loss, rule)
+    if step_fn is None:
         # If there's no data, we can't compute loss. Returning zeros keeps the
         # contract "history length == steps" without inventing a loss value.
         return [0.0 for _ in range(steps)]
 
-    # Normalize observer to a list so we can call uniformly.
-    observers: List[ObserverFn] = []
-    if observer is not None:
-        if isinstance(observer, (list, tuple)):
-            observers = list(observer)
-        else:
-            observers = [observer]
-
-    for step in range(steps):
-        total_loss = 0.0
-        # We accumulate gradients across the dataset and average them so the
-        # learning rate is stable w.r.t. dataset size (simple batch gradient).
-        grads_sum: Dict[str, Scalar] = {k: 0.0 for k in params}
-
-        for x, y in data_list:
-            y_hat = predict(x, params)
-            # Loss is per-sample; we sum and later average to get a single
-            # comparable scalar per step.
-            total_loss += loss(y_hat, y)
-            grads = rule(x, y, y_hat, params)
-            for name, value in grads.items():
-                grads_sum[name] = grads_sum.get(name, 0.0) + value
-
-        n = float(len(data_list))
-        for name in grads_sum:
-            grads_sum[name] /= n
-            # Plain gradient descent update; learning rules can change this
-            # without modifying the training loop.
-            params[name] -= lr * grads_sum[name]
-
-        # We store mean loss per step to make "learning progress" observable
-        # without requiring external logging in Sprint 0.
-        step_loss = total_loss / n
-        history.append(step_loss)
-
-        if observers:
-            # Emit a snapshot for visualization and debugging.
-            state = StepState(
-                step=step,
-                loss=step_loss,
-                params=dict(params),
-                grads=dict(grads_sum),
-            )
-            for obs in observers:
-                obs(state)
-
-    return history
+    return _run_history(
+        step_fn,
+        params,
+        steps=steps,
+        lr=lr,
+        observer=observer,
+        recorder=recorder,
+        optimizer=optimizer,
+        profiler=profiler,
+        resumed=resumed,
+        checkpoint=checkpoint,
+    )
 
 
 def train_iter(
-    data: Iterable[DataPoint],
+    data: Iterable[DataPoint] | DataLoader,
     params: Params,
     predict: PredictFn,
     loss: LossFn,
@@ -166,40 +620,38 @@ def train_iter(
     *,
     steps: int,
     lr: float,
+    optimizer: Optimizer | None = None,
+    profiler: StepProfiler | None = None,
+    checkpoint: Checkpointer | None = None,
+    resume: Checkpoint | str | Path | None = None,
 ) -> Iterator[StepState]:
     """
     Yield StepState after each update so callers can visualize or debug.
 
     This is the native observability hook: it exposes the same internal values
-    used by train(), but in a structured, testable form.
+    used by train(), but in a structured, testable form. Accepts a DataLoader
+    for minibatch stepping just like train(), and checkpoints the same way; a
+    resumed run yields only the new steps.
     """
 
-    data_list = list(data)
     if steps < 0:
         raise ValueError("steps must be non-negative")
-    if len(data_list) == 0:
+    resumed = _resume(resume, data, params, rule, optimizer, steps)
+    if checkpoint is not None:
+        checkpoint.attach(params, optimizer=optimizer, rule=rule, data=data)
+    if profiler is not None:
+        predict, loss, rule = profiler.instrument(predict, loss, rule)
+    step_fn = _make_step_fn(data, predict, loss, rule)
+    if step_fn is None:
         return
 
-    for step in range(steps):
-        total_loss = 0.0
-        grads_sum: Dict[str, Scalar] = {k: 0.0 for k in params}
-
-        for x, y in data_list:
-            y_hat = predict(x, params)
-            total_loss += loss(y_hat, y)
-            grads = rule(x, y, y_hat, params)
-            for name, value in grads.items():
-                grads_sum[name] = grads_sum.get(name, 0.0) + value
-
-        n = float(len(data_list))
-        for name in grads_sum:
-            grads_sum[name] /= n
-            params[name] -= lr * grads_sum[name]
-
-        step_loss = total_loss / n
-        yield StepState(
-            step=step,
-            loss=step_loss,
-            params=dict(params),  # snapshot to avoid later mutation confusion
-            grads=dict(grads_sum),
-        )
+    yield from _run_states(
+        step_fn,
+        params,
+        steps=steps,
+        lr=lr,
+        optimizer=optimizer,
+        profiler=profiler,
+        resumed=resumed,
+        checkpoint=checkpoint,
+    )
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+# Step-through visualization of a recorded trace.
+#
+# The notebook used to rebuild a whole two-panel figure, and re-evaluate
+# predict point by point, every time the step slider moved. StepView builds
+# the figure once: the data scatter, the full loss curve and the axes never
+# change. They are rasterized once into a background, and each step restores
+# that background and draws only the model line, the loss marker and the
+# title on top (blitting). Rendered frames (PNG bytes) are kept in an LRU
+# cache, so scrubbing back and forth over recent steps costs nothing.
+#
+# `export_trace` writes a whole trace as a GIF, an MP4 (needs ffmpeg on PATH)
+# or a directory of PNGs. Frames are rendered in worker processes, each
+# holding its own StepView for the scenario; only frame indices and PNG
+# bytes cross the process boundary.
+
+import io
+import os
+import shutil
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+
+from .cache import ResultCache, scenario_run
+from .params import require_scalars
+from .plotting import _line
+from .scenarios import Scenario, get_scenario
+from .trace_store import TraceReader
+
+_LINE_POINTS = 51
+
+
+def dict_to_table(title: str, values: Dict[str, float]) -> str:
+    """An HTML table of name/value pairs (params or grads)."""
+
+    rows = "".join(f"<tr><td>{k}</td><td>{v:.6f}</td></tr>" for k, v in values.items())
+    return (
+        f"<h4>{title}</h4>"
+        "<table>"
+        "<thead><tr><th>name</th><th>value</th></tr></thead>"
+        f"<tbody>{rows}</tbody>"
+        "</table>"
+    )
+
+
+class StepView:
+    """
+    One persistent figure for scrubbing through a scenario's trace.
+
+    `frame(i)` returns step i as PNG bytes (LRU-cached, `cache_frames`
+    entries); `tables(i)` returns the params/grads HTML tables.
+    """
+
+    def __init__(
+        self,
+        scenario: Scenario,
+        trace: Any,
+        *,
+        cache_frames: int = 256,
+        figsize: Tuple[float, float] = (12, 4),
+        dpi: float = 72,
+    ) -> None:
+        if cache_frames < 0:
+            raise ValueError("cache_frames must be non-negative")
+        if len(trace) == 0:
+            raise ValueError("the trace has no steps to show")
+        self.scenario = scenario
+        self.trace = trace
+        self.cache_frames = cache_frames
+        self.dpi = dpi
+        self._frames: OrderedDict[int, bytes] = OrderedDict()
+        self._shown = -1
+
+        xs = [x for x, _ in scenario.data]
+        ys = [y for _, y in scenario.data]
+        self._line_x = np.linspace(min(xs) - 1, max(xs) + 1, _LINE_POINTS)
+
+        self.figure = Figure(figsize=figsize, dpi=dpi, layout="constrained")
+        self._canvas = FigureCanvasAgg(self.figure)
+        left, right = self.figure.subplots(1, 2)
+
+        # Left panel: data + model line. Fix the limits from the data and the
+        # first/last model lines so the view doesn't jump between steps.
+        left.scatter(xs, ys, color="black", label="data")
+        (self._model,) = left.plot(self._line_x, self._line_y(0), color="blue", label="model")
+        ends = np.concatenate([ys, self._line_y(0), self._line_y(len(trace) - 1)])
+        lo, hi = float(ends.min()), float(ends.max())
+        pad = 0.1 * (hi - lo) or 1.0
+        left.set_xlim(self._line_x[0], self._line_x[-1])
+        left.set_ylim(lo - pad, hi + pad)
+        left.set_xlabel("x")
+        left.set_ylabel("y")
+        left.legend(loc="upper left")
+        self._left = left
+
+        # Right panel: the loss curve is drawn once; only the marker moves.
+        losses = np.asarray(trace.losses, dtype=np.float64)
+        right.plot(np.arange(len(losses)), losses, color="purple")
+        (self._marker,) = right.plot([0], [losses[0]], "o", color="red")
+        right.set_title("Loss over steps")
+        right.set_xlabel("step")
+        right.set_ylabel("loss")
+        self._losses = losses
+
+        # Lay out and rasterize the static parts once. The moving artists are
+        # marked animated, so the full draw leaves them out of the background.
+        left.set_title(self._title(len(trace) - 1))
+        self._dynamic = (self._model, self._marker, left.title)
+        for artist in self._dynamic:
+            artist.set_animated(True)
+        self._canvas.draw()
+        self.figure.set_layout_engine("none")
+        self._background = self._canvas.copy_from_bbox(self.figure.bbox)
+
+    @classmethod
+    def for_scenario(cls, name: str, cache: ResultCache | None = None, **kwargs: Any) -> StepView:
+        """A view of a registry scenario's cached standard run."""
+
+        scenario = get_scenario(name)
+        require_scalars(scenario.params, f"StepView of '{name}'")
+        return cls(scenario, scenario_run(name, cache).trace, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.trace)
+
+    def _line_y(self, i: int) -> np.ndarray:
+        scenario = self.scenario
+        lo, hi = self._line_x[0], self._line_x[-1]
+        _, ys = _line(scenario.predict, self.trace[i].params, lo, hi, _LINE_POINTS, scenario.batch_predict)
+        return ys
+
+    def _index(self, i: int) -> int:
+        # Negative indices count from the end, as for a list; anything else
+        # out of range is an error rather than wrapping around.
+        if not -len(self) <= i < len(self):
+            raise IndexError("step index out of range")
+        return i % len(self)
+
+    def update(self, i: int) -> None:
+        """Point the figure's artists at step i (no rasterization)."""
+
+        i = self._index(i)
+        if i == self._shown:
+            return
+        self._model.set_ydata(self._line_y(i))
+        self._marker.set_data([i], [self._losses[i]])
+        self._left.title.set_text(self._title(i))
+        self._shown = i
+
+    def _title(self, i: int) -> str:
+        state = self.trace[i]
+        return f"Step {state.step} | loss={state.loss:.4f}"
+
+    def frame(self, i: int) -> bytes:
+        """Step i rendered as PNG bytes."""
+
+        i = self._index(i)
+        png = self._frames.get(i)
+        if png is not None:
+            self._frames.move_to_end(i)
+            return png
+        self.update(i)
+        self._canvas.restore_region(self._background)
+        for artist in self._dynamic:
+            self.figure.draw_artist(artist)
+        width, height = self._canvas.get_width_height(physical=True)
+        image = Image.frombuffer("RGBA", (width, height), self._canvas.buffer_rgba(), "raw", "RGBA", 0, 1)
+        buffer = io.BytesIO()
+        # Fast zlib level: frames are short-lived and re-encoded by exporters.
+        image.save(buffer, "PNG", compress_level=1)
+        png = buffer.getvalue()
+        if self.cache_frames:
+            self._frames[i] = png
+            if len(self._frames) > self.cache_frames:
+                self._frames.popitem(last=False)
+        return png
+
+    def tables(self, i: int) -> Tuple[str, str]:
+        state = self.trace[i]
+        return dict_to_table("params", state.params), dict_to_table("grads", state.grads)
+
+
+def _render_frames(name: str, trace_path: Path, indices: Sequence[int], dpi: float) -> List[bytes]:
+    # Runs in a worker: rebuild the view from picklable inputs.
+    view = StepView(get_scenario(name), TraceReader(trace_path), cache_frames=0, dpi=dpi)
+    return [view.frame(i) for i in indices]
+
+
+def _chunks(indices: Sequence[int], parts: int) -> List[Sequence[int]]:
+    # Contiguous chunks, so each worker's model lines change gradually and
+    # results come back in order.
+    size = -(-len(indices) // parts)
+    return [indices[k : k + size] for k in range(0, len(indices), size)]
+
+
+def export_trace(
+    name: str,
+    path: str | Path,
+    *,
+    cache: ResultCache | None = None,
+    every: int = 1,
+    fps: float = 10,
+    dpi: float = 72,
+    workers: int | None = None,
+) -> Path:
+    """
+    Export a registry scenario's trace as an animation or frame sequence.
+
+    The format follows the suffix of `path`: ".gif", ".mp4" (needs ffmpeg),
+    or no suffix for a directory of numbered PNGs. `every` keeps every n-th
+    step. Frames render in up to `workers` processes (default: one per CPU).
+    """
+
+    if every < 1:
+        raise ValueError("every must be at least 1")
+    if fps <= 0:
+        raise ValueError("fps must be positive")
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix not in ("", ".gif", ".mp4"):
+        raise ValueError(f"unsupported export format '{suffix}'; use .gif, .mp4 or a directory")
+    if suffix == ".mp4" and shutil.which("ffmpeg") is None:
+        raise ValueError("MP4 export needs ffmpeg on PATH; export a .gif or a PNG directory instead")
+
+    require_scalars(get_scenario(name).params, f"exporting '{name}'")
+
+    trace = scenario_run(name, cache).trace
+    indices = list(range(0, len(trace), every))
+    if not indices:
+        raise ValueError("the trace has no steps to export")
+    workers = min(workers or os.cpu_count() or 1, len(indices))
+    if workers <= 1:
+        frames = _render_frames(name, trace.path, indices, dpi)
+    else:
+        chunks = _chunks(indices, workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(_render_frames, [name] * len(chunks), [trace.path] * len(chunks), chunks, [dpi] * len(chunks))
+            frames = [png for part in parts for png in part]
+
+    if suffix == "":
+        path.mkdir(parents=True, exist_ok=True)
+        for k, png in enumerate(frames):
+            (path / f"frame-{k:05d}.png").write_bytes(png)
+        return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if suffix == ".gif":
+        images = [Image.open(io.BytesIO(png)) for png in frames]
+        images[0].save(
+            path, save_all=True, append_images=images[1:], duration=1000.0 / fps, loop=0, optimize=False
+        )
+        return path
+
+    # .mp4: stream the PNGs straight into ffmpeg.
+    command = [
+        "ffmpeg", "-y", "-loglevel", "error", "-f", "image2pipe", "-framerate", str(fps),
+        "-i", "-", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", str(path),
+    ]
+    subprocess.run(command, input=b"".join(frames), check=True)
+    return path
@@ -1,5 +1,6 @@
 import pytest
 
+from nanotorch.cache import ResultCache
 from nanotorch.scenarios import get_scenario
 
 
@@ -31,3 +32,10 @@ def scenario_constant_target():
 @pytest.fixture
 def scenario_noisy_linear():
     return get_scenario("noisy_linear")
+
+
+@pytest.fixture(scope="session")
+def result_cache(tmp_path_factory):
+    # One content-addressed cache per test session: tests that only need the
+    # outcome of a standard scenario run share it instead of retraining.
+    return ResultCache(tmp_path_factory.mktemp("result_cache"))
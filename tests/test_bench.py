@@ -0,0 +1,43 @@
+import json
+
+from nanotorch.bench import Case, compare, main, run_case
+
+
+def test_case_reports_every_metric():
+    result = run_case(Case("train", "manual", n=200, p=2), steps=2, repeat=1)
+
+    assert result.status == "ok"
+    assert result.steps_per_sec > 0
+    assert result.latency_ns_per_sample > 0
+    assert result.peak_memory_bytes > 0
+    # The synthetic problem is well conditioned, so the target is reachable.
+    assert result.steps_to_target is not None and result.time_to_target_s > 0
+
+
+def test_cases_over_the_work_budget_are_skipped_not_run():
+    result = run_case(Case("train", "finite_difference", n=10_000_000, p=10_000), steps=5, max_work=1e6)
+    assert result.status == "skipped"
+    assert result.steps_per_sec is None
+
+
+def test_compare_flags_only_regressions_past_their_threshold():
+    baseline = {"results": [{"name": "a", "status": "ok", "steps_per_sec": 100.0, "peak_memory_bytes": 1000}]}
+    current = {"results": [{"name": "a", "status": "ok", "steps_per_sec": 85.0, "peak_memory_bytes": 1100}]}
+
+    regressions = compare(current, baseline, {"steps_per_sec": 0.10, "peak_memory_bytes": 0.20})
+
+    assert [(r.metric, round(r.change, 2)) for r in regressions] == [("steps_per_sec", -0.15)]
+
+
+def test_cli_writes_json_and_gates_on_the_baseline(tmp_path):
+    out = tmp_path / "results.json"
+    args = ["--sizes", "100", "--params", "1", "--rules", "manual", "--engines", "train", "--steps", "1", "--repeat", "1"]
+    assert main(args + ["--out", str(out)]) == 0
+    report = json.loads(out.read_text())
+    assert report["results"][0]["name"] == "train/manual/n=100/p=1"
+
+    # A baseline that claims to be far faster must fail the gate.
+    report["results"][0]["steps_per_sec"] *= 100
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(report))
+    assert main(args + ["--out", str(tmp_path / "again.json"), "--baseline", str(baseline)]) == 1
@@ -0,0 +1,93 @@
+import pytest
+
+from nanotorch import DataLoader, ParamStore, finite_difference, manual_gradient, train, train_iter
+from nanotorch.checkpoint import Checkpoint, Checkpointer
+from nanotorch.optim import Adam, LBFGS
+from nanotorch.scenarios import get_scenario
+
+
+def _points():
+    return [(x / 10.0, 3.0 * x / 10.0 - 1.0) for x in range(-20, 21)]
+
+
+def _run(tmp_path, steps, *, checkpoint=None, resume=None, params=None):
+    scenario = get_scenario("with_bias")
+    loader = DataLoader(_points, batch_size=4, shuffle_buffer=8, seed=3)
+    params = params if params is not None else dict(scenario.params)
+    rule = finite_difference(predict=scenario.predict, loss=scenario.loss, method="spsa", seed=7)
+    history = train(
+        loader, params, scenario.predict, scenario.loss, rule,
+        steps=steps, lr=0.05, optimizer=Adam(), checkpoint=checkpoint, resume=resume,
+    )
+    return history, params
+
+
+def test_resume_is_bit_identical_with_loader_optimizer_and_random_rule(tmp_path):
+    full_history, full_params = _run(tmp_path, 25)
+
+    # Interrupt after step 13: checkpoints at 6 and 12 (and the epoch spans
+    # 11 batches, so step 12 sits mid-epoch).
+    saver = Checkpointer(tmp_path / "ckpt", every_steps=6)
+    _run(tmp_path, 13, checkpoint=saver)
+    assert [p.name for p in saver.paths()] == ["step-000000006.ckpt", "step-000000012.ckpt"]
+
+    history, params = _run(tmp_path, 25, resume=saver.latest())
+    assert history == full_history
+    assert params == full_params
+
+
+def test_train_iter_resumes_with_continued_step_numbers(tmp_path):
+    scenario = get_scenario("noisy_linear")
+
+    def states(**kwargs):
+        return train_iter(scenario.data, ParamStore(scenario.params), scenario.predict, scenario.loss,
+                          manual_gradient(scenario.grad), steps=10, lr=1.0, optimizer=LBFGS(), **kwargs)
+
+    full = list(states())
+    saver = Checkpointer(tmp_path, every_steps=4, async_write=True, keep=1)
+    for state in states(checkpoint=saver):
+        if state.step == 5:
+            break
+    saver.close()
+    assert [p.name for p in saver.paths()] == ["step-000000004.ckpt"]
+
+    checkpoint = Checkpoint.load(saver.latest())
+    assert checkpoint.step == 4 and len(checkpoint.history) == 4
+    resumed = list(states(resume=checkpoint))
+    assert [s.step for s in resumed] == list(range(4, 10))
+    assert [(s.loss, s.params) for s in resumed] == [(s.loss, s.params) for s in full[4:]]
+
+
+def test_time_interval_checkpoints(tmp_path):
+    scenario = get_scenario("noisy_linear")
+    saver = Checkpointer(tmp_path, every_seconds=1e-9)
+    train(scenario.data, dict(scenario.params), scenario.predict, scenario.loss,
+          manual_gradient(scenario.grad), steps=3, lr=scenario.lr, checkpoint=saver)
+    assert len(saver.paths()) == 3
+
+
+def test_mismatched_resume_and_bad_files_are_rejected(tmp_path):
+    scenario = get_scenario("noisy_linear")
+    checkpoint = Checkpoint(step=2, params={"other": 1.0}, history=[1.0, 0.5])
+    with pytest.raises(ValueError, match="don't match"):
+        train(scenario.data, dict(scenario.params), scenario.predict, scenario.loss,
+              manual_gradient(scenario.grad), steps=3, lr=scenario.lr, resume=checkpoint)
+    with pytest.raises(ValueError, match="past steps"):
+        train(scenario.data, dict(scenario.params), scenario.predict, scenario.loss,
+              manual_gradient(scenario.grad), steps=1, lr=scenario.lr,
+              resume=Checkpoint(step=2, params=dict(scenario.params)))
+
+    (tmp_path / "junk.ckpt").write_bytes(b"not a checkpoint")
+    with pytest.raises(ValueError, match="bad magic"):
+        Checkpoint.load(tmp_path / "junk.ckpt")
+    with pytest.raises(ValueError, match="every_steps"):
+        Checkpointer(tmp_path)
+
+
+def test_loaders_that_cant_resume_fail_before_training(tmp_path):
+    scenario = get_scenario("noisy_linear")
+    loader = DataLoader(_points(), batch_size=4, prefetch=2)
+    with pytest.raises(ValueError, match="prefetch=0"):
+        train(loader, dict(scenario.params), scenario.predict, scenario.loss,
+              manual_gradient(scenario.grad), steps=3, lr=scenario.lr,
+              checkpoint=Checkpointer(tmp_path, every_steps=1))
@@ -0,0 +1,127 @@
+import math
+
+import numpy as np
+import pytest
+
+from nanotorch import StepState, autodiff, manual_gradient, train
+from nanotorch.compiler import CompileError, compile_scenario, compile_step, train_compiled
+from nanotorch.scenarios import get_scenario, list_scenarios
+
+
+@pytest.mark.parametrize("name", list_scenarios())
+def test_compiled_kernel_reproduces_train_exactly(name):
+    # Same operations in the same order, so not just close: identical.
+    scenario = get_scenario(name)
+    expected_params, params = dict(scenario.params), dict(scenario.params)
+    expected = train(
+        scenario.data, expected_params, scenario.predict, scenario.loss,
+        manual_gradient(scenario.grad), steps=scenario.steps, lr=scenario.lr,
+    )
+
+    history = train_compiled(
+        scenario.data, params, scenario.predict, scenario.loss, scenario.grad,
+        steps=scenario.steps, lr=scenario.lr, strict=True,
+    )
+
+    assert history == expected
+    assert params == expected_params
+
+
+def test_gradients_are_derived_when_no_grad_is_given():
+    scenario = get_scenario("noisy_linear")
+    expected = train(
+        scenario.data, dict(scenario.params), scenario.predict, scenario.loss,
+        autodiff(predict=scenario.predict, loss=scenario.loss), steps=20, lr=scenario.lr,
+    )
+    history = train_compiled(
+        scenario.data, dict(scenario.params), scenario.predict, scenario.loss, steps=20, lr=scenario.lr, strict=True
+    )
+    assert history == pytest.approx(expected, rel=1e-12)
+
+
+def test_hooks_and_numpy_columns_use_the_step_kernel():
+    scenario = get_scenario("with_bias")
+    seen = []
+    xs, ys = (np.array(c) for c in zip(*scenario.data))
+    history = train_compiled(
+        (xs, ys), dict(scenario.params), scenario.predict, scenario.loss, scenario.grad,
+        steps=5, lr=scenario.lr, observer=seen.append, strict=True,
+    )
+    expected = train(
+        scenario.data, dict(scenario.params), scenario.predict, scenario.loss,
+        manual_gradient(scenario.grad), steps=5, lr=scenario.lr,
+    )
+
+    assert history == pytest.approx(expected)
+    assert all(isinstance(s, StepState) for s in seen) and len(seen) == 5
+
+
+def test_kernels_are_cached_per_scenario():
+    # get_scenario builds fresh closures each call; the cache keys on code,
+    # so a second lookup reuses the generated kernel.
+    first = compile_scenario(get_scenario("with_bias"))
+    assert first is compile_scenario(get_scenario("with_bias"))
+    assert "def train(" in first.source
+
+
+def test_untraceable_functions_fall_back_to_train():
+    def predict(x, p):
+        return math.tanh(p["w"] * x)  # math.* needs a real float
+
+    def loss(y_hat, y):
+        return (y_hat - y) ** 2
+
+    def grad(x, y, y_hat, p):
+        return {"w": 2 * (y_hat - y) * (1 - y_hat**2) * x}
+
+    with pytest.raises(CompileError):
+        compile_step(predict, loss, grad, ["w"])
+
+    def branchy(x, p):
+        return x if p["w"] == 0.0 else p["w"] * x  # equality is control flow too
+
+    for fn in (branchy, lambda x, p: x if p["w"] != 0.0 else 0.0):
+        with pytest.raises(CompileError):
+            compile_step(fn, loss, None, ["w"])
+
+    def branchy_grad(x, y, y_hat, p):
+        return {"w": 0.0 if p["w"] == 0.0 else 2 * (y_hat - y) * x}
+
+    points = [(1.0, 2.0), (2.0, 3.0)]
+    expected = train(points, {"w": 1.0}, branchy, loss, manual_gradient(branchy_grad), steps=3, lr=0.25)
+    assert train_compiled(points, {"w": 1.0}, branchy, loss, branchy_grad, steps=3, lr=0.25) == expected
+
+    data = [(1.0, 0.5), (2.0, 0.9)]
+    expected = train(data, {"w": 0.1}, predict, loss, manual_gradient(grad), steps=5, lr=0.1)
+    assert train_compiled(data, {"w": 0.1}, predict, loss, grad, steps=5, lr=0.1) == expected
+
+
+K = 2.0
+
+
+def test_cache_key_covers_defaults_and_globals():
+    global K
+
+    def make(k):
+        def predict(x, p, k=k):
+            return p["w"] * x * k
+
+        return predict
+
+    def loss(y_hat, y):
+        return (y_hat - y) ** 2
+
+    def scaled(x, p):
+        return p["w"] * x * K
+
+    assert compile_step(make(1.0), loss, None, ["w"]) is not compile_step(make(3.0), loss, None, ["w"])
+    assert compile_step(make(1.0), loss, None, ["w"]) is compile_step(make(1.0), loss, None, ["w"])
+
+    before = compile_step(scaled, loss, None, ["w"])
+    K = 5.0
+    try:
+        after = compile_step(scaled, loss, None, ["w"])
+    finally:
+        K = 2.0
+    assert after is not before
+    assert after.step([(1.0, 0.0)], 1.0)[0] == 25.0
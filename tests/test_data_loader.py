@@ -0,0 +1,92 @@
+import tracemalloc
+
+import pytest
+
+from nanotorch import DataLoader, manual_gradient, train, train_batched
+from nanotorch.data import read_csv
+from nanotorch.scenarios import get_scenario
+
+
+def test_loader_yields_fixed_size_batches_across_epochs():
+    # Training asks for a batch per step, so the stream has to roll into the
+    # next epoch seamlessly while keeping the epoch counter honest.
+    loader = DataLoader([(float(i), 0.0) for i in range(5)], batch_size=2)
+    batches = iter(loader)
+
+    sizes = [len(next(batches)) for _ in range(6)]
+
+    assert sizes == [2, 2, 1, 2, 2, 1]
+    assert loader.epoch == 1
+
+
+def test_shuffle_buffer_is_a_seeded_permutation():
+    # A bounded buffer only reorders locally, but it must never drop or
+    # duplicate points, and a seed must make the order reproducible.
+    points = [(float(i), float(i)) for i in range(50)]
+
+    def first_epoch(seed):
+        loader = DataLoader(points, batch_size=7, shuffle_buffer=8, seed=seed)
+        return [p for batch in loader.epoch_batches() for p in batch]
+
+    shuffled = first_epoch(seed=3)
+    assert sorted(shuffled) == points
+    assert shuffled != points
+    assert first_epoch(seed=3) == shuffled
+
+
+def test_minibatch_training_streams_large_generator_in_flat_memory():
+    # A generator function is restartable per epoch, and with minibatches the
+    # loop only ever holds one batch plus the shuffle buffer in memory.
+    scenario = get_scenario("with_bias")
+
+    def source():
+        for i in range(200_000):
+            x = (i % 100) / 50.0
+            yield x, 2.0 * x + 1.0
+
+    loader = DataLoader(source, batch_size=16, shuffle_buffer=64, seed=0, steps_per_epoch=100)
+    tracemalloc.start()
+    history = train(
+        loader, scenario.params, scenario.predict, scenario.loss,
+        manual_gradient(scenario.grad), steps=300, lr=0.05,
+    )
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert history[0] > history[-1]
+    assert loader.epoch == 2
+    # Materializing 200k tuples would take well over 10 MB.
+    assert peak < 1_000_000
+
+
+def test_batched_engine_accepts_csv_loader(tmp_path, scenario_noisy_linear):
+    # File sources are streamed row by row; the batched engine converts one
+    # minibatch at a time into columns. batch_size >= N reproduces full batch.
+    scenario = scenario_noisy_linear
+    path = tmp_path / "noisy.csv"
+    path.write_text("x,y\n" + "".join(f"{x},{y}\n" for x, y in scenario.data))
+
+    reference = get_scenario("noisy_linear")
+    expected = train(
+        reference.data, reference.params, reference.predict, reference.loss,
+        manual_gradient(reference.grad), steps=scenario.steps, lr=scenario.lr,
+    )
+    history = train_batched(
+        DataLoader(path, batch_size=len(scenario.data)),
+        scenario.params, scenario.batch_predict, scenario.batch_loss,
+        manual_gradient(scenario.batch_grad), steps=scenario.steps, lr=scenario.lr,
+    )
+
+    assert history == pytest.approx(expected)
+
+
+def test_read_csv_rejects_rows_without_exactly_two_fields(tmp_path):
+    path = tmp_path / "wide.csv"
+    path.write_text("x,y\n1,2\n\n3,4,5\n")
+    with pytest.raises(ValueError, match=r"wide.csv:4: expected two numeric columns"):
+        list(read_csv(path))
+
+    # A numeric first row is data, so it can't hide as a header either.
+    path.write_text("1,2,3\n4,5\n")
+    with pytest.raises(ValueError, match=r"wide.csv:1: expected two numeric columns"):
+        list(read_csv(path))
@@ -0,0 +1,115 @@
+import random
+
+import numpy as np
+import pytest
+
+from nanotorch import ParamStore, manual_gradient, train, train_batched
+from multiprocessing.shared_memory import SharedMemory
+
+from nanotorch import parallel
+from nanotorch.parallel import DataParallel, train_parallel
+from nanotorch.scenarios import get_scenario
+
+
+def _fresh(params):
+    return {name: np.array(value) for name, value in params.items()}
+
+
+def _noisy_line(n, seed=0):
+    rng = random.Random(seed)
+    return [(x / 100.0, 2.0 * x / 100.0 + 1.0 + rng.gauss(0.0, 0.1)) for x in range(n)]
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_sharded_training_matches_serial_engine(batched):
+    # Each worker reduces its shard to partial sums; the combined step must
+    # equal the serial full-batch step up to summation order.
+    data = _noisy_line(1001)
+    serial = get_scenario("with_bias")
+    sharded = get_scenario("with_bias")
+
+    run_serial = train_batched if batched else train
+    expected = run_serial(
+        data, serial.params, serial.predict, serial.loss,
+        manual_gradient(serial.grad), steps=20, lr=0.01,
+    )
+    history = train_parallel(
+        data, sharded.params, sharded.predict, sharded.loss,
+        manual_gradient(sharded.grad), steps=20, lr=0.01, workers=3, batched=batched,
+    )
+
+    assert history == pytest.approx(expected, rel=1e-10)
+    assert sharded.params == pytest.approx(serial.params, rel=1e-10)
+
+
+@pytest.mark.parametrize("reduced", [False, True])
+def test_batched_shards_reduce_array_gradients_per_entry(reduced):
+    # w = [slope, intercept] as one array param; the rule returns either one
+    # gradient row per sample or the already-summed total.
+    def predict(x, p):
+        return p["w"][0] * x + p["w"][1]
+
+    def loss(y_hat, y):
+        return (y_hat - y) ** 2
+
+    def grad(x, y, y_hat, p):
+        err = 2 * (y_hat - y)
+        rows = np.stack([err * x, err], axis=-1)
+        return {"w": rows.sum(axis=0) if reduced else rows}
+
+    data = _noisy_line(401)
+    expected, params = {"w": np.zeros(2)}, {"w": np.zeros(2)}
+    history = train_batched(data, expected, predict, loss, manual_gradient(grad), steps=10, lr=0.1)
+    sharded = train_parallel(data, params, predict, loss, manual_gradient(grad), steps=10, lr=0.1, workers=2, batched=True)
+
+    assert sharded == pytest.approx(history, rel=1e-10)
+    np.testing.assert_allclose(params["w"], expected["w"], rtol=1e-10)
+    assert params["w"][0] != params["w"][1]
+
+
+def test_sharded_training_updates_param_store_and_reports_worker_errors():
+    scenario = get_scenario("single_point")
+    store = ParamStore(scenario.params)
+
+    history = train_parallel(
+        [(2.0, 10.0)] * 8, store, scenario.predict, scenario.loss,
+        manual_gradient(scenario.grad), steps=5, lr=0.1, workers=2,
+    )
+    assert history[0] > history[-1]
+    assert store["w"] > 0.0
+
+    def broken_rule(x, y, y_hat, params):
+        raise KeyError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        train_parallel(
+            [(2.0, 10.0)] * 4, dict(scenario.params), scenario.predict, scenario.loss,
+            broken_rule, steps=1, lr=0.1, workers=2,
+        )
+
+
+def test_matrix_columns_are_shared_and_failed_setup_leaves_no_segment(monkeypatch):
+    s = get_scenario("linear_regression", n=64, features=3, outputs=2, seed=1)
+    expected, params = _fresh(s.params), _fresh(s.params)
+    rule = manual_gradient(s.grad)
+    history = train(s.data, expected, s.predict, s.loss, rule, steps=3, lr=0.1)
+    assert train_parallel(s.data, params, s.predict, s.loss, rule, steps=3, lr=0.1, workers=2) == pytest.approx(history)
+    np.testing.assert_allclose(params["W"], expected["W"])
+
+    created = []
+
+    class Recording(SharedMemory):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self.name)
+
+    def no_processes(*args, **kwargs):
+        raise OSError("cannot start workers")
+
+    monkeypatch.setattr(parallel, "SharedMemory", Recording)
+    monkeypatch.setattr(parallel.mp, "get_context", lambda method=None: type("Ctx", (), {"Pipe": no_processes})())
+    with pytest.raises(OSError, match="cannot start workers"):
+        DataParallel(s.data, s.predict, s.loss, rule, workers=2)
+    assert len(created) == 1
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=created[0])
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from nanotorch import manual_gradient, train, train_batched
+from nanotorch import scenarios
+from nanotorch.dataset import csv_to_dataset, open_dataset, write_dataset
+
+
+def test_columnar_file_roundtrips_through_mmap(tmp_path):
+    # Opening must hand back memory-mapped columns (zero copies), not arrays
+    # read into RAM, or startup would scale with file size again.
+    xs = np.linspace(0.0, 1.0, 1001)
+    path = write_dataset(tmp_path / "line.ntds", xs, 2 * xs + 1, dtype=np.float32)
+
+    dataset = open_dataset(path)
+
+    assert isinstance(dataset.x, np.memmap)
+    assert dataset.x.dtype == np.float32
+    assert len(dataset) == 1001
+    assert np.allclose(dataset.y, 2 * xs + 1)
+    # Iteration yields plain float pairs, like the list form of a dataset.
+    assert next(iter(dataset)) == (0.0, 1.0)
+
+
+def test_csv_conversion_streams_in_small_blocks(tmp_path):
+    # A tiny block size forces rows to straddle block boundaries, which is the
+    # tricky part of parsing without building per-line Python objects.
+    rows = [(i * 0.5, -i * 1.25) for i in range(200)]
+    csv_path = tmp_path / "points.csv"
+    csv_path.write_text("x,y\n" + "".join(f"{x},{y}\r\n" for x, y in rows))
+
+    dataset = csv_to_dataset(csv_path, tmp_path / "points.ntds", block_size=37)
+
+    assert list(dataset) == rows
+
+
+def test_csv_conversion_rejects_ragged_rows(tmp_path):
+    csv_path = tmp_path / "bad.csv"
+    csv_path.write_text("1,2\n3\n")
+
+    with pytest.raises(ValueError, match="two numeric columns"):
+        csv_to_dataset(csv_path, tmp_path / "bad.ntds")
+
+    # Value count is even, but the pairs would shift; the bad line is named.
+    csv_path.write_text("x,y\n1,2\n3\n4,5\n6\n")
+    with pytest.raises(ValueError, match=r"bad.csv:3: expected two numeric columns, got '3'"):
+        csv_to_dataset(csv_path, tmp_path / "bad.ntds", block_size=8)
+
+
+def test_csv_conversion_skips_blank_lines(tmp_path):
+    csv_path = tmp_path / "gaps.csv"
+    csv_path.write_text("1,2\n\n3,4\n\n\n5,6\n\n")
+
+    dataset = csv_to_dataset(csv_path, tmp_path / "gaps.ntds", block_size=5)
+
+    assert list(dataset) == [(1.0, 2.0), (3.0, 4.0), (5.0, 6.0)]
+
+
+def test_engines_and_registry_accept_datasets_directly(tmp_path, monkeypatch):
+    # A file-backed scenario must train exactly like the same points held in
+    # a list, on both engines, and be reachable through get_scenario().
+    reference = scenarios.get_scenario("with_bias")
+    xs, ys = zip(*reference.data)
+    path = write_dataset(tmp_path / "with_bias.ntds", xs, ys)
+
+    monkeypatch.setattr(scenarios, "_SCENARIOS", dict(scenarios._SCENARIOS))
+    scenarios.register_scenario(
+        "with_bias_file", lambda: scenarios.dataset_scenario("with_bias_file", path, steps=40, lr=0.05)
+    )
+    scalar = scenarios.get_scenario("with_bias_file")
+    batched = scenarios.get_scenario("with_bias_file")
+
+    expected = train(
+        reference.data, reference.params, reference.predict, reference.loss,
+        manual_gradient(reference.grad), steps=reference.steps, lr=reference.lr,
+    )
+    history = train(
+        scalar.data, scalar.params, scalar.predict, scalar.loss,
+        manual_gradient(scalar.grad), steps=scalar.steps, lr=scalar.lr,
+    )
+    batched_history = train_batched(
+        batched.data, batched.params, batched.batch_predict, batched.batch_loss,
+        manual_gradient(batched.batch_grad), steps=batched.steps, lr=batched.lr,
+    )
+
+    assert history == expected
+    assert batched_history == pytest.approx(expected)
+    assert "with_bias_file" in scenarios.list_scenarios()
@@ -0,0 +1,85 @@
+import base64
+import json
+import re
+
+import numpy as np
+import pytest
+
+from nanotorch.export_html import build_pyramid, export_trace_html, main, render_trace_html, trace_payload
+from nanotorch.trace import TraceRecorder
+from nanotorch.training import manual_gradient, train_iter
+
+
+def _decode(b64):
+    return np.frombuffer(base64.b64decode(b64), dtype="<f4")
+
+
+def _embedded(document):
+    return json.loads(re.search(r'id="trace-data">(.*?)</script>', document, re.S).group(1))
+
+
+def test_pyramid_keeps_min_max_and_mean_per_bucket():
+    values = np.arange(10, dtype=np.float64)
+    levels = build_pyramid(values, max_buckets=4, factor=2)
+
+    assert [level["size"] for level in levels] == [3, 6, 12]
+    finest = levels[0]
+    assert finest["min"].tolist() == [0, 3, 6, 9]
+    assert finest["max"].tolist() == [2, 5, 8, 9]
+    assert finest["mean"].tolist() == [1, 4, 7, 9]  # the partial bucket ignores padding
+    assert levels[-1]["min"].tolist() == [0] and levels[-1]["max"].tolist() == [9]
+
+    # Short series stay at full resolution.
+    assert build_pyramid(values, max_buckets=16)[0]["size"] == 1
+    with pytest.raises(ValueError, match="factor"):
+        build_pyramid(values, factor=1)
+
+
+def test_million_step_trace_stays_a_few_megabytes():
+    steps = 1_000_000
+    recorder = TraceRecorder(["w", "b"], capacity=steps)
+    params, grads = {"w": 0.5, "b": 0.5}, {"w": -0.1, "b": -0.1}
+    for step in range(steps):
+        recorder.record(step, 1.0 / (1.0 + step), params, grads)
+
+    document = render_trace_html(recorder)
+    assert len(document.encode()) < 3_000_000
+
+    payload = _embedded(document)
+    assert payload["count"] == steps
+    loss = payload["series"][0]
+    assert loss["name"] == "loss"
+    finest = loss["levels"][0]
+    assert len(_decode(finest["mean"])) <= 16384
+    # The spike-preserving max of the first bucket is the first loss.
+    assert _decode(finest["max"])[0] == pytest.approx(1.0)
+
+
+def test_exports_a_train_iter_generator_as_a_self_contained_file(tmp_path, scenario_with_bias):
+    s = scenario_with_bias
+    states = train_iter(
+        s.data, dict(s.params), s.predict, s.loss, manual_gradient(s.grad), steps=s.steps, lr=s.lr
+    )
+    path = export_trace_html(states, tmp_path / "run.html", title="with </script> bias")
+
+    document = path.read_text(encoding="utf-8")
+    # Nothing fetched from elsewhere, and the title can't close the script.
+    assert "src=" not in document and "href=" not in document
+    assert "with &lt;/script&gt; bias" in document
+
+    payload = trace_payload(
+        train_iter(s.data, dict(s.params), s.predict, s.loss, manual_gradient(s.grad), steps=s.steps, lr=s.lr)
+    )
+    assert _embedded(document) == payload
+    assert [series["name"] for series in payload["series"]] == ["loss", "param w", "param b", "grad w", "grad b"]
+    assert payload["series"][0]["levels"][0]["size"] == 1
+
+
+def test_cli_writes_one_file_per_scenario(tmp_path, monkeypatch, result_cache, capsys):
+    monkeypatch.setattr("nanotorch.cache._default", result_cache)
+    main(["with_bias", "noisy_linear", "--out", str(tmp_path)])
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["noisy_linear_trace.html", "with_bias_trace.html"]
+    assert "wrote" in capsys.readouterr().out
+    with pytest.raises(ValueError, match="no steps"):
+        render_trace_html(TraceRecorder(["w"]))
@@ -0,0 +1,64 @@
+import pytest
+
+from nanotorch import manual_gradient, train, train_iter
+from nanotorch.batched import train_batched, train_batched_iter
+from nanotorch.scenarios import get_scenario, list_scenarios
+
+
+@pytest.mark.parametrize("name", list_scenarios())
+def test_batched_engine_matches_scalar_history(name):
+    # The batched engine is only a faster way to compute the same step, so
+    # every registry scenario must produce the same learning curve on both.
+    scalar = get_scenario(name)
+    batched = get_scenario(name)
+
+    history = train(
+        scalar.data,
+        scalar.params,
+        scalar.predict,
+        scalar.loss,
+        manual_gradient(scalar.grad),
+        steps=scalar.steps,
+        lr=scalar.lr,
+    )
+    batched_history = train_batched(
+        batched.data,
+        batched.params,
+        batched.batch_predict,
+        batched.batch_loss,
+        manual_gradient(batched.batch_grad),
+        steps=batched.steps,
+        lr=batched.lr,
+    )
+
+    # Summation order differs (pairwise vs left-to-right), so we compare with
+    # a tight tolerance rather than bit-for-bit.
+    assert batched_history == pytest.approx(history, rel=1e-9, abs=1e-12)
+    assert batched.params == pytest.approx(scalar.params, rel=1e-9, abs=1e-12)
+
+
+def test_batched_iter_emits_same_stepstate_stream(scenario_with_bias):
+    # Visualization consumers must not care which engine produced the trace.
+    scalar = scenario_with_bias
+    batched = get_scenario("with_bias")
+
+    states = list(
+        train_iter(
+            scalar.data, scalar.params, scalar.predict, scalar.loss,
+            manual_gradient(scalar.grad), steps=5, lr=scalar.lr,
+        )
+    )
+    batched_states = list(
+        train_batched_iter(
+            batched.data, batched.params, batched.batch_predict, batched.batch_loss,
+            manual_gradient(batched.batch_grad), steps=5, lr=batched.lr,
+        )
+    )
+
+    assert [s.step for s in batched_states] == [s.step for s in states]
+    for got, want in zip(batched_states, states):
+        assert got.loss == pytest.approx(want.loss)
+        assert got.params == pytest.approx(want.params)
+        assert got.grads == pytest.approx(want.grads)
+        # Plain floats keep StepState JSON/plot friendly.
+        assert all(type(v) is float for v in got.grads.values())
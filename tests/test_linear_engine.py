@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from nanotorch import manual_gradient, train, train_iter
+from nanotorch.dataset import open_dataset, write_dataset
+from nanotorch.linear import detect_linear, fit_closed_form, linear_stats, train_linear, train_linear_iter
+from nanotorch.scenarios import get_scenario, list_scenarios
+
+
+@pytest.mark.parametrize("name", list_scenarios())
+def test_matches_generic_loop_on_every_registry_scenario(name):
+    scenario = get_scenario(name)
+    generic_params, fast_params = dict(scenario.params), dict(scenario.params)
+
+    expected = train(
+        scenario.data, generic_params, scenario.predict, scenario.loss,
+        manual_gradient(scenario.grad), steps=scenario.steps, lr=scenario.lr,
+    )
+    history = train_linear(scenario.data, fast_params, steps=scenario.steps, lr=scenario.lr, linear=scenario.linear)
+
+    assert history == pytest.approx(expected, rel=1e-12, abs=1e-12)
+    assert fast_params == pytest.approx(generic_params, rel=1e-12)
+
+
+def test_step_states_have_the_generic_shape():
+    scenario = get_scenario("with_bias")
+    generic = list(
+        train_iter(
+            scenario.data, dict(scenario.params), scenario.predict, scenario.loss,
+            manual_gradient(scenario.grad), steps=3, lr=scenario.lr,
+        )
+    )
+    fast = list(train_linear_iter(scenario.data, dict(scenario.params), scenario.predict, scenario.loss, steps=3, lr=scenario.lr))
+
+    assert [s.step for s in fast] == [s.step for s in generic]
+    assert fast[-1].params == pytest.approx(generic[-1].params)
+    assert fast[-1].grads == pytest.approx(generic[-1].grads)
+
+
+def test_streaming_stats_are_stable_and_chunk_independent(tmp_path):
+    # A large offset makes raw sums of squares cancel badly; centered stats
+    # merged across chunks must still give the exact variance.
+    rng = np.random.default_rng(0)
+    xs = 1e6 + rng.normal(size=200_000)
+    ys = 2.0 * xs + rng.normal(size=xs.size)
+    path = tmp_path / "big.ntds"
+    write_dataset(path, xs, ys)
+
+    stats = linear_stats(open_dataset(path))
+    assert stats.n == xs.size
+    assert stats.cxx == pytest.approx(np.sum((xs - xs.mean()) ** 2), rel=1e-9)
+    assert stats.cxy == pytest.approx(np.sum((xs - xs.mean()) * (ys - ys.mean())), rel=1e-9)
+    assert linear_stats(zip(xs.tolist(), ys.tolist())).cxx == pytest.approx(stats.cxx, rel=1e-9)
+
+
+def test_closed_form_solves_the_normal_equations():
+    scenario = get_scenario("noisy_linear")
+    params = dict(scenario.params)
+    best = fit_closed_form(scenario.data, params, scenario.predict, scenario.loss)
+
+    xs, ys = np.array(scenario.data).T
+    w, b = np.polyfit(xs, ys, 1)
+    assert params == pytest.approx({"w": w, "b": b})
+    assert best == pytest.approx(np.mean((w * xs + b - ys) ** 2))
+
+
+def test_detection_rejects_other_model_families():
+    def predict(x, p):
+        return p["w"] * x * x + p["b"]
+
+    def squared(y_hat, y):
+        return (y_hat - y) ** 2
+
+    assert detect_linear(predict, squared, {"w": 0.0, "b": 0.0}) is None
+    assert detect_linear(lambda x, p: p["w"] * x, lambda a, b: abs(a - b), {"w": 0.0}) is None
+    with pytest.raises(ValueError, match="not a linear model"):
+        train_linear([(1.0, 1.0)], {"w": 0.0, "b": 0.0}, predict, squared, steps=1, lr=0.1)
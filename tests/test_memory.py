@@ -0,0 +1,82 @@
+import tracemalloc
+
+import pytest
+
+from nanotorch import manual_gradient, train, train_iter
+from nanotorch.memory import (
+    AllocationBudget,
+    AllocationBudgetExceeded,
+    AllocationTracker,
+    assert_allocation_budget,
+)
+from nanotorch.scenarios import get_scenario
+
+
+def _train(scenario, rule=None, **kwargs):
+    return train(
+        scenario.data, dict(scenario.params), scenario.predict, scenario.loss,
+        rule or manual_gradient(scenario.grad), steps=scenario.steps, lr=scenario.lr, **kwargs,
+    )
+
+
+def test_tracking_does_not_change_results_and_reports_every_phase(result_cache):
+    scenario = get_scenario("noisy_linear")
+    with AllocationTracker() as tracker:
+        history = _train(scenario, profiler=tracker)
+    assert history == result_cache.scenario("noisy_linear").history
+    assert not tracemalloc.is_tracing()
+
+    assert len(tracker.steps) == scenario.steps
+    report = tracker.report()
+    assert report.steps == scenario.steps - 1
+    assert report.samples_per_step == len(scenario.data)
+    assert {"gradient", "update", "predict", "loss", "rule"} <= set(report.phases)
+    assert report.peak_bytes_per_step >= report.bytes_per_step > 0
+    assert report.bytes_per_sample > 0
+    assert "bytes / sample" in report.summary()
+
+
+def test_step_states_carry_allocated_bytes():
+    scenario = get_scenario("with_bias")
+    with AllocationTracker() as tracker:
+        states = list(
+            train_iter(scenario.data, dict(scenario.params), scenario.predict, scenario.loss,
+                       manual_gradient(scenario.grad), steps=3, lr=scenario.lr, profiler=tracker)
+        )
+    assert all(s.profile["gradient"] > 0 for s in states)
+    assert tracker.steps[-1]["step"] >= tracker.steps[-1]["gradient"]
+
+
+def test_budget_passes_and_fails_with_a_readable_message():
+    scenario = get_scenario("noisy_linear")
+    generous = AllocationBudget(peak_bytes_per_step=1 << 20, retained_bytes_per_step=1 << 16)
+    report = assert_allocation_budget(lambda t: _train(scenario, profiler=t), generous)
+    assert report.steps == scenario.steps - 1
+
+    with pytest.raises(AllocationBudgetExceeded, match="peak_bytes_per_step") as excinfo:
+        assert_allocation_budget(
+            lambda t: _train(scenario, profiler=t), AllocationBudget(peak_bytes_per_step=1)
+        )
+    assert isinstance(excinfo.value, AssertionError)
+    assert excinfo.value.report.peak_bytes_per_step > 1
+
+
+def test_budget_catches_a_leaking_rule():
+    scenario = get_scenario("noisy_linear")
+    grad = manual_gradient(scenario.grad)
+    leaked = []
+
+    def leaky(x, y, y_hat, params):
+        leaked.append(bytearray(1024))
+        return grad(x, y, y_hat, params)
+
+    budget = AllocationBudget(retained_bytes_per_step=4096)
+    assert_allocation_budget(lambda t: _train(scenario, profiler=t), budget)
+    with pytest.raises(AllocationBudgetExceeded, match="retained_bytes_per_step"):
+        assert_allocation_budget(lambda t: _train(scenario, rule=leaky, profiler=t), budget)
+
+
+def test_report_needs_steps_after_warmup():
+    tracker = AllocationTracker()
+    with pytest.raises(ValueError, match="warm-up"):
+        tracker.report()
@@ -0,0 +1,91 @@
+import pytest
+
+from nanotorch import ParamStore, manual_gradient, train, train_batched, train_iter
+from nanotorch.optim import OPTIMIZERS, SGD, Adam, make_optimizer
+from nanotorch.scenarios import get_scenario
+
+
+def _fit(scenario, params, optimizer, *, lr=None, steps=None):
+    return train(
+        scenario.data,
+        params,
+        scenario.predict,
+        scenario.loss,
+        manual_gradient(scenario.grad),
+        steps=steps or scenario.steps,
+        lr=lr or scenario.lr,
+        optimizer=optimizer,
+    )
+
+
+def test_plain_sgd_optimizer_matches_default_update():
+    # The optimizer hook must not change the math when it implements the
+    # same rule as the built-in update.
+    scenario = get_scenario("noisy_linear")
+    default_params = dict(scenario.params)
+    expected = _fit(scenario, default_params, None)
+
+    params = dict(scenario.params)
+    assert _fit(scenario, params, SGD()) == pytest.approx(expected)
+    assert params == pytest.approx(default_params)
+
+
+@pytest.mark.parametrize("name", sorted(OPTIMIZERS))
+def test_every_optimizer_reduces_loss_with_dicts_and_param_stores(name):
+    scenario = get_scenario("with_bias")
+    lr = {"adam": 0.1, "adamw": 0.1, "rmsprop": 0.01, "lbfgs": 1.0}.get(name)
+
+    dict_history = _fit(scenario, dict(scenario.params), make_optimizer(name), lr=lr)
+    store_history = _fit(scenario, ParamStore(scenario.params), make_optimizer(name), lr=lr)
+
+    assert dict_history[-1] < dict_history[0]
+    assert store_history == pytest.approx(dict_history)
+
+
+def test_lbfgs_reaches_the_optimum_in_a_few_steps():
+    # A quadratic loss is exactly what quasi-Newton methods are built for.
+    scenario = get_scenario("with_bias")
+    history = _fit(scenario, dict(scenario.params), make_optimizer("lbfgs"), lr=1.0, steps=6)
+    assert history[-1] < 1e-8
+
+
+def test_optimizer_state_is_visible_in_step_states():
+    scenario = get_scenario("with_bias")
+    states = list(
+        train_iter(
+            scenario.data,
+            dict(scenario.params),
+            scenario.predict,
+            scenario.loss,
+            manual_gradient(scenario.grad),
+            steps=3,
+            lr=0.1,
+            optimizer=Adam(),
+        )
+    )
+
+    assert set(states[-1].opt_state) == {"m", "v"}
+    assert set(states[-1].opt_state["m"]) == set(scenario.params)
+    # Snapshots are copies, so earlier states keep their own values.
+    assert states[0].opt_state["m"] != states[-1].opt_state["m"]
+
+
+def test_batched_engine_accepts_optimizers():
+    scenario = get_scenario("noisy_linear")
+    scalar = _fit(scenario, dict(scenario.params), make_optimizer("nesterov"))
+    batched = train_batched(
+        scenario.data,
+        dict(scenario.params),
+        scenario.batch_predict,
+        scenario.batch_loss,
+        scenario.batch_grad,
+        steps=scenario.steps,
+        lr=scenario.lr,
+        optimizer=make_optimizer("nesterov"),
+    )
+    assert batched == pytest.approx(scalar)
+
+
+def test_unknown_optimizer_lists_the_available_ones():
+    with pytest.raises(ValueError, match="Available"):
+        make_optimizer("adagrad")
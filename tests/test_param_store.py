@@ -0,0 +1,85 @@
+import tracemalloc
+
+import pytest
+
+from nanotorch import ParamStore, manual_gradient, train, train_batched, train_iter
+from nanotorch.scenarios import get_scenario
+
+
+@pytest.mark.parametrize("engine", ["scalar", "batched"])
+def test_param_store_trains_like_a_dict(engine):
+    # The store is a drop-in for the params dict: same predict functions,
+    # same history, same final values.
+    reference = get_scenario("noisy_linear")
+    scenario = get_scenario("noisy_linear")
+    store = ParamStore(scenario.params)
+
+    expected = train(
+        reference.data, reference.params, reference.predict, reference.loss,
+        manual_gradient(reference.grad), steps=reference.steps, lr=reference.lr,
+    )
+    if engine == "scalar":
+        history = train(
+            scenario.data, store, scenario.predict, scenario.loss,
+            manual_gradient(scenario.grad), steps=scenario.steps, lr=scenario.lr,
+        )
+    else:
+        history = train_batched(
+            scenario.data, store, scenario.batch_predict, scenario.batch_loss,
+            manual_gradient(scenario.batch_grad), steps=scenario.steps, lr=scenario.lr,
+        )
+
+    assert history == pytest.approx(expected)
+    assert store.to_dict() == pytest.approx(reference.params)
+
+
+def test_param_store_stepstate_and_fixed_layout(scenario_with_bias):
+    # StepState consumers still get plain dict snapshots, and the gradient
+    # buffer is the same object every step (that's the point of the store).
+    scenario = scenario_with_bias
+    store = ParamStore(scenario.params)
+    buffer = store.grad
+
+    states = list(
+        train_iter(
+            scenario.data, store, scenario.predict, scenario.loss,
+            manual_gradient(scenario.grad), steps=3, lr=scenario.lr,
+        )
+    )
+
+    assert store.grad is buffer
+    assert type(states[-1].params) is dict and type(states[-1].grads) is dict
+    assert states[-1].params == store.to_dict()
+    assert states[0].grads != states[-1].grads
+    with pytest.raises(KeyError):
+        store["new_param"] = 1.0
+
+
+def test_param_store_cuts_per_step_allocations():
+    # With thousands of parameters the dict path rebuilds a grads_sum dict
+    # every step; the store reuses its buffers. We use a rule that returns a
+    # prebuilt dict so only the training loop's own allocations are measured.
+    names = [f"w{i}" for i in range(2000)]
+    grads = {name: 1e-3 for name in names}
+
+    def predict(x, p):
+        return p["w0"] * x
+
+    def loss(y_hat, y):
+        return (y_hat - y) ** 2
+
+    def rule(x, y, y_hat, p):
+        return grads
+
+    def peak_bytes(params):
+        train([(1.0, 1.0)], params, predict, loss, rule, steps=1, lr=0.1)  # warm up
+        tracemalloc.start()
+        train([(1.0, 1.0)], params, predict, loss, rule, steps=5, lr=0.1)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    dict_peak = peak_bytes({name: 0.0 for name in names})
+    store_peak = peak_bytes(ParamStore({name: 0.0 for name in names}))
+
+    assert store_peak * 5 < dict_peak
@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+
+from nanotorch.cache import ResultCache, run_key
+from nanotorch.plotting import MANIFEST, _line, plot_all
+from nanotorch.scenarios import get_scenario
+from nanotorch.training import manual_gradient
+
+
+def test_batched_line_matches_point_by_point():
+    scenario = get_scenario("with_bias")
+    params = {"w": 1.5, "b": -0.25}
+    xs, batched = _line(scenario.predict, params, -1.0, 3.0, batch_predict=scenario.batch_predict)
+    _, scalar = _line(scenario.predict, params, -1.0, 3.0)
+    assert xs.shape == (50,)
+    np.testing.assert_allclose(batched, scalar, rtol=0, atol=1e-12)
+
+
+def test_unchanged_charts_are_skipped(tmp_path, result_cache):
+    out = tmp_path / "plots"
+    names = ["single_point", "with_bias"]
+    first = plot_all(names, out, workers=2, cache=result_cache)
+    assert len(first.rendered) == 2 and not first.skipped
+    assert all(path.exists() for path in first.rendered)
+
+    stamps = {path: path.stat().st_mtime_ns for path in first.rendered}
+    again = plot_all(names, out, cache=result_cache)
+    assert not again.rendered and sorted(again.skipped) == sorted(first.rendered)
+    assert {path: path.stat().st_mtime_ns for path in first.rendered} == stamps
+
+
+def test_stale_or_missing_charts_are_rerendered(tmp_path, result_cache):
+    out = tmp_path / "plots"
+    names = ["single_point", "with_bias", "noisy_linear"]
+    paths = plot_all(names, out, workers=1, cache=result_cache).rendered
+
+    manifest = json.loads((out / MANIFEST).read_text())
+    stale = paths[0].name
+    manifest[stale] = "inputs changed"
+    (out / MANIFEST).write_text(json.dumps(manifest))
+    missing = paths[-1]
+    missing.unlink()
+
+    result = plot_all(names, out, cache=result_cache)
+    assert sorted(p.name for p in result.rendered) == sorted([stale, missing.name])
+    assert len(result.skipped) == 1
+    assert json.loads((out / MANIFEST).read_text())[stale] != "inputs changed"
+    assert plot_all(names, out, force=True, cache=result_cache).skipped == []
+
+
+def test_renders_use_the_callers_cache_configuration(tmp_path):
+    cache = ResultCache(tmp_path / "cache", salt="v2", max_entries=1)
+    names = ["single_point", "with_bias"]
+    plot_all(names, tmp_path / "plots", workers=1, cache=cache)
+
+    # Salted keys only, and the entry limit held.
+    s = get_scenario("with_bias")
+    salted = run_key(
+        s.data, s.params, s.predict, s.loss, manual_gradient(s.grad), steps=s.steps, lr=s.lr, salt="v2"
+    )
+    assert [path.name for path in cache.entries()] == [cache.path_for(salted).name]
+
+    # A different salt means different runs, so the charts are redrawn.
+    other = ResultCache(tmp_path / "cache", salt="v3")
+    assert len(plot_all(names, tmp_path / "plots", workers=1, cache=other).rendered) == 2
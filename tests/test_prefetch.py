@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+import pytest
+
+from nanotorch import DataLoader, manual_gradient, train
+from nanotorch.data import Prefetcher
+from nanotorch.scenarios import get_scenario
+
+
+def test_prefetched_training_matches_serial_training():
+    # Prefetching only changes *when* batches are built, never which ones, so
+    # a seeded shuffled run must be identical with and without it.
+    scenario = get_scenario("noisy_linear")
+
+    def run(prefetch, mode="thread"):
+        params = dict(scenario.params)
+        loader = DataLoader(
+            scenario.data, batch_size=3, shuffle_buffer=4, seed=1, prefetch=prefetch, prefetch_mode=mode
+        )
+        history = train(
+            loader, params, scenario.predict, scenario.loss, manual_gradient(scenario.grad), steps=25, lr=scenario.lr
+        )
+        return history, params
+
+    serial = run(0)
+    assert run(2) == serial
+    assert run(2, mode="process") == serial
+
+
+def test_stats_tell_io_bound_from_compute_bound():
+    # A slow producer starves the consumer; a slow consumer leaves the
+    # producer blocked on a full queue.
+    def slow_source():
+        for i in range(5):
+            time.sleep(0.02)
+            yield i
+
+    prefetcher = Prefetcher(slow_source, depth=2)
+    assert list(prefetcher) == [0, 1, 2, 3, 4]
+    assert prefetcher.stats.batches == 5
+    assert prefetcher.stats.starved >= 4
+    assert prefetcher.stats.bound == "io"
+
+    prefetcher = Prefetcher(lambda: iter(range(5)), depth=1)
+    for _ in prefetcher:
+        time.sleep(0.02)
+    assert prefetcher.stats.bound == "compute"
+
+
+def test_producer_errors_reach_the_consumer():
+    def broken():
+        yield 1
+        raise OSError("disk went away")
+
+    with pytest.raises(RuntimeError, match="disk went away"):
+        list(Prefetcher(broken))
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_array_pairs_pass_through_and_early_close_is_prompt(mode):
+    batch = (np.arange(3.0), np.arange(3.0))
+    (x, y), = list(Prefetcher(lambda: iter([batch]), mode=mode))
+    np.testing.assert_array_equal(x, batch[0])
+
+    # Source exhausted with the queue full: closing must not wait on the
+    # producer's end marker.
+    it = iter(Prefetcher(lambda: iter(range(3)), depth=1, mode=mode))
+    next(it)
+    time.sleep(0.3)
+    start = time.perf_counter()
+    it.close()
+    assert time.perf_counter() - start < 1.0
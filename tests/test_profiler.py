@@ -0,0 +1,65 @@
+import json
+
+from nanotorch import finite_difference, manual_gradient, train, train_batched, train_iter
+from nanotorch.profiler import Profiler
+from nanotorch.scenarios import get_scenario
+
+
+def _train(scenario, **kwargs):
+    return train(
+        scenario.data, dict(scenario.params), scenario.predict, scenario.loss,
+        manual_gradient(scenario.grad), steps=scenario.steps, lr=scenario.lr, **kwargs,
+    )
+
+
+def test_profiling_does_not_change_results_and_times_every_phase(result_cache):
+    scenario = get_scenario("noisy_linear")
+    profiler = Profiler()
+
+    seen = []
+    baseline = result_cache.scenario("noisy_linear").history
+    assert _train(scenario, profiler=profiler, observer=seen.append) == baseline
+
+    assert len(profiler.steps) == scenario.steps
+    for phase in ("gradient", "update", "observers", "predict", "loss", "rule", "step"):
+        assert profiler.totals[phase] > 0
+    # predict/loss/rule run once per sample per step.
+    assert profiler.calls["predict"] == scenario.steps * len(scenario.data)
+    # Observers see the phases finished so far in their step.
+    assert {"gradient", "update", "predict"} <= set(seen[-1].profile)
+    assert "observers" in profiler.summary()
+
+
+def test_step_states_carry_per_step_totals():
+    scenario = get_scenario("with_bias")
+    states = list(
+        train_iter(
+            scenario.data, dict(scenario.params), scenario.predict, scenario.loss,
+            finite_difference(predict=scenario.predict, loss=scenario.loss),
+            steps=3, lr=scenario.lr, profiler=Profiler(),
+        )
+    )
+    assert all(s.profile["gradient"] >= s.profile["rule"] > 0 for s in states)
+    # Without a profiler the field stays empty.
+    plain = next(
+        train_iter(scenario.data, dict(scenario.params), scenario.predict, scenario.loss,
+                   manual_gradient(scenario.grad), steps=1, lr=scenario.lr)
+    )
+    assert plain.profile == {}
+
+
+def test_chrome_trace_export(tmp_path):
+    scenario = get_scenario("with_bias")
+    profiler = Profiler(sample_events=True)
+    train_batched(
+        scenario.data, dict(scenario.params), scenario.batch_predict, scenario.batch_loss,
+        scenario.batch_grad, steps=4, lr=scenario.lr, profiler=profiler,
+    )
+
+    path = profiler.export_chrome_trace(tmp_path / "run.json")
+    events = json.loads(path.read_text())["traceEvents"]
+
+    complete = [e for e in events if e["ph"] == "X"]
+    assert {e["name"] for e in complete} >= {"step", "gradient", "update", "predict", "loss", "rule"}
+    assert all(e["dur"] >= 0 and "ts" in e for e in complete)
+    assert any(e["ph"] == "C" for e in events)
@@ -0,0 +1,83 @@
+import threading
+
+from nanotorch import finite_difference, manual_gradient, train
+from nanotorch.cache import ResultCache, run_key
+from nanotorch.plotting import plot_scenario
+from nanotorch.scenarios import get_scenario
+
+
+def _key(scenario, **overrides):
+    kwargs = dict(steps=scenario.steps, lr=scenario.lr)
+    kwargs.update(overrides)
+    return run_key(scenario.data, scenario.params, scenario.predict, scenario.loss,
+                   manual_gradient(scenario.grad), **kwargs)
+
+
+def test_hit_matches_a_fresh_training_run(tmp_path):
+    cache = ResultCache(tmp_path)
+    first = cache.scenario("with_bias")
+    again = ResultCache(tmp_path).scenario("with_bias")  # e.g. another process
+    assert (first.hit, again.hit) == (False, True)
+
+    scenario = get_scenario("with_bias")
+    history = train(scenario.data, scenario.params, scenario.predict, scenario.loss,
+                    manual_gradient(scenario.grad), steps=scenario.steps, lr=scenario.lr)
+    assert again.history == history
+    assert again.final_params == scenario.params
+    assert again.initial_params == get_scenario("with_bias").params
+
+
+def test_key_is_stable_and_tracks_every_input():
+    scenario = get_scenario("noisy_linear")
+    key = _key(scenario)
+    # Fresh closures from the factory still hash the same.
+    assert _key(get_scenario("noisy_linear")) == key
+    assert _key(scenario, lr=scenario.lr / 2) != key
+    assert _key(scenario, steps=scenario.steps + 1) != key
+    assert _key(get_scenario("with_bias")) != key
+    assert run_key(scenario.data, {"w": 1.0, "b": 0.0}, scenario.predict, scenario.loss,
+                   manual_gradient(scenario.grad), steps=scenario.steps, lr=scenario.lr) != key
+
+    # Seeded estimators are keyed by their RNG state; opaque objects aren't keyable.
+    spsa = finite_difference(predict=scenario.predict, loss=scenario.loss, method="spsa", seed=1)
+    assert run_key(scenario.data, scenario.params, scenario.predict, scenario.loss, spsa,
+                   steps=3, lr=0.1) is not None
+    opaque = object()
+    assert run_key(scenario.data, scenario.params, lambda x, p: opaque and x, scenario.loss,
+                   spsa, steps=3, lr=0.1) is None
+
+
+def test_lru_eviction_keeps_recently_used_runs(tmp_path):
+    cache = ResultCache(tmp_path, max_entries=2)
+    cache.scenario("single_point")
+    cache.scenario("with_bias")
+    assert cache.scenario("single_point").hit  # now the most recent
+    cache.scenario("noisy_linear")
+    assert len(cache.entries()) == 2
+    assert cache.scenario("single_point").hit
+    assert not cache.scenario("with_bias").hit
+
+
+def test_concurrent_misses_store_one_complete_entry(tmp_path):
+    runs = []
+
+    def worker():
+        runs.append(ResultCache(tmp_path).scenario("noisy_linear"))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({tuple(run.history) for run in runs}) == 1
+    assert len(ResultCache(tmp_path).entries()) == 1
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_plotting_reads_from_the_cache(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    cache.scenario("single_point")
+    path = plot_scenario("single_point", tmp_path / "plots", cache)
+    assert path.exists()
+    assert cache.hits == 1
@@ -0,0 +1,58 @@
+import importlib.metadata
+
+import pytest
+
+import nanotorch
+from nanotorch import scenarios, sweep
+from nanotorch.bench import main, startup_suite
+
+
+def test_import_and_plot_help_stay_within_the_startup_budget():
+    results = startup_suite(repeat=3)
+
+    assert [r.name for r in results] == ["import nanotorch", "nanotorch-plot --help"]
+    for r in results:
+        assert r.heavy_modules == [], f"{r.name} loaded {r.heavy_modules}"
+        assert r.best_ms <= r.budget_ms, f"{r.name} took {r.best_ms:.1f} ms"
+
+
+def test_cli_fails_when_over_budget(capsys):
+    assert main(["--startup", "--repeat", "1", "--startup-budget-ms", "0"]) == 1
+    assert "OVER" in capsys.readouterr().out
+
+
+def test_lazy_exports_resolve_and_submodules_import_normally():
+    from nanotorch.autodiff import Tape, autodiff
+    from nanotorch.trace import TraceRecorder
+
+    assert Tape().nodes == []
+    assert nanotorch.autodiff is autodiff
+    assert nanotorch.TraceRecorder is TraceRecorder
+    assert "train_batched" in dir(nanotorch)
+    with pytest.raises(AttributeError):
+        nanotorch.not_a_thing
+
+
+def test_entry_point_plugins_are_discovered_on_demand(monkeypatch):
+    points = {
+        "nanotorch.scenarios": [
+            importlib.metadata.EntryPoint("plugin_fit", "nanotorch.scenarios:_with_bias", "nanotorch.scenarios")
+        ],
+        "nanotorch.rules": [
+            importlib.metadata.EntryPoint("plugin_rule", "nanotorch.sweep:_autodiff_rule", "nanotorch.rules")
+        ],
+    }
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group: points.get(group, []))
+    monkeypatch.setattr(scenarios, "_SCENARIOS", dict(scenarios._SCENARIOS))
+    monkeypatch.setattr(scenarios, "_discovered", False)
+    monkeypatch.setattr(sweep, "RULES", dict(sweep.RULES))
+    monkeypatch.setattr(sweep, "_discovered", False)
+
+    assert "plugin_fit" in scenarios.list_scenarios()
+    fit = scenarios.get_scenario("plugin_fit")
+    assert fit.name == "with_bias"
+
+    rule = sweep.get_rule("plugin_rule")(fit)
+    assert set(rule(1.0, 3.0, fit.predict(1.0, fit.params), fit.params)) == {"w", "b"}
+    with pytest.raises(ValueError, match="Unknown rule 'missing'"):
+        sweep.get_rule("missing")
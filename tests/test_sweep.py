@@ -0,0 +1,38 @@
+import math
+
+from nanotorch.sweep import grid_space, random_space, run_sweep
+
+
+def test_sweep_prunes_losers_and_drops_diverged_runs():
+    # lr=2.0 explodes on noisy_linear; the small learning rates are clearly
+    # worse than the tuned one at the first rung and should stop early.
+    trials = grid_space(lr=[0.0005, 0.001, 0.005, 0.03, 2.0], steps=[60])
+
+    result = run_sweep("noisy_linear", trials, workers=2, eta=3, rungs=3)
+    by_lr = {r.trial.lr: r for r in result.results}
+
+    assert by_lr[2.0].status == "diverged"
+    assert by_lr[2.0].steps_run < 60
+    assert result.best.trial.lr == 0.03
+    assert result.best.status == "completed"
+    assert result.best.steps_run == 60
+    pruned = [r for r in result.results if r.status == "pruned"]
+    assert pruned and all(r.steps_run < 60 for r in pruned)
+    assert "completed" in result.table()
+
+
+def test_resumed_trial_matches_uninterrupted_run():
+    # Successive halving pauses and resumes trials across processes; the
+    # surviving trial's curve must equal a single uninterrupted run.
+    pruned = run_sweep("with_bias", grid_space(lr=[0.05], steps=[40]), workers=1, rungs=3)
+    straight = run_sweep("with_bias", grid_space(lr=[0.05], steps=[40]), workers=1, rungs=1)
+
+    assert pruned.best.history == straight.best.history
+
+
+def test_random_space_is_seeded_and_in_range():
+    trials = random_space(trials=8, lr=(1e-3, 1e-1), steps=[10, 20], rule=["manual", "autodiff"], seed=7)
+
+    assert trials == random_space(trials=8, lr=(1e-3, 1e-1), steps=[10, 20], rule=["manual", "autodiff"], seed=7)
+    assert all(1e-3 <= t.lr <= 1e-1 and t.steps in (10, 20) for t in trials)
+    assert not any(math.isnan(t.lr) for t in trials)
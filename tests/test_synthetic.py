@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from nanotorch.batched import train_batched
+from nanotorch.bench import synthetic
+from nanotorch.plotting import main as plot_main
+from nanotorch.scenarios import get_scenario, list_families
+from nanotorch.synthetic import true_coefficients
+from nanotorch.training import manual_gradient
+
+
+def test_family_data_is_deterministic_prefix_stable_and_memoized():
+    big = get_scenario("noisy_linear", n=200_000, seed=7)
+    small = get_scenario("noisy_linear", n=1_000, seed=7)
+    again = get_scenario("noisy_linear", n=200_000, seed=7)
+
+    np.testing.assert_array_equal(small.data.x, big.data.x[:1_000])
+    np.testing.assert_array_equal(small.data.y, big.data.y[:1_000])
+    assert again.data is big.data  # generated once
+    assert not big.data.x.flags.writeable
+    assert again.params is not big.params  # but params are fresh per call
+
+    other = get_scenario("noisy_linear", n=1_000, seed=8)
+    assert not np.array_equal(other.data.x, small.data.x)
+
+
+def test_fixed_scenarios_win_without_arguments():
+    assert set(list_families()) >= {"noisy_linear", "polynomial"}
+    assert len(get_scenario("noisy_linear").data) == 4
+    assert get_scenario("polynomial").name == "polynomial(n=10000, features=3, noise=0.1, seed=0)"
+
+    with pytest.raises(ValueError, match="Unknown scenario family 'with_bias'"):
+        get_scenario("with_bias", n=10)
+    with pytest.raises(ValueError, match="n must be at least 1"):
+        get_scenario("noisy_linear", n=0)
+
+
+def test_polynomial_family_recovers_its_coefficients():
+    s = get_scenario("polynomial", n=20_000, features=2, noise=0.01, seed=1)
+    train_batched(
+        s.data, s.params, s.batch_predict, s.batch_loss, manual_gradient(s.batch_grad), steps=1_500, lr=0.3
+    )
+
+    expected = true_coefficients(features=2, seed=1)
+    assert s.params == pytest.approx(expected, abs=0.02)
+    # The scalar closures agree with the batched ones.
+    assert s.predict(0.5, s.params) == pytest.approx(float(s.batch_predict(np.array([0.5]), s.params)[0]))
+
+
+def test_family_runs_are_cached_per_parameter_set(result_cache):
+    first = result_cache.scenario("noisy_linear", n=2_000, steps=5)
+    second = result_cache.scenario("noisy_linear", n=2_000, steps=5)
+    other = result_cache.scenario("noisy_linear", n=2_000, steps=5, seed=1)
+
+    assert first.key is not None and not first.hit
+    assert second.hit and second.key == first.key
+    assert other.key != first.key
+
+
+def test_plots_and_benchmarks_take_family_members(tmp_path, result_cache, monkeypatch):
+    data, *_ = synthetic(1_000, 2, seed=5)
+    member = get_scenario("noisy_linear", n=1_000, seed=5, intercept=0.0, low=-1.0, high=1.0)
+    assert data is member.data
+
+    monkeypatch.setenv("NANOTORCH_CACHE_DIR", str(result_cache.root))
+    plot_main(["noisy_linear", "--out", str(tmp_path), "--workers", "1", "--param", "n=50_000", "--param", "seed=2"])
+    assert (tmp_path / "test_noisy_linear_n50000_seed2_chart.png").exists()
+    assert result_cache.scenario("noisy_linear", n=50_000, seed=2).hit
@@ -0,0 +1,74 @@
+import tracemalloc
+
+import pytest
+
+from nanotorch import TraceRecorder, manual_gradient, train, train_iter
+from nanotorch.scenarios import get_scenario
+
+
+def _run(scenario, steps, **kwargs):
+    return train(
+        scenario.data, scenario.params, scenario.predict, scenario.loss,
+        manual_gradient(scenario.grad), steps=steps, lr=scenario.lr, **kwargs,
+    )
+
+
+def test_recorder_views_match_train_iter_stream(scenario_with_bias):
+    # Lazy StepState views must be indistinguishable from the snapshots that
+    # train_iter builds eagerly.
+    reference = get_scenario("with_bias")
+    expected = list(
+        train_iter(
+            reference.data, reference.params, reference.predict, reference.loss,
+            manual_gradient(reference.grad), steps=reference.steps, lr=reference.lr,
+        )
+    )
+
+    recorder = TraceRecorder(list(scenario_with_bias.params))
+    _run(scenario_with_bias, scenario_with_bias.steps, recorder=recorder)
+
+    assert list(recorder) == expected
+    assert recorder[-1] == expected[-1]
+    assert recorder.losses.tolist() == [s.loss for s in expected]
+    assert recorder.param("w").tolist() == [s.params["w"] for s in expected]
+
+
+def test_strided_ring_buffer_keeps_latest_samples(scenario_noisy_linear):
+    # stride=5 samples steps 0, 5, ..., 55; a ring of 4 keeps the last four.
+    recorder = TraceRecorder(list(scenario_noisy_linear.params), capacity=4, stride=5, ring=True)
+
+    history = _run(scenario_noisy_linear, scenario_noisy_linear.steps, recorder=recorder)
+
+    assert len(recorder) == 4
+    assert recorder.steps.tolist() == [40, 45, 50, 55]
+    assert recorder[0].loss == history[40]
+    assert recorder[-1].loss == history[55]
+
+
+def test_bounded_recorder_refuses_to_overflow(scenario_single_point):
+    recorder = TraceRecorder(list(scenario_single_point.params), capacity=3)
+
+    with pytest.raises(ValueError, match="trace is full"):
+        _run(scenario_single_point, 5, recorder=recorder)
+
+
+def test_recorder_memory_is_fixed_compared_to_stepstate_list(scenario_single_point):
+    # Keeping every StepState costs two dicts per step; the recorder's arrays
+    # are allocated up front, so the run itself should add almost nothing.
+    steps = 5000
+    kept = []
+
+    tracemalloc.start()
+    _run(get_scenario("single_point"), steps, observer=kept.append)
+    _, observer_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    recorder = TraceRecorder(list(scenario_single_point.params), capacity=steps)
+    tracemalloc.start()
+    _run(scenario_single_point, steps, recorder=recorder)
+    _, recorder_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(kept) == len(recorder) == steps
+    # The remaining recorder peak is the history list train() returns.
+    assert recorder_peak * 10 < observer_peak
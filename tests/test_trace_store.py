@@ -0,0 +1,48 @@
+import pytest
+
+from nanotorch import manual_gradient, train, train_iter
+from nanotorch.scenarios import get_scenario
+from nanotorch.trace_store import TraceReader, TraceWriter
+
+
+def test_trace_file_roundtrips_and_is_readable_mid_run(tmp_path, scenario_with_bias):
+    # Readers must be able to open the file while training is still appending
+    # and see exactly the steps written so far, each addressable in O(1).
+    scenario = scenario_with_bias
+    path = tmp_path / "run.nttr"
+    seen = []
+
+    with TraceWriter(path, list(scenario.params), meta={"run": 1}) as writer:
+        reader = TraceReader(path)
+
+        def observer(state):
+            # Observers run after the recorder, so this step is on disk.
+            seen.append((len(reader), reader[state.step].loss == state.loss))
+
+        train(
+            scenario.data, scenario.params, scenario.predict, scenario.loss,
+            manual_gradient(scenario.grad), steps=10, lr=scenario.lr,
+            recorder=writer, observer=observer,
+        )
+
+    reference = get_scenario("with_bias")
+    expected = list(
+        train_iter(
+            reference.data, reference.params, reference.predict, reference.loss,
+            manual_gradient(reference.grad), steps=10, lr=reference.lr,
+        )
+    )
+
+    assert seen == [(i + 1, True) for i in range(10)]
+    assert list(reader) == expected
+    assert reader[-3] == expected[-3]
+    assert reader.meta == {"run": 1}
+    assert reader.param("b").tolist() == [s.params["b"] for s in expected]
+
+
+def test_reader_rejects_foreign_files(tmp_path):
+    path = tmp_path / "nope.nttr"
+    path.write_bytes(b"not a trace file at all, definitely not")
+
+    with pytest.raises(ValueError, match="bad magic"):
+        TraceReader(path)
@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from nanotorch import autodiff, finite_difference, manual_gradient, train, train_batched, train_iter
+from nanotorch.batched import as_columns
+from nanotorch.checkpoint import Checkpointer
+from nanotorch.dataset import ArrayDataset
+from nanotorch.export_html import main as export_main
+from nanotorch.export_html import trace_payload
+from nanotorch.optim import Adam
+from nanotorch.params import ParamStore
+from nanotorch.plotting import plot_all
+from nanotorch.trace import TraceRecorder
+from nanotorch.trace_store import TraceWriter
+from nanotorch.scenarios import get_scenario
+from nanotorch.synthetic import true_weights
+from nanotorch.viz import StepView
+
+
+def _fresh(params):
+    return {name: np.array(value) if np.ndim(value) else value for name, value in params.items()}
+
+
+def test_vector_points_become_matrix_columns():
+    x = np.arange(6.0).reshape(3, 2)
+    y = np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+    points = list(ArrayDataset(x, y))
+    assert len(points) == 3
+    np.testing.assert_array_equal(points[1][0], [2.0, 3.0])
+    np.testing.assert_array_equal(points[1][1], [3.0, 4.0])
+
+    xs, ys = as_columns(points)
+    assert xs.shape == (3, 2) and ys.shape == (3, 2)
+    xs, ys = as_columns([(row, float(i)) for i, row in enumerate(x)])
+    assert xs.shape == (3, 2) and ys.tolist() == [0.0, 1.0, 2.0]
+    with pytest.raises(ValueError, match="same length"):
+        ArrayDataset(x, y[:2])
+
+
+def test_scalar_and_batched_engines_fit_a_weight_matrix():
+    s = get_scenario("linear_regression", n=256, features=5, outputs=3, seed=2)
+    params = _fresh(s.params)
+    weights = params["W"]
+
+    history = train(s.data, params, s.predict, s.loss, manual_gradient(s.grad), steps=40, lr=0.1)
+    batched = _fresh(s.params)
+    batched_history = train_batched(
+        s.data, batched, s.batch_predict, s.batch_loss, manual_gradient(s.batch_grad), steps=40, lr=0.1
+    )
+
+    assert params["W"] is weights  # updated in place
+    assert batched_history == pytest.approx(history)
+    np.testing.assert_allclose(batched["W"], params["W"])
+    expected = true_weights(features=5, outputs=3, seed=2)
+    np.testing.assert_allclose(params["W"], expected["W"], atol=0.05)
+    np.testing.assert_allclose(params["b"], expected["b"], atol=0.05)
+
+
+def test_every_rule_agrees_on_matrix_gradients():
+    s = get_scenario("linear_regression", n=1, features=3, outputs=2, seed=4)
+    (x, y), = list(s.data)
+    params = {"W": np.arange(6.0).reshape(3, 2) / 10, "b": np.array([0.5, -0.5])}
+    y_hat = s.predict(x, params)
+    exact = s.grad(x, y, y_hat, params)
+
+    rules = [
+        autodiff(predict=s.predict, loss=s.loss),
+        finite_difference(predict=s.predict, loss=s.loss, eps=1e-6),
+        finite_difference(predict=s.predict, loss=s.loss, method="central"),
+    ]
+    for rule in rules:
+        grads = rule(x, y, y_hat, params)
+        for name in exact:
+            np.testing.assert_allclose(grads[name], exact[name], rtol=1e-4, atol=1e-4)
+    # The forward rule restores every entry it nudged.
+    np.testing.assert_array_equal(params["W"], np.arange(6.0).reshape(3, 2) / 10)
+
+    with pytest.raises(ValueError, match="vectorized=True needs scalar params"):
+        finite_difference(predict=s.predict, loss=s.loss, vectorized=True)(x, y, y_hat, params)
+
+
+def test_snapshots_optimizers_and_checkpoints_handle_array_params(tmp_path):
+    s = get_scenario("linear_regression", n=64, features=4, outputs=2, seed=1)
+
+    def run(**kwargs):
+        params = _fresh(s.params)
+        states = list(
+            train_iter(s.data, params, s.predict, s.loss, manual_gradient(s.grad), steps=12, lr=0.05, **kwargs)
+        )
+        return params, states
+
+    params, states = run(optimizer=Adam())
+    # Each snapshot owns its arrays, although the run updates W in place.
+    assert not np.array_equal(states[0].params["W"], states[-1].params["W"])
+    np.testing.assert_array_equal(states[-1].params["W"], params["W"])
+    assert states[-1].opt_state["m"]["W"].shape == (4, 2)
+
+    saver = Checkpointer(tmp_path, every_steps=6)
+    run(optimizer=Adam(), checkpoint=saver)
+    resumed = _fresh(s.params)
+    tail = list(
+        train_iter(
+            s.data, resumed, s.predict, s.loss, manual_gradient(s.grad), steps=12, lr=0.05,
+            optimizer=Adam(), resume=saver.paths()[0],
+        )
+    )
+    assert [t.loss for t in tail] == [t.loss for t in states[6:]]
+    np.testing.assert_array_equal(resumed["W"], params["W"])
+
+
+def test_scalar_only_consumers_reject_matrix_params_up_front(tmp_path, result_cache, capsys):
+    s = get_scenario("linear_regression", n=8, features=3, outputs=2)
+    expected = r"'W' is an array of shape \(3, 2\)"
+
+    with pytest.raises(ValueError, match="ParamStore needs scalar params; " + expected):
+        ParamStore(s.params)
+    with pytest.raises(ValueError, match="HTML trace export needs scalar params; " + expected):
+        trace_payload(train_iter(s.data, _fresh(s.params), s.predict, s.loss, manual_gradient(s.grad), steps=2, lr=0.1))
+    for recorder in (TraceRecorder(list(s.params)), TraceWriter(tmp_path / "run.nttr", list(s.params))):
+        with pytest.raises(ValueError, match="needs scalar params; " + expected):
+            train(s.data, _fresh(s.params), s.predict, s.loss, manual_gradient(s.grad), steps=1, lr=0.1, recorder=recorder)
+    with pytest.raises(ValueError, match="the result cache needs scalar params"):
+        result_cache.scenario("linear_regression", n=8)
+    with pytest.raises(ValueError, match="plotting 'linear_regression' needs scalar params"):
+        plot_all(["linear_regression"], tmp_path / "plots", cache=result_cache)
+    with pytest.raises(ValueError, match="StepView of 'linear_regression' needs scalar params"):
+        StepView.for_scenario("linear_regression", result_cache)
+
+    with pytest.raises(SystemExit):
+        export_main(["linear_regression", "--out", str(tmp_path)])
+    assert "exporting 'linear_regression' needs scalar params" in capsys.readouterr().err
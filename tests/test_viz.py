@@ -0,0 +1,48 @@
+import io
+
+import pytest
+from PIL import Image
+
+from nanotorch.viz import StepView, dict_to_table, export_trace
+
+
+def test_frames_render_and_are_lru_cached(result_cache):
+    view = StepView.for_scenario("with_bias", result_cache, cache_frames=2)
+    first = view.frame(0)
+    assert Image.open(io.BytesIO(first)).format == "PNG"
+    assert view.frame(0) is first  # served from the frame cache
+
+    last = view.frame(-1)
+    assert last != first
+    view.frame(1)
+    view.frame(2)  # evicts step 0 (least recently used)
+    assert view.frame(0) is not first
+    assert view.frame(0) == first  # re-rendering gives the same pixels
+
+
+def test_update_moves_only_the_dynamic_artists(result_cache):
+    view = StepView.for_scenario("noisy_linear", result_cache)
+    view.update(5)
+    state = view.trace[5]
+    assert view._left.title.get_text() == f"Step {state.step} | loss={state.loss:.4f}"
+    assert list(view._marker.get_xdata()) == [5]
+    params_html, grads_html = view.tables(5)
+    assert params_html == dict_to_table("params", state.params)
+    assert "<h4>grads</h4>" in grads_html
+    with pytest.raises(IndexError):
+        view.update(len(view))
+    with pytest.raises(IndexError):
+        view.frame(len(view))
+    assert view.frame(-1) == view.frame(len(view) - 1)
+
+
+def test_export_gif_and_png_sequence_in_parallel(tmp_path, result_cache):
+    gif = export_trace("with_bias", tmp_path / "run.gif", cache=result_cache, every=25, workers=2)
+    frames = len(range(0, len(result_cache.scenario("with_bias").trace), 25))
+    assert Image.open(gif).n_frames == frames
+
+    folder = export_trace("with_bias", tmp_path / "frames", cache=result_cache, every=25, workers=2)
+    assert len(list(folder.glob("frame-*.png"))) == frames
+
+    with pytest.raises(ValueError, match="unsupported export format"):
+        export_trace("with_bias", tmp_path / "run.avi", cache=result_cache)